@@ -0,0 +1,113 @@
+"""
+Benchmark for serving cached cat images.
+
+Compares the image server, which sends files with zero-copy sendfile, with
+embedding images as base64 in a JSON body the way MCP image content does.
+Both are served from the same process over HTTP, and throughput is measured
+in image bytes delivered per second from several concurrent client processes.
+
+Usage:
+    python benchmarks/bench_images.py --size 262144 --clients 8 --requests 200
+"""
+import argparse
+import base64
+import http.client
+import json
+import os
+import sys
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import Pool
+from threading import Thread
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from image_server import ImageServer
+
+
+class Base64RequestHandler(BaseHTTPRequestHandler):
+    """Serves images as base64 image content in a JSON body."""
+
+    protocol_version = "HTTP/1.1"
+    image_dir = ""
+
+    def do_GET(self) -> None:
+        """Read, encode and send an image."""
+        with open(os.path.join(self.image_dir, os.path.basename(self.path)), "rb") as f:
+            data = base64.b64encode(f.read()).decode("ascii")
+        body = json.dumps({"type": "image", "data": data, "mimeType": "image/jpeg"}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        """Do not log every request."""
+
+
+def run_client(args) -> int:
+    """Fetch images from one client process and return the bytes received."""
+    port, path, requests = args
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    received = 0
+    for _ in range(requests):
+        conn.request("GET", path)
+        response = conn.getresponse()
+        received += len(response.read())
+        if response.status != 200:
+            raise RuntimeError(f"Request failed with status {response.status}")
+    conn.close()
+    return received
+
+
+def benchmark(port: int, path: str, clients: int, requests: int):
+    """Measure requests per second and bytes received per request."""
+    with Pool(clients) as pool:
+        start = time.perf_counter()
+        received = sum(pool.map(run_client, [(port, path, requests)] * clients))
+        elapsed = time.perf_counter() - start
+    total = clients * requests
+    return total / elapsed, received / total
+
+
+def main():
+    """Run the image serving benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=256 * 1024, help="Image size in bytes.")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per client.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as image_dir:
+        name = "0" * 64 + ".jpg"
+        with open(os.path.join(image_dir, name), "wb") as f:
+            f.write(os.urandom(args.size))
+
+        image_server = ImageServer(image_dir, port=0)
+        image_server.start()
+        handler = type("BoundBase64RequestHandler", (Base64RequestHandler,), {"image_dir": image_dir})
+        base64_server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        base64_server.daemon_threads = True
+        Thread(target=base64_server.serve_forever, daemon=True).start()
+
+        try:
+            results = {
+                "sendfile": benchmark(int(image_server.url.rsplit(":", 1)[1]), f"/images/{name}", args.clients, args.requests),
+                "base64": benchmark(base64_server.server_address[1], f"/{name}", args.clients, args.requests)
+            }
+        finally:
+            image_server.stop()
+            base64_server.shutdown()
+            base64_server.server_close()
+
+    print(f"{'path':>8} {'req/s':>10} {'image MB/s':>11} {'wire bytes':>11} {'speedup':>8}")
+    baseline = results["base64"][0]
+    for path, (throughput, wire_bytes) in results.items():
+        image_mb_per_s = throughput * args.size / 1e6
+        print(f"{path:>8} {throughput:>10.1f} {image_mb_per_s:>11.1f} {wire_bytes:>11.0f} {throughput / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
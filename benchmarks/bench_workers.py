@@ -0,0 +1,130 @@
+"""
+Benchmark for the multi-worker streamable HTTP deployment.
+
+Starts the server with 1 to N worker processes and measures request
+throughput of the show_cat tool from several concurrent client processes.
+
+Usage:
+    python benchmarks/bench_workers.py --max-workers 4 --clients 8 --requests 500
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+from multiprocessing import Pool
+from typing import Optional
+
+
+SERVER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "server.py")
+
+HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json, text/event-stream"
+}
+
+
+def post(conn: http.client.HTTPConnection, message: dict, session_id: Optional[str] = None) -> Optional[str]:
+    """Send a JSON-RPC message over a stateless streamable HTTP connection and return the session id header."""
+    headers = HEADERS if session_id is None else {**HEADERS, "mcp-session-id": session_id}
+    conn.request("POST", "/mcp", body=json.dumps(message), headers=headers)
+    response = conn.getresponse()
+    response.read()
+    if response.status not in (200, 202):
+        raise RuntimeError(f"Request failed with status {response.status}")
+    return response.getheader("mcp-session-id")
+
+
+def initialize(conn: http.client.HTTPConnection) -> str:
+    """Initialize a client session and return the session id the server issued."""
+    session_id = post(conn, {
+        "jsonrpc": "2.0",
+        "id": 0,
+        "method": "initialize",
+        "params": {
+            "protocolVersion": "2025-03-26",
+            "capabilities": {},
+            "clientInfo": {"name": "bench_workers", "version": "1.0"}
+        }
+    })
+    if session_id is None:
+        raise RuntimeError("The server did not issue a session id")
+    post(conn, {"jsonrpc": "2.0", "method": "notifications/initialized"}, session_id)
+    return session_id
+
+
+def call_tool(conn: http.client.HTTPConnection, request_id: int, name: str, arguments: dict, session_id: str) -> None:
+    """Call a tool in a client session."""
+    post(conn, {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tools/call",
+        "params": {"name": name, "arguments": arguments}
+    }, session_id)
+
+
+def run_client(args) -> int:
+    """Send requests from one client session and return how many succeeded."""
+    port, requests = args
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    session_id = initialize(conn)
+    for i in range(1, requests + 1):
+        call_tool(conn, i, "show_cat", {"index": i}, session_id)
+    conn.close()
+    return requests
+
+
+def wait_for_server(port: int, timeout: float = 30.0) -> None:
+    """Wait until the server accepts requests."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            initialize(conn)
+            conn.close()
+            return
+        except (OSError, RuntimeError):
+            time.sleep(0.2)
+    raise RuntimeError("Server did not start in time")
+
+
+def benchmark(workers: int, port: int, clients: int, requests: int) -> float:
+    """Measure requests per second served by a number of worker processes."""
+    server = subprocess.Popen(
+        [sys.executable, SERVER_PATH, "--transport", "streamable-http", "--workers", str(workers), "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_server(port)
+        with Pool(clients) as pool:
+            start = time.perf_counter()
+            total = sum(pool.map(run_client, [(port, requests)] * clients))
+            elapsed = time.perf_counter() - start
+        return total / elapsed
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    """Run the scaling benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per client.")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    baseline = None
+    print(f"{'workers':>8} {'req/s':>10} {'speedup':>8}")
+    for workers in range(1, args.max_workers + 1):
+        throughput = benchmark(workers, args.port, args.clients, args.requests)
+        baseline = baseline or throughput
+        print(f"{workers:>8} {throughput:>10.1f} {throughput / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
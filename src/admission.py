@@ -0,0 +1,271 @@
+"""
+Admission Control - Rate limiting and backpressure for tool calls.
+"""
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class RetryLater(Exception):
+    """Raised when a call is rejected and should be retried later."""
+
+    def __init__(self, message: str, retry_after: float):
+        """
+        Initialize the exception.
+
+        Args:
+            message: A description of why the call was rejected.
+            retry_after: Seconds after which the call is likely to succeed.
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    A token bucket allowing bursts of calls up to a sustained rate.
+
+    The bucket holds at most `burst` tokens and refills at `rate` tokens per
+    second. Each admitted call takes one token.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        """
+        Initialize a full token bucket.
+
+        Args:
+            rate: Tokens added per second.
+            burst: The capacity of the bucket.
+        """
+        self._rate = rate
+        self._burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+
+    def try_acquire(self, now: Optional[float] = None) -> float:
+        """
+        Try to take a token from the bucket.
+
+        Args:
+            now: The current monotonic time. Defaults to time.monotonic().
+
+        Returns:
+            0 if a token was taken, otherwise the number of seconds until
+            one is available.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        # Refill for the time elapsed since the last call
+        self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self._rate if self._rate > 0 else float("inf")
+
+
+class WriteQueue:
+    """
+    A bounded queue of write operations executed by one background thread.
+
+    Writes are serialized, so a burst of writes costs one disk writer rather
+    than one per caller, and submitting to a full queue fails immediately
+    instead of piling up work.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Initialize the write queue. The writer thread starts on first use.
+
+        Args:
+            max_size: The maximum number of pending writes.
+        """
+        self._queue: "queue.Queue[Tuple[Future, Callable, tuple, dict]]" = queue.Queue(max(1, max_size))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """
+        Get the number of writes waiting to be executed.
+
+        Returns:
+            The number of pending writes.
+        """
+        return self._queue.qsize()
+
+    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> Future:
+        """
+        Queue a write operation.
+
+        Args:
+            fn: The function performing the write.
+            *args: Positional arguments for fn.
+            **kwargs: Keyword arguments for fn.
+
+        Returns:
+            A future resolved with the result of fn.
+
+        Raises:
+            queue.Full: If the queue is full.
+        """
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put_nowait((future, fn, args, kwargs))
+        return future
+
+    def _ensure_started(self) -> None:
+        """Start the writer thread if it is not running."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="cat-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        """Execute queued writes one at a time."""
+        while True:
+            future, fn, args, kwargs = self._queue.get()
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+            self._queue.task_done()
+
+
+class AdmissionController:
+    """
+    Decides whether tool calls are admitted, and counts the decisions.
+
+    Each session has a token bucket for all of its calls, and each tool with
+    a configured limit has a token bucket per session. Tools with a global
+    limit also have one token bucket shared by every session, so spreading
+    calls over many sessions cannot lift the cap. Writes go through a global
+    bounded write queue.
+    """
+
+    # Maximum number of token buckets kept; the least recently used are dropped
+    MAX_BUCKETS = 10000
+
+    def __init__(self, settings: Dict[str, Any]):
+        """
+        Initialize the admission controller.
+
+        Args:
+            settings: Admission settings with "session_rate" and
+                "session_burst" (None to disable the session limit),
+                "tool_limits" mapping tool names to {"rate", "burst"} per
+                session, "global_tool_limits" mapping tool names to
+                {"rate", "burst"} across all sessions, and "write_queue_size".
+        """
+        self._session_rate = settings.get("session_rate")
+        self._session_burst = settings.get("session_burst") or self._session_rate
+        self._tool_limits: Dict[str, Dict[str, float]] = settings.get("tool_limits") or {}
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        
+        # Global buckets are never evicted, so they are kept apart from the LRU
+        self._global_buckets = {
+            tool: TokenBucket(limit["rate"], limit.get("burst") or limit["rate"])
+            for tool, limit in (settings.get("global_tool_limits") or {}).items()
+        }
+        self._lock = threading.Lock()
+        self.write_queue = WriteQueue(settings.get("write_queue_size", 64))
+        self._metrics: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, tool: str, outcome: str) -> None:
+        """Count an admission outcome for a tool."""
+        counts = self._metrics.setdefault(tool, {"admitted": 0, "rate_limited": 0, "queued": 0, "queue_full": 0})
+        counts[outcome] += 1
+
+    def _bucket(self, key: Tuple[str, str], rate: float, burst: float) -> TokenBucket:
+        """Get the token bucket for a key, creating it if needed."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(rate, burst)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.MAX_BUCKETS:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def admit(self, session_id: str, tool: str) -> None:
+        """
+        Admit a tool call or reject it.
+
+        Args:
+            session_id: The id of the session making the call.
+            tool: The name of the tool.
+
+        Raises:
+            RetryLater: If the session, tool or global tool rate limit is
+                exceeded.
+        """
+        with self._lock:
+            retry_after = 0.0
+            if self._session_rate:
+                bucket = self._bucket((session_id, ""), self._session_rate, self._session_burst)
+                retry_after = bucket.try_acquire()
+
+            limit = self._tool_limits.get(tool)
+            if not retry_after and limit:
+                bucket = self._bucket((session_id, tool), limit["rate"], limit.get("burst") or limit["rate"])
+                retry_after = bucket.try_acquire()
+
+            bucket = self._global_buckets.get(tool)
+            if not retry_after and bucket is not None:
+                retry_after = bucket.try_acquire()
+
+            if retry_after:
+                self._count(tool, "rate_limited")
+                raise RetryLater(
+                    f"Too many calls to {tool}; retry after {retry_after:.2f} seconds",
+                    retry_after
+                )
+            self._count(tool, "admitted")
+
+    def submit_write(self, tool: str, fn: Callable, *args: Any, **kwargs: Any) -> Future:
+        """
+        Queue a write operation for a tool call.
+
+        Args:
+            tool: The name of the tool.
+            fn: The function performing the write.
+            *args: Positional arguments for fn.
+            **kwargs: Keyword arguments for fn.
+
+        Returns:
+            A future resolved with the result of fn.
+
+        Raises:
+            RetryLater: If the write queue is full.
+        """
+        try:
+            future = self.write_queue.submit(fn, *args, **kwargs)
+        except queue.Full:
+            with self._lock:
+                self._count(tool, "queue_full")
+            raise RetryLater("The write queue is full; retry after 1 second", 1.0)
+
+        with self._lock:
+            self._count(tool, "queued")
+        return future
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get admission metrics.
+
+        Returns:
+            Admitted, rate-limited, queued and queue-full counts per tool,
+            and the current write queue depth.
+        """
+        with self._lock:
+            return {
+                "tools": {tool: dict(counts) for tool, counts in self._metrics.items()},
+                "write_queue_pending": self.write_queue.pending
+            }
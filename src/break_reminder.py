@@ -2,7 +2,10 @@
 Break Reminder System - Tracks and manages break intervals for programmers.
 """
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from event_log import EVENT_BREAK_SUGGESTED, EVENT_BREAK_TAKEN, EVENT_INTERACTION, EventLog
+from shared_state import SharedStateStore
 
 
 class BreakReminderSystem:
@@ -11,12 +14,21 @@ class BreakReminderSystem:
     
     This class provides functionality to determine when a programmer should
     take a break based on the number of commands executed and time elapsed.
+    Interactions, break suggestions and breaks taken are recorded in an event
+    log, which may be shared between the reminders of several sessions.
+    
+    When a shared state store is given, the command count and last break time
+    live in the store instead of in this object, so break tracking for a
+    session continues seamlessly whichever worker process serves it.
     """
     
     def __init__(
         self,
         command_interval: int = 5,
-        time_interval_minutes: int = 20
+        time_interval_minutes: int = 20,
+        session_id: str = "default",
+        event_log: Optional[EventLog] = None,
+        state_store: Optional[SharedStateStore] = None
     ):
         """
         Initialize the break reminder system.
@@ -26,15 +38,46 @@ class BreakReminderSystem:
                 Defaults to 5.
             time_interval_minutes: Minutes before suggesting a break.
                 Defaults to 20.
+            session_id: The id of the session being tracked. Defaults to "default".
+            event_log: The event log to record events in. Defaults to a new
+                event log for this session only.
+            state_store: The store holding the session state shared between
+                worker processes. Defaults to None, keeping the state in memory.
         """
         self._command_interval = command_interval
         self._time_interval_seconds = time_interval_minutes * 60
         self._command_count = 0
         self._last_break_time = time.time()
+        self._session_id = session_id
+        self._event_log = event_log if event_log is not None else EventLog()
+        self._break_suggested = False
+        self._state_store = state_store
+        self._sync_state()
+    
+    def _sync_state(self) -> None:
+        """Refresh the session state from the shared state store, if any."""
+        if self._state_store is not None:
+            self._command_count, self._last_break_time, self._break_suggested = (
+                self._state_store.get_session(self._session_id, time.time())
+            )
+    
+    @property
+    def event_log(self) -> EventLog:
+        """
+        Get the event log of the break reminder system.
+        
+        Returns:
+            The event log.
+        """
+        return self._event_log
     
     def record_interaction(self) -> None:
         """Record a user interaction to track command count."""
-        self._command_count += 1
+        if self._state_store is not None:
+            self._command_count = self._state_store.increment_commands(self._session_id, time.time())
+        else:
+            self._command_count += 1
+        self._event_log.record(self._session_id, EVENT_INTERACTION)
     
     def should_take_break(self) -> bool:
         """
@@ -43,21 +86,53 @@ class BreakReminderSystem:
         Returns:
             True if it's time for a break, False otherwise.
         """
-        # Check if enough commands have been executed
-        if self._command_count >= self._command_interval:
-            return True
+        self._sync_state()
         
-        # Check if enough time has elapsed
+        # Check if enough commands have been executed or enough time has elapsed
         time_elapsed = time.time() - self._last_break_time
-        if time_elapsed >= self._time_interval_seconds:
-            return True
+        should_break = (
+            self._command_count >= self._command_interval
+            or time_elapsed >= self._time_interval_seconds
+        )
         
-        return False
+        # Log the suggestion once per break interval
+        if should_break and not self._break_suggested:
+            self._break_suggested = True
+            if self._state_store is None or self._state_store.mark_break_suggested(self._session_id):
+                self._event_log.record(self._session_id, EVENT_BREAK_SUGGESTED)
+        
+        return should_break
     
     def reset_counters(self) -> None:
-        """Reset counters after a break is taken."""
+        """
+        Reset counters after a break is taken.
+        
+        The break is logged as taken only if one was suggested since the last
+        break, so breaks taken never outnumber breaks suggested.
+        """
+        break_suggested = self._break_suggested
         self._command_count = 0
         self._last_break_time = time.time()
+        self._break_suggested = False
+        if self._state_store is not None:
+            break_suggested = self._state_store.reset_session(self._session_id, self._last_break_time)
+        if break_suggested:
+            self._event_log.record(self._session_id, EVENT_BREAK_TAKEN)
+    
+    def break_stats(self, window_seconds: float) -> Dict[str, Any]:
+        """
+        Get break-compliance statistics over a recent time window.
+        
+        Statistics cover every session recording into the same event log.
+        
+        Args:
+            window_seconds: The length of the window in seconds.
+            
+        Returns:
+            A dictionary of interaction and break counts, active sessions and
+            compliance ratios.
+        """
+        return self._event_log.stats(window_seconds)
     
     def get_status(self) -> Dict[str, Any]:
         """
@@ -66,6 +141,8 @@ class BreakReminderSystem:
         Returns:
             A dictionary containing the current status.
         """
+        # Checking for a break first also refreshes any shared session state
+        should_break = self.should_take_break()
         time_elapsed = time.time() - self._last_break_time
         time_remaining = max(0, self._time_interval_seconds - time_elapsed)
         
@@ -76,5 +153,5 @@ class BreakReminderSystem:
             "time_elapsed_seconds": time_elapsed,
             "time_interval_seconds": self._time_interval_seconds,
             "time_remaining_seconds": time_remaining,
-            "should_take_break": self.should_take_break()
+            "should_take_break": should_break
         }
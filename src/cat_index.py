@@ -0,0 +1,222 @@
+"""
+Cat Index - An in-memory inverted index over cat image metadata.
+"""
+import json
+import os
+import re
+import sys
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import unquote, urlparse
+
+
+# Tokens are lowercase alphanumeric runs of at least this many characters
+MIN_TOKEN_LENGTH = 2
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Posting lists are intersected in chunks of the shortest list, starting
+# small so that common queries stop early and doubling up to the maximum
+_MIN_CHUNK_SIZE = 64
+_MAX_CHUNK_SIZE = 4096
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase search tokens.
+
+    Args:
+        text: The text to tokenize.
+
+    Returns:
+        A list of tokens, in order of appearance, without duplicates.
+    """
+    tokens = []
+    seen = set()
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if len(token) >= MIN_TOKEN_LENGTH and token not in seen:
+            seen.add(token)
+            tokens.append(token)
+    return tokens
+
+
+def url_tokens(url: str) -> List[str]:
+    """
+    Extract search tokens from the file name of an image URL.
+
+    For example, ".../Orange_tabby_cat_sitting.jpg" yields
+    ["orange", "tabby", "cat", "sitting"].
+
+    Args:
+        url: The URL of the cat image.
+
+    Returns:
+        A list of tokens taken from the last path segment of the URL.
+    """
+    path = unquote(urlparse(url).path)
+    file_name = os.path.splitext(os.path.basename(path))[0]
+    return tokenize(file_name)
+
+
+class CatIndex:
+    """
+    An inverted index mapping search tokens to cat image indexes.
+
+    Each posting list is kept sorted in ascending order. Because cat images
+    are only ever appended to the catalog, new entries are added to the end
+    of their posting lists, so updates on add are O(number of tokens).
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._postings: Dict[str, List[int]] = {}
+        self._count = 0
+
+    @property
+    def count(self) -> int:
+        """
+        Get the number of catalog entries covered by the index.
+
+        Returns:
+            The number of indexed entries.
+        """
+        return self._count
+
+    def add(self, index: int, tokens: Iterable[str]) -> None:
+        """
+        Add a catalog entry to the index.
+
+        Entries must be added in ascending index order.
+
+        Args:
+            index: The catalog index of the entry.
+            tokens: The search tokens of the entry.
+        """
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                self._postings[token] = [index]
+            elif postings[-1] != index:
+                postings.append(index)
+        self._count = max(self._count, index + 1)
+
+    def search(self, query: str, limit: int = 10) -> List[int]:
+        """
+        Find catalog entries matching every token of a query.
+
+        Args:
+            query: Free text query, e.g. "orange tabby".
+            limit: The maximum number of indexes to return.
+
+        Returns:
+            Matching catalog indexes in ascending order, at most limit long.
+        """
+        tokens = tokenize(query)
+        if not tokens or limit <= 0:
+            return []
+
+        # Any unknown token means there can be no match
+        lists = []
+        for token in tokens:
+            postings = self._postings.get(token)
+            if not postings:
+                return []
+            lists.append(postings)
+
+        # Intersect a chunk of the shortest posting list at a time with the
+        # same range of the others, so the set operations run in C and the
+        # search stops once enough matches are found
+        lists.sort(key=len)
+        shortest, others = lists[0], lists[1:]
+        if not others:
+            return shortest[:limit]
+
+        results = []
+        start = 0
+        chunk_size = _MIN_CHUNK_SIZE
+        while start < len(shortest) and len(results) < limit:
+            chunk = shortest[start:start + chunk_size]
+            matches = set(chunk)
+            for postings in others:
+                matches.intersection_update(postings[bisect_left(postings, chunk[0]):bisect_right(postings, chunk[-1])])
+                if not matches:
+                    break
+            results.extend(sorted(matches))
+            start += chunk_size
+            chunk_size = min(chunk_size * 2, _MAX_CHUNK_SIZE)
+        return results[:limit]
+
+    def to_dict(self) -> Dict:
+        """
+        Convert the index to its compact persisted form.
+
+        Posting lists are delta-encoded so that long lists of nearby
+        indexes serialize to small numbers.
+
+        Returns:
+            A JSON-serializable dictionary.
+        """
+        postings = {}
+        for token, indexes in self._postings.items():
+            previous = 0
+            deltas = []
+            for index in indexes:
+                deltas.append(index - previous)
+                previous = index
+            postings[token] = deltas
+        return {"count": self._count, "postings": postings}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CatIndex":
+        """
+        Restore an index from its compact persisted form.
+
+        Args:
+            data: A dictionary produced by to_dict.
+
+        Returns:
+            The restored index.
+        """
+        index = cls()
+        index._count = int(data["count"])
+        index._postings = {
+            token: list(accumulate(deltas))
+            for token, deltas in data["postings"].items()
+        }
+        return index
+
+    def save(self, path: str) -> None:
+        """
+        Save the index to a file.
+
+        Args:
+            path: The path of the index file.
+        """
+        # Replace the file atomically, so a concurrent load never sees a partial write
+        try:
+            with open(path + ".tmp", "w") as f:
+                json.dump(self.to_dict(), f, separators=(",", ":"))
+            os.replace(path + ".tmp", path)
+        except IOError as e:
+            print(f"Error saving index file: {e}", file=sys.stderr)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["CatIndex"]:
+        """
+        Load an index from a file.
+
+        Args:
+            path: The path of the index file.
+
+        Returns:
+            The loaded index, or None if the file is missing or invalid.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                return cls.from_dict(json.load(f))
+        except (json.JSONDecodeError, IOError, KeyError, TypeError, ValueError) as e:
+            print(f"Error loading index file: {e}", file=sys.stderr)
+            return None
@@ -1,20 +1,54 @@
 """
 Cat Manager - Manages the storage and retrieval of cat image URLs.
 """
-import json
 import os
-from typing import List, Optional
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import urlparse
 
-from config import get_cache_file_path
+from cat_index import CatIndex, tokenize, url_tokens
+from config import get_cache_file_path, get_image_cache_dir, get_local_image_dirs, get_sidecar_path
+from image_cache import ImageCache
+from image_hash import DEFAULT_MAX_DISTANCE, PerceptualHashIndex, compute_hashes, dhash
+from local_images import LocalImageIndex
+from snapshot import (
+    SnapshotError,
+    SnapshotPosition,
+    read_list_snapshot,
+    read_snapshot,
+    read_snapshot_count,
+    read_snapshot_tail,
+    write_snapshot
+)
+
+
+class _CatalogState(NamedTuple):
+    """The loaded catalog, replaced as one object when it is reloaded."""
+    cat_images: List[str]
+    metadata: List[Dict[str, Any]]
+    index: CatIndex
+    image_hashes: PerceptualHashIndex
+    epoch: str
 
 
 class CatManager:
     """
     Manages a collection of cat image URLs.
     
-    This class provides functionality to add, retrieve, and list cat images.
-    It uses a JSON cache file for persistence with a design that allows for
-    future extension to local file system storage.
+    This class provides functionality to add, retrieve, list, and search cat
+    images. It uses a JSON cache file for persistence. Images in local
+    directories are added as file:// URLs by scan_local_images. Per-entry
+    metadata (tags, source, added-at) and a search index are kept in sidecar
+    files next to the cache file.
+    
+    Readers take no lock: they read the catalog state once and only use that
+    state, and writers append metadata before the URL it belongs to, so a
+    reader never sees an entry without its metadata. Writers hold a lock, and
+    a reload replaces the whole state at once.
     """
     
     # Default cat images to use if no cache file exists
@@ -25,36 +59,291 @@ class CatManager:
         "https://upload.wikimedia.org/wikipedia/commons/6/68/Orange_tabby_cat_sitting_on_fallen_leaves-Hisashi-01A.jpg"
     ]
     
+    # Tags for the default cat images
+    DEFAULT_CAT_TAGS = {
+        DEFAULT_CAT_IMAGES[0]: ["siamese", "lilac point"],
+        DEFAULT_CAT_IMAGES[1]: ["tabby", "gray"],
+        DEFAULT_CAT_IMAGES[2]: ["chocolate"],
+        DEFAULT_CAT_IMAGES[3]: ["orange", "tabby"]
+    }
+    
     def __init__(self):
         """Initialize a collection of cat image URLs from the cache file."""
-        self._cat_images: List[str] = []
+        self._lock = threading.RLock()
+        self._image_cache = ImageCache(get_image_cache_dir())
+        self._generation = 0
+        # Where the cache and metadata files ended when last read or written
+        self._cache_position: Optional[SnapshotPosition] = None
+        self._metadata_position: Optional[SnapshotPosition] = None
+        self._hash_file_stamp: Optional[Tuple[int, int, int]] = None
+        self._state = _CatalogState([], [], CatIndex(), PerceptualHashIndex(), "0")
         self._load_from_cache()
     
+    def reload(self) -> None:
+        """
+        Reload the catalog after another process changed the cache file.
+        
+        Other processes normally only append cat images, so the entries
+        added since the catalog was last read or written are read from the
+        end of the cache and metadata files and indexed incrementally. The
+        search index file is neither read nor rewritten, and the hash file
+        is only read if it changed. Any other change, such as updated
+        metadata or a replaced cache file, falls back to loading everything.
+        """
+        with self._lock:
+            cache_file_path = get_cache_file_path()
+            try:
+                if self._cache_position is None or self._metadata_position is None:
+                    raise SnapshotError("The catalog was not loaded from snapshots")
+                urls, cache_position = read_snapshot_tail(cache_file_path, self._cache_position)
+                metadata, metadata_position = read_snapshot_tail(
+                    get_sidecar_path(cache_file_path, "meta"),
+                    self._metadata_position
+                )
+                if len(metadata) != len(urls):
+                    raise SnapshotError("The metadata file does not match the cache file")
+            except (IOError, ValueError):
+                self._load_from_cache()
+                self._generation += 1
+                return
+            
+            state = self._state
+            for url, entry_metadata in zip(urls, metadata):
+                self._append_entry(state, url, entry_metadata)
+            self._cache_position = cache_position
+            self._metadata_position = metadata_position
+            
+            if self._get_hash_file_stamp() != self._hash_file_stamp:
+                self._state = state._replace(image_hashes=self._load_image_hashes(len(state.cat_images)))
+            else:
+                state.image_hashes.resize(len(state.cat_images))
+            self._generation += 1
+    
     def _load_from_cache(self) -> None:
-        """Load cat image URLs from the cache file."""
+        """
+        Load the catalog from the cache file and its sidecar files.
+        
+        The loaded catalog replaces the current one as a whole. A cache file
+        that is corrupted (e.g. by a partial write) is moved aside and the
+        catalog is recovered from the previous snapshot. Only when neither
+        exists is the catalog initialized with default images.
+        
+        A recovered catalog is saved with metadata for exactly its entries,
+        and the persisted index and hashes, which may describe entries the
+        previous snapshot does not have, are rebuilt from scratch. Since the
+        sequence numbers of the change feed can then name other entries than
+        before, a recovered catalog also starts a new epoch.
+        """
         cache_file_path = get_cache_file_path()
+        data, recovered, self._cache_position = self._load_snapshot(cache_file_path, str, "cache")
         
-        try:
-            # If the cache file exists, load cat images from it
-            if os.path.exists(cache_file_path):
-                with open(cache_file_path, "r") as f:
-                    data = json.load(f)
-                    if isinstance(data, list) and all(isinstance(url, str) for url in data):
-                        self._cat_images = data
-                    else:
-                        print(f"Invalid data format in cache file: {cache_file_path}")
-                        self._initialize_with_defaults()
-            else:
-                # If the cache file doesn't exist, initialize with default images
-                self._initialize_with_defaults()
-        except (json.JSONDecodeError, IOError) as e:
-            print(f"Error loading cache file: {e}")
+        if data is None:
+            # If there is no usable cache file, initialize with default images
             self._initialize_with_defaults()
+            return
+        
+        if recovered:
+            self._remove_derived_sidecars()
+        
+        metadata = self._load_metadata(data)
+        self._state = _CatalogState(
+            data,
+            metadata,
+            self._load_index(data, metadata),
+            self._load_image_hashes(len(data)),
+            self._load_epoch(new=recovered)
+        )
+        if recovered:
+            self._save_to_cache()
+            self._save_metadata()
+    
+    @staticmethod
+    def _load_epoch(new: bool = False) -> str:
+        """
+        Load the catalog epoch from the epoch sidecar file, or start a new epoch.
+        
+        An epoch is one append-only history of the catalog, in which a
+        sequence number of the change feed always names the same entry. A
+        new epoch starts whenever the catalog is replaced rather than
+        appended to. A catalog without a readable epoch file is in epoch "0".
+        """
+        epoch_path = get_sidecar_path(get_cache_file_path(), "epoch")
+        if not new:
+            try:
+                data, _ = read_snapshot(epoch_path)
+                return str(data["epoch"])
+            except (IOError, ValueError, TypeError, KeyError):
+                return "0"
+        
+        epoch = uuid.uuid4().hex[:16]
+        try:
+            write_snapshot(epoch_path, {"epoch": epoch})
+        except IOError as e:
+            print(f"Error saving epoch file: {e}", file=sys.stderr)
+        return epoch
+    
+    @staticmethod
+    def _remove_derived_sidecars() -> None:
+        """Remove the persisted search index and hashes, so they are rebuilt for the loaded catalog."""
+        cache_file_path = get_cache_file_path()
+        for sidecar_path in (
+            get_sidecar_path(cache_file_path, "index"),
+            get_sidecar_path(cache_file_path, "phash", ".bin")
+        ):
+            if os.path.exists(sidecar_path):
+                os.remove(sidecar_path)
+    
+    @staticmethod
+    def _read_list(
+        path: str,
+        item_type: type,
+        name: str
+    ) -> Tuple[Optional[list], Optional[SnapshotPosition], bool]:
+        """
+        Read a list snapshot, or None if it is missing or unusable, with its position.
+        
+        Items are only validated one by one when the file has no checksum.
+        The last value is True only if the file exists and is corrupted,
+        rather than missing or unreadable.
+        """
+        if not os.path.exists(path):
+            return None, None, False
+        
+        try:
+            data, position = read_list_snapshot(path)
+        except ValueError as e:
+            print(f"Error loading {name} file: {e}", file=sys.stderr)
+            return None, None, True
+        except IOError as e:
+            print(f"Error loading {name} file: {e}", file=sys.stderr)
+            return None, None, False
+        
+        if not isinstance(data, list) or not (position or all(isinstance(item, item_type) for item in data)):
+            print(f"Invalid data format in {name} file: {path}", file=sys.stderr)
+            return None, None, True
+        return data, position, False
+    
+    def _load_snapshot(
+        self,
+        path: str,
+        item_type: type,
+        name: str
+    ) -> Tuple[Optional[list], bool, Optional[SnapshotPosition]]:
+        """
+        Read a list snapshot, recovering from the previous snapshot if it is corrupted.
+        
+        Only a file that exists and fails its checksum or format check is
+        recovered. write_snapshot keeps the file in place while replacing it,
+        so a missing file means there is no snapshot, not a write in progress.
+        
+        Returns:
+            The list, or None if neither snapshot is usable, whether it was
+            recovered from the previous snapshot, and the position of the
+            end of the file at path (None if it was not read).
+        """
+        data, position, corrupted = self._read_list(path, item_type, name)
+        if not corrupted:
+            return data, False, position
+        
+        # Keep a corrupted file for inspection rather than overwriting it
+        os.replace(path, path + ".corrupt")
+        print(f"Moved corrupted {name} file to {path}.corrupt", file=sys.stderr)
+        
+        data, _, _ = self._read_list(path + ".prev", item_type, name)
+        if data is not None:
+            print(f"Recovered {name} file from {path}.prev", file=sys.stderr)
+        return data, data is not None, None
     
     def _initialize_with_defaults(self) -> None:
         """Initialize with default cat images and save to cache file."""
-        self._cat_images = self.DEFAULT_CAT_IMAGES.copy()
+        # Any persisted index or hashes describe the replaced catalog, so drop them
+        self._remove_derived_sidecars()
+        
+        cat_images = self.DEFAULT_CAT_IMAGES.copy()
+        metadata = [self._new_metadata(url, source="default") for url in cat_images]
+        self._state = _CatalogState(
+            cat_images,
+            metadata,
+            self._load_index(cat_images, metadata),
+            self._load_image_hashes(len(cat_images)),
+            self._load_epoch(new=True)
+        )
         self._save_to_cache()
+        self._save_metadata()
+    
+    @classmethod
+    def _new_metadata(
+        cls,
+        url: str,
+        tags: Optional[List[str]] = None,
+        source: str = "url",
+        added_at: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Create the metadata entry for a cat image."""
+        if tags is None:
+            tags = cls.DEFAULT_CAT_TAGS.get(url, [])
+        return {
+            "tags": [tag.strip().lower() for tag in tags if tag.strip()],
+            "source": source,
+            "added_at": added_at
+        }
+    
+    def _load_metadata(self, cat_images: List[str]) -> List[Dict[str, Any]]:
+        """
+        Load per-entry metadata from the metadata sidecar file.
+        
+        Entries without stored metadata (e.g. URLs added to the cache file by
+        hand) get default metadata.
+        """
+        metadata_path = get_sidecar_path(get_cache_file_path(), "meta")
+        data, _, position = self._load_snapshot(metadata_path, dict, "metadata")
+        metadata = data[:len(cat_images)] if data is not None else []
+        
+        # The position only describes the file if every entry was used as is
+        self._metadata_position = position if data is not None and len(data) == len(cat_images) else None
+        
+        # Fill in metadata for entries that have none
+        for url in cat_images[len(metadata):]:
+            metadata.append(self._new_metadata(url))
+        return metadata
+    
+    def _save_metadata(self) -> None:
+        """Save per-entry metadata to the metadata sidecar file."""
+        metadata_path = get_sidecar_path(get_cache_file_path(), "meta")
+        
+        try:
+            self._metadata_position = write_snapshot(metadata_path, self._state.metadata)
+        except IOError as e:
+            self._metadata_position = None
+            print(f"Error saving metadata file: {e}", file=sys.stderr)
+    
+    @staticmethod
+    def _entry_tokens(url: str, metadata: Dict[str, Any]) -> List[str]:
+        """Get the search tokens of a catalog entry from its tags and URL."""
+        return tokenize(" ".join(metadata.get("tags", []))) + url_tokens(url)
+    
+    def _load_index(self, cat_images: List[str], metadata: List[Dict[str, Any]]) -> CatIndex:
+        """
+        Load the search index from the index sidecar file.
+        
+        The persisted index is only rewritten when it is missing or behind the
+        catalog. Entries added since it was last saved are indexed
+        incrementally instead of rebuilding the whole index.
+        """
+        index_path = get_sidecar_path(get_cache_file_path(), "index")
+        index = CatIndex.load(index_path)
+        
+        # Rebuild from scratch if the index does not describe this catalog
+        if index is None or index.count > len(cat_images):
+            index = CatIndex()
+        
+        stale = index.count < len(cat_images)
+        for i in range(index.count, len(cat_images)):
+            index.add(i, self._entry_tokens(cat_images[i], metadata[i]))
+        
+        if stale:
+            index.save(index_path)
+        return index
     
     def _save_to_cache(self) -> None:
         """Save cat image URLs to the cache file."""
@@ -67,24 +356,451 @@ class CatManager:
                 os.makedirs(cache_dir, exist_ok=True)
             
             # Save cat images to the cache file
-            with open(cache_file_path, "w") as f:
-                json.dump(self._cat_images, f, indent=2)
+            self._cache_position = write_snapshot(cache_file_path, self._state.cat_images, indent=0)
         except IOError as e:
-            print(f"Error saving cache file: {e}")
+            self._cache_position = None
+            print(f"Error saving cache file: {e}", file=sys.stderr)
+    
+    def _load_image_hashes(self, count: int) -> PerceptualHashIndex:
+        """Load the perceptual hashes of a number of cat images from the hash sidecar file."""
+        hash_path = get_sidecar_path(get_cache_file_path(), "phash", ".bin")
+        self._hash_file_stamp = self._get_hash_file_stamp()
+        image_hashes = PerceptualHashIndex.load(hash_path) or PerceptualHashIndex()
+        image_hashes.resize(count)
+        return image_hashes
     
-    def add_cat(self, url: str) -> int:
+    def _save_image_hashes(self) -> None:
+        """Save the perceptual hashes of cat images to the hash sidecar file."""
+        hash_path = get_sidecar_path(get_cache_file_path(), "phash", ".bin")
+        self._state.image_hashes.save(hash_path)
+        self._hash_file_stamp = self._get_hash_file_stamp()
+    
+    @staticmethod
+    def _get_hash_file_stamp() -> Optional[Tuple[int, int, int]]:
+        """Get the inode, modification time and size of the hash sidecar file, or None if it is missing."""
+        try:
+            stat = os.stat(get_sidecar_path(get_cache_file_path(), "phash", ".bin"))
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+    
+    def add_cat(
+        self,
+        url: str,
+        tags: Optional[List[str]] = None,
+        source: str = "url"
+    ) -> int:
         """
         Add a cat image URL to the collection and save to cache file.
         
         Args:
             url: The URL of the cat image to add.
+            tags: Optional tags describing the cat image (e.g. "orange", "tabby").
+            source: Where the cat image came from. Defaults to "url".
             
         Returns:
             The index of the added cat image.
         """
-        self._cat_images.append(url)
-        self._save_to_cache()
-        return len(self._cat_images) - 1  # Return the index of the added image
+        return self.add_cats([url], [tags or []], source)[0]
+    
+    def add_cats(
+        self,
+        urls: List[str],
+        tags: Optional[List[List[str]]] = None,
+        source: str = "url"
+    ) -> List[int]:
+        """
+        Add several cat image URLs to the collection and save the cache file once.
+        
+        Args:
+            urls: The URLs of the cat images to add.
+            tags: Optional tags of each cat image, in the order of urls.
+            source: Where the cat images came from. Defaults to "url".
+            
+        Returns:
+            The indexes of the added cat images, in the order of urls.
+        """
+        if not urls:
+            return []
+        
+        added_at = time.time()
+        metadata = [self._new_metadata(url, tags[i] if tags else [], source, added_at) for i, url in enumerate(urls)]
+        
+        # Hash the images that have a local copy
+        image_hashes = []
+        for url in urls:
+            image_path = self._image_cache.get(url)
+            image_hashes.append(dhash(image_path) if image_path else None)
+        
+        return self._append_entries(urls, metadata, image_hashes)
+    
+    def _append_entries(
+        self,
+        urls: Sequence[str],
+        metadata: Sequence[Dict[str, Any]],
+        image_hashes: Sequence[Optional[int]]
+    ) -> List[int]:
+        """
+        Append entries to the catalog and save the cache file once.
+        
+        Returns:
+            The indexes of the appended entries.
+        """
+        with self._lock:
+            state = self._state
+            indexes = []
+            for url, entry_metadata, image_hash in zip(urls, metadata, image_hashes):
+                index = self._append_entry(state, url, entry_metadata)
+                state.image_hashes.set(index, image_hash)
+                indexes.append(index)
+            
+            self._generation += 1
+            
+            self._save_to_cache()
+            self._save_metadata()
+            if any(image_hash is not None for image_hash in image_hashes):
+                self._save_image_hashes()
+            return indexes
+    
+    def _append_entry(self, state: _CatalogState, url: str, metadata: Dict[str, Any]) -> int:
+        """Append an entry to a catalog state and its search index, returning its index."""
+        # Append the URL last, so concurrent readers never see it without metadata
+        state.metadata.append(metadata)
+        state.cat_images.append(url)
+        index = len(state.cat_images) - 1
+        
+        # Update the search index incrementally
+        state.index.add(index, self._entry_tokens(url, metadata))
+        return index
+    
+    def scan_local_images(
+        self,
+        directories: Optional[List[str]] = None,
+        max_workers: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Add the cat images in local directories to the collection.
+        
+        Directories are scanned recursively, and new or changed image files
+        are hashed and measured in a worker pool. An index of the files seen,
+        keyed by path, modification time and size, is kept in a sidecar file,
+        so a rescan only inspects files that changed. New files are added as
+        file:// URLs with source "local", tagged with the names of the
+        subdirectories they are in. Changed files keep their index and have
+        their metadata and perceptual hash updated. Every file is linked
+        into the image cache, so it can be served like a downloaded image.
+        Entries are never removed, so files deleted from a directory stay in
+        the collection.
+        
+        Args:
+            directories: The directories to scan. Defaults to the
+                local_image_dirs setting.
+            max_workers: The maximum number of worker processes. Defaults to
+                the number of CPUs.
+            
+        Returns:
+            The number of image files "added" to the collection, "updated"
+            because they changed, "removed" from the directories, and
+            "unchanged".
+        """
+        if directories is None:
+            directories = get_local_image_dirs()
+        if not directories:
+            return {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        
+        with self._lock:
+            local_index = LocalImageIndex(get_sidecar_path(get_cache_file_path(), "local"))
+            scan = local_index.scan(directories, max_workers)
+            changed = set(scan["changed"])
+            roots = [os.path.abspath(directory) for directory in directories]
+            state = self._state
+            indexes = {url: index for index, url in enumerate(state.cat_images) if url.startswith("file:")}
+        
+            urls, metadata, image_hashes = [], [], []
+            updated = 0
+            added_at = time.time()
+            for path in sorted(scan["added"] + scan["changed"] + scan["unchanged"]):
+                details = local_index.get(path)
+                url = Path(path).as_uri()
+                
+                # Link the file into the image cache, so the image server can serve it
+                self._image_cache.link(url, path)
+                index = indexes.get(url)
+                if index is None:
+                    entry_metadata = self._new_metadata(url, self._local_tags(path, roots), "local", added_at)
+                    urls.append(url)
+                    metadata.append({**entry_metadata, **self._local_details(details)})
+                    image_hashes.append(details["phash"])
+                elif path in changed:
+                    # Replace the entry rather than update it, since readers may be copying it
+                    state.metadata[index] = {**state.metadata[index], **self._local_details(details)}
+                    state.image_hashes.set(index, details["phash"])
+                    updated += 1
+        
+            if urls:
+                self._append_entries(urls, metadata, image_hashes)
+            elif updated:
+                self._generation += 1
+                self._save_metadata()
+                self._save_image_hashes()
+        
+            return {
+                "added": len(urls),
+                "updated": updated,
+                "removed": len(scan["removed"]),
+                "unchanged": len(scan["unchanged"])
+            }
+    
+    @staticmethod
+    def _local_tags(path: str, roots: List[str]) -> List[str]:
+        """Get the tags of a local image file from the subdirectories it is in."""
+        for root in roots:
+            relative = os.path.relpath(os.path.dirname(path), root)
+            if not relative.startswith(os.pardir):
+                return [] if relative == os.curdir else relative.split(os.sep)
+        return []
+    
+    @staticmethod
+    def _local_details(details: Dict[str, Any]) -> Dict[str, Any]:
+        """Get the metadata of a local image file from its local index entry."""
+        return {key: details[key] for key in ("sha256", "bytes", "width", "height")}
+    
+    def compact(self) -> None:
+        """
+        Rewrite the cache file and its sidecar files from the loaded catalog.
+        
+        The search index is rebuilt from scratch, and metadata or hashes left
+        over from entries no longer in the cache file are dropped.
+        """
+        with self._lock:
+            state = self._state
+            index = CatIndex()
+            for i, url in enumerate(state.cat_images):
+                index.add(i, self._entry_tokens(url, state.metadata[i]))
+            state.image_hashes.resize(len(state.cat_images))
+            self._state = state._replace(index=index)
+            
+            self._save_to_cache()
+            self._save_metadata()
+            index.save(get_sidecar_path(get_cache_file_path(), "index"))
+            self._save_image_hashes()
+    
+    @staticmethod
+    def verify() -> List[str]:
+        """
+        Check that the cache file and its sidecar files agree with each other.
+        
+        Loading the catalog repairs most inconsistencies (and moves a
+        corrupted cache file aside), so the files on disk are checked without
+        loading a CatManager.
+        
+        Returns:
+            A description of each problem found, or an empty list.
+        """
+        cache_file_path = get_cache_file_path()
+        problems = []
+        
+        try:
+            cat_images, verified = read_snapshot(cache_file_path)
+        except (IOError, ValueError) as e:
+            return [f"Cannot read cache file {cache_file_path}: {e}"]
+        if not isinstance(cat_images, list) or not all(isinstance(url, str) for url in cat_images):
+            return [f"Invalid data format in cache file: {cache_file_path}"]
+        if not verified:
+            problems.append(f"Cache file {cache_file_path} has no checksum")
+        
+        for i, url in enumerate(cat_images):
+            if not urlparse(url).scheme:
+                problems.append(f"Entry {i} is not a URL: {url}")
+        
+        metadata_path = get_sidecar_path(cache_file_path, "meta")
+        try:
+            metadata, verified = read_snapshot(metadata_path)
+            if not isinstance(metadata, list) or len(metadata) != len(cat_images):
+                problems.append(f"Metadata file {metadata_path} does not match the cache file")
+        except (IOError, ValueError) as e:
+            problems.append(f"Cannot read metadata file {metadata_path}: {e}")
+        
+        # An index behind the cache file is caught up incrementally on load
+        index_path = get_sidecar_path(cache_file_path, "index")
+        index = CatIndex.load(index_path)
+        if index is None or index.count > len(cat_images):
+            problems.append(f"Index file {index_path} does not match the cache file")
+        
+        # The hash file is only written once an image has been hashed
+        hash_path = get_sidecar_path(cache_file_path, "phash", ".bin")
+        if os.path.exists(hash_path):
+            image_hashes = PerceptualHashIndex.load(hash_path)
+            if image_hashes is None or image_hashes.count > len(cat_images):
+                problems.append(f"Hash file {hash_path} does not match the cache file")
+        
+        return problems
+    
+    @classmethod
+    def _peek_snapshot(cls, path: str, item_type: type, name: str) -> Optional[list]:
+        """
+        Read a list snapshot like _load_snapshot, but without changing any file.
+        
+        A corrupted file is read from the previous snapshot, as loading the
+        catalog would recover it, but it is not moved aside.
+        """
+        data, _, corrupted = cls._read_list(path, item_type, name)
+        if corrupted:
+            data, _, _ = cls._read_list(path + ".prev", item_type, name)
+        return data
+    
+    @classmethod
+    def read_count(cls) -> int:
+        """
+        Read the number of cat images without loading the catalog.
+        
+        Only the header of the cache file is read, so its body is not
+        checked against the checksum (verify does that). Cache files without
+        a usable header are read as a whole with read_entries.
+        
+        Returns:
+            The number of cat images.
+        """
+        try:
+            count = read_snapshot_count(get_cache_file_path())
+        except (IOError, ValueError):
+            count = None
+        if count is None:
+            return len(cls.read_entries(with_metadata=False)[0])
+        return count
+    
+    @classmethod
+    def read_entries(cls, with_metadata: bool = True) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """
+        Read the cat image URLs and their metadata without loading the catalog.
+        
+        The files are read as loading a CatManager would read them, but no
+        file is written: a corrupted file is read from the previous
+        snapshot without being moved aside, a missing cache file reads as the
+        default images without being created, and the search index is
+        neither loaded nor caught up. This is what read-only tools should use,
+        since they run without the catalog write lock.
+        
+        Args:
+            with_metadata: Whether to read the metadata file. Defaults to True.
+            
+        Returns:
+            The URLs and, if with_metadata is True, their metadata (an empty
+            list otherwise).
+        """
+        cache_file_path = get_cache_file_path()
+        cat_images = cls._peek_snapshot(cache_file_path, str, "cache")
+        if cat_images is None:
+            cat_images = cls.DEFAULT_CAT_IMAGES.copy()
+            metadata = [cls._new_metadata(url, source="default") for url in cat_images]
+            return cat_images, metadata if with_metadata else []
+        if not with_metadata:
+            return cat_images, []
+        
+        data = cls._peek_snapshot(get_sidecar_path(cache_file_path, "meta"), dict, "metadata")
+        metadata = data[:len(cat_images)] if data is not None else []
+        for url in cat_images[len(metadata):]:
+            metadata.append(cls._new_metadata(url))
+        return cat_images, metadata
+    
+    def update_image_hashes(self, max_workers: Optional[int] = None) -> int:
+        """
+        Compute perceptual hashes for cached cat images that have none yet.
+        
+        Only images with a local copy in the image cache are hashed. Large
+        batches are hashed in a worker pool.
+        
+        Args:
+            max_workers: The maximum number of worker processes. Defaults to
+                the number of CPUs.
+            
+        Returns:
+            The number of newly hashed cat images.
+        """
+        with self._lock:
+            state = self._state
+            indexes = []
+            paths = []
+            for index, url in enumerate(state.cat_images):
+                if state.image_hashes.get(index) is None:
+                    image_path = self._image_cache.get(url)
+                    if image_path:
+                        indexes.append(index)
+                        paths.append(image_path)
+            
+            hashed = 0
+            for index, image_hash in zip(indexes, compute_hashes(paths, max_workers)):
+                if image_hash is not None:
+                    state.image_hashes.set(index, image_hash)
+                    hashed += 1
+            
+            if hashed:
+                self._save_image_hashes()
+            return hashed
+    
+    def fetch_image(self, url: str, timeout: float = 10.0, max_bytes: Optional[int] = None) -> Optional[str]:
+        """
+        Download a cat image into the image cache, so it can be hashed.
+        
+        Args:
+            url: The URL of the cat image.
+            timeout: The download timeout in seconds. Defaults to 10.
+            max_bytes: The largest image downloaded. Defaults to
+                ImageCache.MAX_BYTES.
+            
+        Returns:
+            The path of the cached copy, or None if the image could not be
+            downloaded or is not an http or https URL.
+        """
+        return self._image_cache.fetch(url, timeout, max_bytes)
+    
+    def fetch_images(self, timeout: float = 10.0, max_workers: int = 8) -> int:
+        """
+        Download every cat image that is not in the image cache yet.
+        
+        Downloads run in a thread pool (see ImageCache.fetch_all). The
+        catalog is not changed, so no lock is needed.
+        
+        Args:
+            timeout: The download timeout in seconds. Defaults to 10.
+            max_workers: The maximum number of concurrent downloads.
+                Defaults to 8.
+            
+        Returns:
+            The number of newly cached cat images.
+        """
+        return self._image_cache.fetch_all(self._state.cat_images, timeout, max_workers)
+    
+    def find_near_duplicates(
+        self,
+        index: int,
+        max_distance: int = DEFAULT_MAX_DISTANCE
+    ) -> List[int]:
+        """
+        Find cat images that look like the cat image at an index.
+        
+        If the index is out of range, it will be wrapped around using modulo.
+        
+        Args:
+            index: The index of the cat image.
+            max_distance: The maximum Hamming distance between perceptual
+                hashes. Defaults to DEFAULT_MAX_DISTANCE.
+            
+        Returns:
+            The indexes of near-duplicate cat images, closest first. Empty if
+            the image has no perceptual hash.
+        """
+        state = self._state
+        if not state.cat_images:
+            return []
+        
+        index = index % len(state.cat_images)
+        image_hash = state.image_hashes.get(index)
+        if image_hash is None:
+            return []
+        
+        matches = state.image_hashes.find(image_hash, max_distance, exclude=index)
+        return [match_index for match_index, _ in matches]
     
     def get_cat(self, index: int) -> Optional[str]:
         """
@@ -98,12 +814,122 @@ class CatManager:
         Returns:
             The URL of the cat image, or None if no images are available.
         """
-        if not self._cat_images:
+        cat_images = self._state.cat_images
+        if not cat_images:
             return None
         
         # Use modulo to wrap around if the index is out of range
-        adjusted_index = index % len(self._cat_images)
-        return self._cat_images[adjusted_index]
+        adjusted_index = index % len(cat_images)
+        return cat_images[adjusted_index]
+    
+    def get_cached_image(self, index: int) -> Optional[str]:
+        """
+        Get the path of the local copy of a cat image by index.
+        
+        If the index is out of range, it will be wrapped around using modulo.
+        
+        Args:
+            index: The index of the cat image.
+            
+        Returns:
+            The path of the cached copy, or None if the image is not cached.
+        """
+        cat_images = self._state.cat_images
+        if not cat_images:
+            return None
+        return self._image_cache.get(cat_images[index % len(cat_images)])
+    
+    def get_metadata(self, index: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the metadata of a cat image by index.
+        
+        If the index is out of range, it will be wrapped around using modulo.
+        
+        Args:
+            index: The index of the cat image.
+            
+        Returns:
+            A copy of the metadata (tags, source, added_at), or None if no
+            images are available.
+        """
+        state = self._state
+        if not state.cat_images:
+            return None
+        
+        entry = state.metadata[index % len(state.cat_images)]
+        return {**entry, "tags": list(entry.get("tags", []))}
+    
+    def search(self, query: str, limit: int = 10) -> List[int]:
+        """
+        Search cat images by tags and URL file name.
+        
+        Every token of the query must match for an image to be returned.
+        
+        Args:
+            query: Free text query, e.g. "orange tabby".
+            limit: The maximum number of results. Defaults to 10.
+            
+        Returns:
+            The indexes of matching cat images in ascending order.
+        """
+        return self._state.index.search(query, limit)
+    
+    def changes_since(self, since: int, limit: int = 1000) -> Dict[str, Any]:
+        """
+        Get the catalog changes after a sequence number.
+        
+        Cat images are only ever appended, so the catalog is its own
+        append-only change sequence: adding the cat image at index i is
+        change number i + 1. Mirrors can sync by passing the "next" value of
+        the previous call, which costs O(new entries) per sync.
+        
+        Only additions are reported. When scan_local_images refreshes the
+        metadata of a changed local file, the entry keeps its index and no
+        change is reported; the generation and the entry's ETag change
+        instead, so mirrors that need current metadata re-read entries.
+        
+        Sequence numbers only name the same entries within an epoch. A
+        catalog recovered from its previous snapshot loses its newest entries,
+        and entries added afterwards reuse their sequence numbers, so it
+        starts a new epoch. Mirrors keep the epoch with their sequence number
+        and start over from 0 when it changes. A since beyond the latest
+        sequence number can only come from another epoch, so the changes are
+        returned from 0 with "reset" set.
+        
+        Args:
+            since: The sequence number of the last change already seen, or 0.
+            limit: The maximum number of changes to return. Defaults to 1000.
+            
+        Returns:
+            A dictionary with the epoch, the changes, the sequence number to
+            pass as since on the next call, the latest sequence number,
+            whether more changes are pending, and whether the changes start
+            over from 0 because since was beyond the latest sequence number.
+        """
+        state = self._state
+        count = len(state.cat_images)
+        reset = since > count
+        start = 0 if reset else max(0, since)
+        end = min(count, start + max(0, limit))
+        changes = [
+            {
+                "seq": index + 1,
+                "op": "add",
+                "index": index,
+                "cat_url": state.cat_images[index],
+                **state.metadata[index]
+            }
+            for index in range(start, end)
+        ]
+        return {
+            "epoch": state.epoch,
+            "since": since,
+            "reset": reset,
+            "next": end,
+            "latest": count,
+            "has_more": end < count,
+            "changes": changes
+        }
     
     def list_cats(self) -> List[str]:
         """
@@ -112,7 +938,36 @@ class CatManager:
         Returns:
             A list of all cat image URLs.
         """
-        return self._cat_images.copy()
+        return self._state.cat_images.copy()
+    
+    @property
+    def generation(self) -> int:
+        """
+        Get the generation number of the catalog.
+        
+        The generation increases every time the catalog changes, so callers
+        can cache anything derived from the catalog and invalidate it when
+        the generation moves on.
+        
+        Returns:
+            The generation number of the catalog.
+        """
+        return self._generation
+    
+    @property
+    def epoch(self) -> str:
+        """
+        Get the epoch of the catalog.
+        
+        The epoch changes when the catalog is replaced rather than appended
+        to (initialized with the default images or recovered from the
+        previous snapshot), so change feed sequence numbers from another
+        epoch no longer name the same entries.
+        
+        Returns:
+            The epoch of the catalog.
+        """
+        return self._state.epoch
     
     @property
     def count(self) -> int:
@@ -122,4 +977,4 @@ class CatManager:
         Returns:
             The number of cat images.
         """
-        return len(self._cat_images)
+        return len(self._state.cat_images)
@@ -0,0 +1,253 @@
+"""
+catctl - Maintenance commands for the cat catalog.
+
+Runs without the MCP stack: only the standard library is imported at
+startup, and cat_manager and config are imported when a command needs them.
+
+Usage:
+    python src/catctl.py count
+    python src/catctl.py get 3
+    python src/catctl.py add-bulk urls.txt --source import
+    python src/catctl.py compact
+    python src/catctl.py verify
+    python src/catctl.py scan ~/Pictures/cats
+    python src/catctl.py hash --fetch
+    python src/catctl.py export --format csv --output cats.csv
+"""
+import argparse
+import os
+import sys
+from contextlib import contextmanager
+from typing import List, Optional
+
+
+def _cat_manager():
+    """Load the catalog, importing the cat manager on first use."""
+    from cat_manager import CatManager
+    return CatManager()
+
+
+@contextmanager
+def _catalog_write():
+    """
+    Load the catalog for a change, holding the catalog write lock of the servers.
+
+    Running server workers do not write the catalog while the lock is held,
+    and the catalog generation is bumped when the block completes, so they
+    reload the catalog rather than overwrite the change.
+    """
+    from config import get_state_db_path
+    from shared_state import SharedStateStore
+
+    store = SharedStateStore(get_state_db_path())
+    try:
+        with store.catalog_write():
+            yield _cat_manager()
+    finally:
+        store.close()
+
+
+def _read_bulk_file(path: str):
+    """Read "URL [tag ...]" lines from a file, or from stdin for "-"."""
+    f = sys.stdin if path == "-" else open(path, "r")
+    try:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                url, *tags = line.split()
+                yield url, tags
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _file_sizes() -> int:
+    """Get the total size of the cache file and its sidecar files."""
+    from config import get_cache_file_path, get_sidecar_path
+
+    cache_file_path = get_cache_file_path()
+    paths = [
+        cache_file_path,
+        get_sidecar_path(cache_file_path, "meta"),
+        get_sidecar_path(cache_file_path, "index"),
+        get_sidecar_path(cache_file_path, "phash", ".bin")
+    ]
+    return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+
+def cmd_count(args: argparse.Namespace) -> int:
+    """Print the number of cat images, read from the header of the cache file."""
+    from cat_manager import CatManager
+
+    print(CatManager.read_count())
+    return 0
+
+
+def cmd_get(args: argparse.Namespace) -> int:
+    """Print a cat image URL, or its entry as JSON."""
+    import json
+    from cat_manager import CatManager
+
+    cat_images, metadata = CatManager.read_entries(with_metadata=args.json)
+    if not cat_images:
+        print("The catalog is empty", file=sys.stderr)
+        return 1
+    index = args.index % len(cat_images)
+    if args.json:
+        print(json.dumps({"index": index, "cat_url": cat_images[index], **metadata[index]}))
+    else:
+        print(cat_images[index])
+    return 0
+
+
+def cmd_add_bulk(args: argparse.Namespace) -> int:
+    """Add the cat image URLs of a file, saving the catalog once."""
+    entries = list(_read_bulk_file(args.file))
+    with _catalog_write() as cat_manager:
+        known = set(cat_manager.list_cats()) if args.skip_existing else None
+
+        urls, tags = [], []
+        for url, entry_tags in entries:
+            if known is not None:
+                if url in known:
+                    continue
+                known.add(url)
+            urls.append(url)
+            tags.append(entry_tags + args.tag)
+
+        added = cat_manager.add_cats(urls, tags, args.source)
+    print(f"Added {len(added)} cat images; the catalog has {cat_manager.count}")
+    return 0
+
+
+def cmd_compact(args: argparse.Namespace) -> int:
+    """Rewrite the cache file and its sidecar files."""
+    with _catalog_write() as cat_manager:
+        before = _file_sizes()
+        cat_manager.compact()
+    print(f"Compacted {cat_manager.count} cat images: {before} -> {_file_sizes()} bytes")
+    return 0
+
+
+def cmd_verify(args: argparse.Namespace) -> int:
+    """Check the cache file and its sidecar files, failing if there are problems."""
+    from cat_manager import CatManager
+
+    problems = CatManager.verify()
+    for problem in problems:
+        print(problem)
+    if not problems:
+        print("OK")
+    return 1 if problems else 0
+
+
+def cmd_scan(args: argparse.Namespace) -> int:
+    """Add new cat images from local directories and update changed ones."""
+    with _catalog_write() as cat_manager:
+        result = cat_manager.scan_local_images(args.directories or None, args.workers)
+    print(
+        f"Added {result['added']}, updated {result['updated']}, removed {result['removed']}, "
+        f"unchanged {result['unchanged']} local images; the catalog has {cat_manager.count}"
+    )
+    return 0
+
+
+def cmd_hash(args: argparse.Namespace) -> int:
+    """Compute the perceptual hashes of cached cat images, downloading missing images first with --fetch."""
+    fetched = 0
+    if args.fetch:
+        from cat_manager import CatManager
+        from config import get_image_cache_dir
+        from image_cache import ImageCache
+
+        # Downloading does not change the catalog, so it runs before taking the write lock
+        cat_images, _ = CatManager.read_entries(with_metadata=False)
+        fetched = ImageCache(get_image_cache_dir()).fetch_all(cat_images, timeout=args.timeout)
+    with _catalog_write() as cat_manager:
+        hashed = cat_manager.update_image_hashes(args.workers)
+    print(f"Fetched {fetched} and hashed {hashed} cat images")
+    return 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    """Export every cat image with its metadata."""
+    import json
+
+    from cat_manager import CatManager
+
+    cat_images, metadata = CatManager.read_entries()
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    try:
+        if args.format == "csv":
+            import csv
+            writer = csv.writer(out)
+            writer.writerow(["index", "cat_url", "tags", "source", "added_at"])
+        for index, (url, entry) in enumerate(zip(cat_images, metadata)):
+            if args.format == "csv":
+                writer.writerow([index, url, " ".join(entry.get("tags", [])), entry.get("source"), entry.get("added_at")])
+            elif args.format == "jsonl":
+                out.write(json.dumps({"index": index, "cat_url": url, **entry}) + "\n")
+            else:
+                out.write(url + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(prog="catctl", description="Maintain the cat catalog.")
+    parser.add_argument("--settings", help="The settings file to use instead of settings.json.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("count", help="Print the number of cat images.")
+    command.set_defaults(func=cmd_count)
+
+    command = commands.add_parser("get", help="Print a cat image URL by index.")
+    command.add_argument("index", type=int)
+    command.add_argument("--json", action="store_true", help="Print the entry with its metadata as JSON.")
+    command.set_defaults(func=cmd_get)
+
+    command = commands.add_parser("add-bulk", help="Add cat image URLs from a file of \"URL [tag ...]\" lines.")
+    command.add_argument("file", help="The file to read, or - for stdin.")
+    command.add_argument("--tag", action="append", default=[], help="A tag for every added cat image.")
+    command.add_argument("--source", default="url", help="The source recorded for the cat images.")
+    command.add_argument("--skip-existing", action="store_true", help="Skip URLs already in the catalog.")
+    command.set_defaults(func=cmd_add_bulk)
+
+    command = commands.add_parser("compact", help="Rewrite the cache file and its sidecar files.")
+    command.set_defaults(func=cmd_compact)
+
+    command = commands.add_parser("verify", help="Check the cache file and its sidecar files.")
+    command.set_defaults(func=cmd_verify)
+
+    command = commands.add_parser("scan", help="Add cat images from local directories.")
+    command.add_argument("directories", nargs="*", help="The directories to scan. Defaults to local_image_dirs.")
+    command.add_argument("--workers", type=int, help="Worker processes for inspecting images. Defaults to the CPU count.")
+    command.set_defaults(func=cmd_scan)
+
+    command = commands.add_parser("hash", help="Compute perceptual hashes of cached cat images for near-duplicate detection.")
+    command.add_argument("--fetch", action="store_true", help="Download cat images that are not cached yet first.")
+    command.add_argument("--timeout", type=float, default=10.0, help="The download timeout in seconds.")
+    command.add_argument("--workers", type=int, help="Worker processes for hashing. Defaults to the CPU count.")
+    command.set_defaults(func=cmd_hash)
+
+    command = commands.add_parser("export", help="Export every cat image with its metadata.")
+    command.add_argument("--format", choices=["jsonl", "csv", "urls"], default="jsonl")
+    command.add_argument("--output", default="-", help="The file to write, or - for stdout.")
+    command.set_defaults(func=cmd_export)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run a catctl command."""
+    args = build_parser().parse_args(argv)
+    if args.settings:
+        os.environ["CAT_MCP_SETTINGS"] = os.path.abspath(args.settings)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
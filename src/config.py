@@ -3,16 +3,57 @@ Configuration module for the MCP Cat Server.
 """
 import json
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 # Default settings
 DEFAULT_SETTINGS = {
-    "cache_file_path": "cat_cache.json"  # Relative to project root by default
+    "cache_file_path": "cat_cache.json",  # Relative to project root by default
+    "image_cache_dir": "image_cache",  # Local copies of cat images, relative to project root
+    "event_log_dir": "event_log",  # Spilled interaction/break events, relative to project root
+    "state_db_path": "cat_state.db",  # State shared by HTTP worker processes, relative to project root
+    "profile_dir": "profiles",  # Profiles captured on demand, relative to project root
+    "recording_dir": "recordings",  # Recorded traffic, relative to project root
+    "local_image_dirs": [],  # Directories of cat images added by scans, relative to project root
+    "admission": {
+        "session_rate": None,  # Calls per second per session, None for no limit
+        "session_burst": None,  # Calls a session can make at once, defaults to session_rate
+        "tool_limits": {  # Per-session limits of individual tools
+            "add_cat": {"rate": 2.0, "burst": 10}
+        },
+        "global_tool_limits": {  # Limits of individual tools across all sessions of a process
+            "add_cat": {"rate": 10.0, "burst": 50}
+        },
+        "write_queue_size": 64  # Pending writes before callers are asked to retry later
+    },
+    "image_fetch": {
+        "on_add": False,  # Download images added by add_cat into the image cache, so they are hashed
+        "timeout": 10.0,  # Seconds to wait for a download
+        "max_bytes": 20 * 1024 * 1024,  # Largest image downloaded
+        "workers": 4  # Concurrent downloads, kept off the write queue
+    },
+    "image_server": {
+        "enabled": False,  # Serve cached images over HTTP and return their local URLs from show_cat
+        "host": "127.0.0.1",
+        "port": 8001,
+        "base_url": None  # URL clients reach the image server at, defaults to http://host:port
+    },
+    "recording": {
+        "enabled": False  # Record every tool call and resource read for replay
+    },
+    "profiling": {
+        "admin_tools": False,  # Register the start_profile and stop_profile tools
+        "admin_token": None,  # Bearer token HTTP clients must send to call the profiling tools
+        "max_seconds": 60,  # Longest allowed capture
+        "sample_interval": 0.005  # Seconds between stack samples in sampling mode
+    }
 }
 
+# Environment variable overriding the path to the settings file
+SETTINGS_PATH_ENV = "CAT_MCP_SETTINGS"
+
 def get_settings_path() -> str:
-    """Get the path to the settings file."""
-    return os.path.join(os.path.dirname(os.path.dirname(__file__)), "settings.json")
+    """Get the path to the settings file, which the CAT_MCP_SETTINGS environment variable overrides."""
+    return os.environ.get(SETTINGS_PATH_ENV) or os.path.join(os.path.dirname(os.path.dirname(__file__)), "settings.json")
 
 def load_settings() -> Dict[str, Any]:
     """Load settings from the settings file, or return default settings if the file doesn't exist."""
@@ -26,13 +67,89 @@ def load_settings() -> Dict[str, Any]:
         print(f"Error loading settings: {e}")
         return DEFAULT_SETTINGS
 
-def get_cache_file_path() -> str:
-    """Get the path to the cache file based on settings."""
+def _get_path_setting(key: str) -> str:
+    """Get a path setting, resolving relative paths against the project root."""
     settings = load_settings()
-    cache_file_path = settings.get("cache_file_path", DEFAULT_SETTINGS["cache_file_path"])
+    path = settings.get(key, DEFAULT_SETTINGS[key])
     
     # If the path is relative, make it relative to the project root
-    if not os.path.isabs(cache_file_path):
-        cache_file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), cache_file_path)
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.dirname(__file__)), path)
     
-    return cache_file_path
+    return path
+
+def get_cache_file_path() -> str:
+    """Get the path to the cache file based on settings."""
+    return _get_path_setting("cache_file_path")
+
+def get_image_cache_dir() -> str:
+    """Get the path to the local image cache directory based on settings."""
+    return _get_path_setting("image_cache_dir")
+
+def get_event_log_dir() -> str:
+    """Get the path to the event log spill directory based on settings."""
+    return _get_path_setting("event_log_dir")
+
+def get_state_db_path() -> str:
+    """Get the path to the shared state database based on settings."""
+    return _get_path_setting("state_db_path")
+
+def get_local_image_dirs() -> List[str]:
+    """Get the paths of the local image directories based on settings."""
+    settings = load_settings()
+    project_root = os.path.dirname(os.path.dirname(__file__))
+    return [
+        path if os.path.isabs(path) else os.path.join(project_root, path)
+        for path in settings.get("local_image_dirs", DEFAULT_SETTINGS["local_image_dirs"])
+    ]
+
+def get_image_fetch_settings() -> Dict[str, Any]:
+    """Get the image download settings, filling in defaults."""
+    settings = load_settings()
+    return {**DEFAULT_SETTINGS["image_fetch"], **settings.get("image_fetch", {})}
+
+def get_image_server_settings() -> Dict[str, Any]:
+    """Get the image server settings, filling in defaults."""
+    settings = load_settings()
+    return {**DEFAULT_SETTINGS["image_server"], **settings.get("image_server", {})}
+
+def get_profile_dir() -> str:
+    """Get the path to the profile output directory based on settings."""
+    return _get_path_setting("profile_dir")
+
+def get_profiling_settings() -> Dict[str, Any]:
+    """Get the on-demand profiling settings, filling in defaults."""
+    settings = load_settings()
+    return {**DEFAULT_SETTINGS["profiling"], **settings.get("profiling", {})}
+
+def get_recording_dir() -> str:
+    """Get the path to the traffic recording directory based on settings."""
+    return _get_path_setting("recording_dir")
+
+def get_recording_settings() -> Dict[str, Any]:
+    """Get the traffic recording settings, filling in defaults."""
+    settings = load_settings()
+    return {**DEFAULT_SETTINGS["recording"], **settings.get("recording", {})}
+
+def get_admission_settings() -> Dict[str, Any]:
+    """Get the rate limiting and write queue settings, filling in defaults."""
+    settings = load_settings()
+    return {**DEFAULT_SETTINGS["admission"], **settings.get("admission", {})}
+
+def get_sidecar_path(cache_file_path: str, name: str, ext: Optional[str] = None) -> str:
+    """
+    Get the path of a sidecar file stored next to the cache file.
+
+    For example, the "meta" sidecar of "cat_cache.json" is "cat_cache.meta.json".
+
+    Args:
+        cache_file_path: The path to the cache file.
+        name: The name of the sidecar.
+        ext: The file extension of the sidecar. Defaults to the extension
+            of the cache file.
+
+    Returns:
+        The path to the sidecar file.
+    """
+    base, cache_ext = os.path.splitext(cache_file_path)
+    return f"{base}.{name}{ext or cache_ext or '.json'}"
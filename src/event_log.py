@@ -0,0 +1,259 @@
+"""
+Event Log - A compact log of interaction and break events.
+"""
+import atexit
+import glob
+import os
+import struct
+import sys
+import time
+import uuid
+import weakref
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import compress
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Event types
+EVENT_INTERACTION = 0
+EVENT_BREAK_SUGGESTED = 1
+EVENT_BREAK_TAKEN = 2
+
+# Segment files start with a magic number, the event count and the time range
+SEGMENT_MAGIC = b"CATEVT01"
+SEGMENT_HEADER = struct.Struct("<8sIdd")
+
+# Translation table mapping break-taken events to 1 and other events to 0
+_BREAK_TAKEN_MASK = bytes(int(value == EVENT_BREAK_TAKEN) for value in range(256))
+
+# Event logs with a spill directory, flushed when the process exits
+_spilling_logs: "weakref.WeakSet[EventLog]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    """Write the buffered events of every spilling event log to disk."""
+    for event_log in list(_spilling_logs):
+        event_log.flush()
+
+
+def session_key(session_id: str) -> int:
+    """
+    Map a session id to the 32-bit key stored in the log.
+
+    The key is a CRC32 of the id, so every process maps the same session to
+    the same key without sharing a lookup table.
+
+    Args:
+        session_id: The session id.
+
+    Returns:
+        The session key.
+    """
+    return zlib.crc32(session_id.encode("utf-8"))
+
+
+class EventLog:
+    """
+    Records interaction and break events in array-backed columns.
+
+    Events are stored in three parallel arrays (timestamps, session keys and
+    event types) rather than as Python objects, which costs 13 bytes per
+    event. The in-memory buffer is bounded: when it is full, unspilled events
+    are written to an on-disk segment (if a spill directory is configured)
+    and the oldest half of the buffer is dropped. With a spill directory,
+    unspilled events are also written out when an event is recorded
+    flush_interval seconds after the last write, and when the process exits.
+    """
+
+    def __init__(self, capacity: int = 65536, spill_dir: Optional[str] = None, flush_interval: float = 60.0):
+        """
+        Initialize the event log.
+
+        Args:
+            capacity: The maximum number of events kept in memory.
+                Defaults to 65536.
+            spill_dir: The directory for on-disk segments. Defaults to None,
+                in which case evicted events are discarded.
+            flush_interval: The longest time in seconds that recorded events
+                stay in memory only. Defaults to 60.0.
+        """
+        self._capacity = max(2, capacity)
+        self._spill_dir = spill_dir
+        self._flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+        self._timestamps = array("d")
+        self._sessions = array("I")
+        self._types = bytearray()
+        self._spilled = 0  # Number of buffered events already written to disk
+        
+        # Names the segments of this log apart from those of other logs or worker processes
+        self._writer_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        if spill_dir is not None:
+            _spilling_logs.add(self)
+
+    @property
+    def count(self) -> int:
+        """
+        Get the number of events held in memory.
+
+        Returns:
+            The number of buffered events.
+        """
+        return len(self._timestamps)
+
+    def record(self, session_id: str, event_type: int, timestamp: Optional[float] = None) -> None:
+        """
+        Record an event.
+
+        Args:
+            session_id: The id of the session the event belongs to.
+            event_type: One of EVENT_INTERACTION, EVENT_BREAK_SUGGESTED or
+                EVENT_BREAK_TAKEN.
+            timestamp: The time of the event. Defaults to now.
+        """
+        if len(self._timestamps) >= self._capacity:
+            self._evict()
+
+        # Keep timestamps sorted even if the clock steps backwards
+        if timestamp is None:
+            timestamp = time.time()
+        if self._timestamps and timestamp < self._timestamps[-1]:
+            timestamp = self._timestamps[-1]
+
+        self._timestamps.append(timestamp)
+        self._sessions.append(session_key(session_id))
+        self._types.append(event_type)
+
+        if self._spill_dir is not None and time.monotonic() - self._last_flush >= self._flush_interval:
+            self.flush()
+
+    def _evict(self) -> None:
+        """Spill unspilled events and drop the oldest half of the buffer."""
+        self.flush()
+        drop = len(self._timestamps) // 2
+        del self._timestamps[:drop]
+        del self._sessions[:drop]
+        del self._types[:drop]
+        self._spilled -= drop
+
+    def flush(self) -> None:
+        """Write buffered events that are not on disk yet to a new segment."""
+        if self._spill_dir is None or self._spilled >= len(self._timestamps):
+            return
+        self._last_flush = time.monotonic()
+
+        start, end = self._spilled, len(self._timestamps)
+        timestamps = self._timestamps[start:end]
+        sessions = self._sessions[start:end]
+        if sys.byteorder != "little":
+            timestamps.byteswap()
+            sessions.byteswap()
+
+        try:
+            os.makedirs(self._spill_dir, exist_ok=True)
+            first, last = self._timestamps[start], self._timestamps[end - 1]
+            path = os.path.join(self._spill_dir, f"events-{first:.6f}-{self._writer_id}.seg")
+            with open(path + ".tmp", "wb") as f:
+                f.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, end - start, first, last))
+                f.write(timestamps.tobytes())
+                f.write(sessions.tobytes())
+                f.write(self._types[start:end])
+            os.replace(path + ".tmp", path)
+            self._spilled = end
+        except IOError as e:
+            print(f"Error writing event segment: {e}", file=sys.stderr)
+
+    def _read_segments(self, since: float, until: float) -> List[Tuple[array, array, bytes, bool]]:
+        """Read the columns of on-disk segments overlapping a time range, and whether this log wrote them."""
+        if self._spill_dir is None:
+            return []
+
+        own_suffix = f"-{self._writer_id}.seg"
+        segments = []
+        for path in sorted(glob.glob(os.path.join(self._spill_dir, "events-*.seg"))):
+            try:
+                with open(path, "rb") as f:
+                    magic, count, first, last = SEGMENT_HEADER.unpack(f.read(SEGMENT_HEADER.size))
+                    if magic != SEGMENT_MAGIC or last < since or first > until:
+                        continue
+                    timestamps = array("d")
+                    timestamps.frombytes(f.read(count * 8))
+                    sessions = array("I")
+                    sessions.frombytes(f.read(count * 4))
+                    types = f.read(count)
+            except (IOError, struct.error, ValueError) as e:
+                print(f"Error reading event segment {path}: {e}", file=sys.stderr)
+                continue
+
+            if sys.byteorder != "little":
+                timestamps.byteswap()
+                sessions.byteswap()
+            segments.append((timestamps, sessions, types, path.endswith(own_suffix)))
+        return segments
+
+    def stats(self, window_seconds: float, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Compute break-compliance aggregates over a recent time window.
+
+        Aggregates are computed over column slices with C-level operations
+        (bisection, bytes.count, set construction) rather than by iterating
+        over events in Python. On-disk segments overlapping the window are
+        included: those of other logs (such as other worker processes
+        sharing the spill directory) over the whole window, and those of
+        this log only before its in-memory buffer, which holds the rest.
+
+        Args:
+            window_seconds: The length of the window, ending now.
+            now: The end of the window. Defaults to the current time.
+
+        Returns:
+            A dictionary of event counts, active sessions and compliance
+            ratios for the window.
+        """
+        if now is None:
+            now = time.time()
+        since = now - window_seconds
+
+        # Columns of events on disk, then the in-memory buffer
+        columns = []
+        oldest_buffered = self._timestamps[0] if self._timestamps else now
+        for timestamps, sessions, types, own in self._read_segments(since, now):
+            if own:
+                # Events of this log that are still buffered are counted from the buffer
+                keep = bisect_left(timestamps, oldest_buffered)
+                columns.append((timestamps[:keep], sessions[:keep], types[:keep]))
+            else:
+                columns.append((timestamps, sessions, types))
+        columns.append((self._timestamps, self._sessions, self._types))
+
+        counts = [0, 0, 0]
+        sessions = set()
+        sessions_with_breaks = set()
+        for timestamps, session_column, types in columns:
+            start = bisect_left(timestamps, since)
+            end = bisect_right(timestamps, now)
+            window_types = bytes(types[start:end])
+            window_sessions = session_column[start:end]
+
+            for event_type in (EVENT_INTERACTION, EVENT_BREAK_SUGGESTED, EVENT_BREAK_TAKEN):
+                counts[event_type] += window_types.count(event_type)
+            sessions.update(window_sessions)
+
+            # Select the sessions of break-taken events with a byte mask
+            mask = window_types.translate(_BREAK_TAKEN_MASK)
+            sessions_with_breaks.update(compress(window_sessions, mask))
+
+        interactions, suggested, taken = counts
+        return {
+            "window_seconds": window_seconds,
+            "interactions": interactions,
+            "breaks_suggested": suggested,
+            "breaks_taken": taken,
+            "active_sessions": len(sessions),
+            "sessions_with_breaks": len(sessions_with_breaks),
+            "compliance_rate": taken / suggested if suggested else None,
+            "interactions_per_break": interactions / taken if taken else None
+        }
@@ -0,0 +1,206 @@
+"""
+Image Cache - Keeps local copies of cat images.
+"""
+import hashlib
+import os
+import sys
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+
+class ImageCache:
+    """
+    Keeps local copies of cat images in a directory.
+
+    Each image is stored under a file name derived from the SHA-256 of its
+    URL, keeping the original file extension, so the cached copy of a URL can
+    be located without any index.
+    """
+
+    # File extensions kept for cached images; anything else is stored as .img
+    IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp"}
+
+    # Largest download stored by default, and the size of each read of a download
+    MAX_BYTES = 20 * 1024 * 1024
+    READ_CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, cache_dir: str):
+        """
+        Initialize the image cache.
+
+        Args:
+            cache_dir: The directory holding the cached images.
+        """
+        self._cache_dir = cache_dir
+
+    @property
+    def cache_dir(self) -> str:
+        """
+        Get the directory holding the cached images.
+
+        Returns:
+            The path of the cache directory.
+        """
+        return self._cache_dir
+
+    def path_for(self, url: str) -> str:
+        """
+        Get the path where the cached copy of an image is stored.
+
+        Args:
+            url: The URL of the cat image.
+
+        Returns:
+            The path of the cached copy, whether or not it exists.
+        """
+        ext = os.path.splitext(urlparse(url).path)[1].lower()
+        if ext not in self.IMAGE_EXTENSIONS:
+            ext = ".img"
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self._cache_dir, digest + ext)
+
+    def get(self, url: str) -> Optional[str]:
+        """
+        Get the path of the cached copy of an image.
+
+        Args:
+            url: The URL of the cat image.
+
+        Returns:
+            The path of the cached copy, or None if the image is not cached.
+        """
+        path = self.path_for(url)
+        return path if os.path.isfile(path) else None
+
+    def store(self, url: str, data: bytes) -> str:
+        """
+        Store the contents of an image in the cache.
+
+        Args:
+            url: The URL of the cat image.
+            data: The image bytes.
+
+        Returns:
+            The path of the cached copy.
+        """
+        path = self.path_for(url)
+        os.makedirs(self._cache_dir, exist_ok=True)
+
+        # Write to a temporary file first so readers never see a partial image
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        return path
+
+    def link(self, url: str, source_path: str) -> Optional[str]:
+        """
+        Add a local image file to the cache as a symbolic link.
+
+        The linked file is hashed and served like a downloaded copy, and
+        changes to it show through the link.
+
+        Args:
+            url: The URL of the cat image, e.g. a file:// URL.
+            source_path: The absolute path of the image file.
+
+        Returns:
+            The path of the link, or None if it cannot be created.
+        """
+        path = self.path_for(url)
+        if os.path.islink(path) and os.readlink(path) == source_path:
+            return path
+
+        # Link under a temporary name first, so an existing entry is replaced atomically
+        temp_path = path + ".tmp"
+        try:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            if os.path.lexists(temp_path):
+                os.remove(temp_path)
+            os.symlink(source_path, temp_path)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error linking image {source_path}: {e}", file=sys.stderr)
+            return None
+        return path
+
+    def fetch(self, url: str, timeout: float = 10.0, max_bytes: Optional[int] = None) -> Optional[str]:
+        """
+        Download an image into the cache unless it is already cached.
+
+        Only http and https URLs are downloaded, and responses that are not
+        images are discarded. So are responses larger than max_bytes: a
+        Content-Length over the limit is rejected before reading, and the
+        body is read in chunks, stopping as soon as it exceeds the limit.
+
+        Args:
+            url: The URL of the cat image.
+            timeout: The download timeout in seconds. Defaults to 10.
+            max_bytes: The largest image downloaded. Defaults to MAX_BYTES.
+
+        Returns:
+            The path of the cached copy, or None if the download failed.
+        """
+        path = self.get(url)
+        if path is not None:
+            return path
+        if urlparse(url).scheme not in ("http", "https"):
+            return None
+        if max_bytes is None:
+            max_bytes = self.MAX_BYTES
+
+        # urllib.request pulls in ssl, so it is only imported when downloading
+        from urllib.request import urlopen
+
+        try:
+            with urlopen(url, timeout=timeout) as response:
+                content_type = response.headers.get_content_type()
+                if not content_type.startswith("image/"):
+                    print(f"Error fetching image {url}: not an image ({content_type})", file=sys.stderr)
+                    return None
+
+                length = response.headers.get("Content-Length")
+                if length is not None and int(length) > max_bytes:
+                    print(f"Error fetching image {url}: larger than {max_bytes} bytes ({length})", file=sys.stderr)
+                    return None
+
+                chunks = []
+                size = 0
+                while True:
+                    chunk = response.read(self.READ_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        print(f"Error fetching image {url}: larger than {max_bytes} bytes", file=sys.stderr)
+                        return None
+                    chunks.append(chunk)
+                return self.store(url, b"".join(chunks))
+        except (OSError, ValueError) as e:
+            print(f"Error fetching image {url}: {e}", file=sys.stderr)
+            return None
+
+    def fetch_all(self, urls: Iterable[str], timeout: float = 10.0, max_workers: int = 8) -> int:
+        """
+        Download every image that is not in the cache yet.
+
+        Downloads run in a thread pool, since they wait on the network.
+
+        Args:
+            urls: The URLs of the cat images.
+            timeout: The download timeout in seconds. Defaults to 10.
+            max_workers: The maximum number of concurrent downloads.
+                Defaults to 8.
+
+        Returns:
+            The number of newly cached images.
+        """
+        urls = [url for url in urls if self.get(url) is None]
+        if not urls:
+            return 0
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            paths = executor.map(lambda url: self.fetch(url, timeout), urls)
+            return sum(1 for path in paths if path is not None)
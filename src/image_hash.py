@@ -0,0 +1,299 @@
+"""
+Image Hash - Perceptual hashes for detecting near-duplicate cat images.
+"""
+import os
+import sys
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+# Pillow and NumPy are optional and slow to import, so they are imported on first use
+_NOT_LOADED = object()
+Image = _NOT_LOADED
+np = _NOT_LOADED
+
+
+# Hashes within this Hamming distance are considered near-duplicates
+DEFAULT_MAX_DISTANCE = 4
+
+# Below this many images, hashing in a worker pool costs more than it saves
+MIN_PARALLEL_BATCH = 16
+
+
+def _pillow():
+    """Get the Pillow Image module, or None if Pillow is not installed."""
+    global Image
+    if Image is _NOT_LOADED:
+        try:
+            from PIL import Image as pil_image
+        except ImportError:  # Pillow is optional; without it no hashes are computed
+            pil_image = None
+        Image = pil_image
+    return Image
+
+
+def _numpy():
+    """Get the NumPy module, or None if NumPy is not installed."""
+    global np
+    if np is _NOT_LOADED:
+        try:
+            import numpy
+        except ImportError:  # NumPy is optional; without it matching falls back to a scan
+            numpy = None
+        np = numpy
+    return np
+
+
+def dhash(path: str, hash_size: int = 8) -> Optional[int]:
+    """
+    Compute the difference hash (dHash) of an image file.
+
+    The image is reduced to a (hash_size + 1) x hash_size grayscale thumbnail
+    and each bit records whether a pixel is brighter than its right
+    neighbour. Re-encoded or resized copies of a photo hash to the same or
+    nearby values.
+
+    Args:
+        path: The path of the image file.
+        hash_size: The number of bits per row. Defaults to 8 (a 64-bit hash).
+
+    Returns:
+        The hash as an integer, or None if Pillow is not installed or the
+        image cannot be read.
+    """
+    if _pillow() is None:
+        return None
+
+    try:
+        with Image.open(path) as image:
+            thumbnail = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+            pixels = thumbnail.tobytes()
+    except (OSError, ValueError) as e:
+        print(f"Error hashing image {path}: {e}", file=sys.stderr)
+        return None
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """
+    Count the differing bits of two hashes.
+
+    Args:
+        a: The first hash.
+        b: The second hash.
+
+    Returns:
+        The Hamming distance between the hashes.
+    """
+    return bin(a ^ b).count("1")
+
+
+def compute_hashes(paths: Sequence[str], max_workers: Optional[int] = None) -> List[Optional[int]]:
+    """
+    Compute the perceptual hashes of several image files.
+
+    Large batches are hashed in a process pool, since decoding and resizing
+    images is CPU-bound.
+
+    Args:
+        paths: The paths of the image files.
+        max_workers: The maximum number of worker processes. Defaults to the
+            number of CPUs.
+
+    Returns:
+        The hashes in the same order as paths, with None for unreadable images.
+    """
+    if _pillow() is None:
+        return [None] * len(paths)
+
+    if len(paths) < MIN_PARALLEL_BATCH or max_workers == 1:
+        return [dhash(path) for path in paths]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(dhash, paths, chunksize=chunksize))
+
+
+def _popcount(values):
+    """Count the set bits of each element of a uint64 NumPy array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+class PerceptualHashIndex:
+    """
+    Stores the perceptual hashes of catalog entries for near-duplicate queries.
+
+    Hashes are kept as unsigned 64-bit integers in an array parallel to the
+    catalog, with a separate byte per entry recording whether a hash is
+    known. Queries compare against every stored hash at once using NumPy
+    when it is installed, and fall back to a Python scan otherwise.
+    """
+
+    def __init__(self):
+        """Initialize an empty hash index."""
+        self._hashes = array("Q")
+        self._present = bytearray()
+
+    @property
+    def count(self) -> int:
+        """
+        Get the number of catalog entries covered by the index.
+
+        Returns:
+            The number of entries, with or without a known hash.
+        """
+        return len(self._hashes)
+
+    def resize(self, count: int) -> None:
+        """
+        Grow or shrink the index to cover a number of catalog entries.
+
+        Args:
+            count: The number of catalog entries.
+        """
+        if count > len(self._hashes):
+            missing = count - len(self._hashes)
+            self._hashes.extend([0] * missing)
+            self._present.extend(bytes(missing))
+        else:
+            del self._hashes[count:]
+            del self._present[count:]
+
+    def get(self, index: int) -> Optional[int]:
+        """
+        Get the hash of a catalog entry.
+
+        Args:
+            index: The catalog index.
+
+        Returns:
+            The hash, or None if it is not known.
+        """
+        if 0 <= index < len(self._hashes) and self._present[index]:
+            return self._hashes[index]
+        return None
+
+    def set(self, index: int, value: Optional[int]) -> None:
+        """
+        Set the hash of a catalog entry, growing the index if needed.
+
+        Args:
+            index: The catalog index.
+            value: The hash, or None to mark it as unknown.
+        """
+        if index >= len(self._hashes):
+            self.resize(index + 1)
+        self._hashes[index] = value or 0
+        self._present[index] = value is not None
+
+    def find(
+        self,
+        value: int,
+        max_distance: int = DEFAULT_MAX_DISTANCE,
+        exclude: Optional[int] = None
+    ) -> List[Tuple[int, int]]:
+        """
+        Find catalog entries whose hash is close to a given hash.
+
+        Args:
+            value: The hash to compare against.
+            max_distance: The maximum Hamming distance of a match.
+                Defaults to DEFAULT_MAX_DISTANCE.
+            exclude: A catalog index to leave out of the results, e.g. the
+                entry the hash belongs to.
+
+        Returns:
+            (index, distance) pairs sorted by distance, then index.
+        """
+        if not self._hashes:
+            return []
+
+        if _numpy() is not None:
+            matches = self._find_vectorized(value, max_distance)
+        else:
+            matches = []
+            for index, stored in enumerate(self._hashes):
+                if self._present[index]:
+                    distance = hamming_distance(value, stored)
+                    if distance <= max_distance:
+                        matches.append((index, distance))
+
+        return sorted(
+            ((index, distance) for index, distance in matches if index != exclude),
+            key=lambda match: (match[1], match[0])
+        )
+
+    def _find_vectorized(self, value: int, max_distance: int) -> List[Tuple[int, int]]:
+        """Compare a hash against every stored hash using NumPy."""
+        hashes = np.frombuffer(self._hashes, dtype=np.uint64)
+        present = np.frombuffer(self._present, dtype=np.uint8)
+        distances = _popcount(hashes ^ np.uint64(value))
+        indexes = np.flatnonzero((distances <= max_distance) & (present != 0))
+        return [(int(index), int(distances[index])) for index in indexes]
+
+    def save(self, path: str) -> None:
+        """
+        Save the index to a binary file.
+
+        The file holds the hashes as little-endian 64-bit integers followed by
+        one presence byte per entry.
+
+        Args:
+            path: The path of the hash file.
+        """
+        hashes = array("Q", self._hashes)
+        if sys.byteorder != "little":
+            hashes.byteswap()
+
+        # Replace the file atomically, so a concurrent load never sees a partial write
+        try:
+            with open(path + ".tmp", "wb") as f:
+                f.write(hashes.tobytes())
+                f.write(self._present)
+            os.replace(path + ".tmp", path)
+        except IOError as e:
+            print(f"Error saving hash file: {e}", file=sys.stderr)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["PerceptualHashIndex"]:
+        """
+        Load an index from a binary file.
+
+        Args:
+            path: The path of the hash file.
+
+        Returns:
+            The loaded index, or None if the file is missing or invalid.
+        """
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except IOError as e:
+            print(f"Error loading hash file: {e}", file=sys.stderr)
+            return None
+
+        # Each entry takes 8 bytes of hash and 1 presence byte
+        count, remainder = divmod(len(data), 9)
+        if remainder:
+            print(f"Invalid data format in hash file: {path}", file=sys.stderr)
+            return None
+
+        index = cls()
+        index._hashes.frombytes(data[:count * 8])
+        if sys.byteorder != "little":
+            index._hashes.byteswap()
+        index._present = bytearray(data[count * 8:])
+        return index
@@ -0,0 +1,207 @@
+"""
+Image Server - Serves cached cat images over HTTP with zero-copy file responses.
+"""
+import mimetypes
+import os
+import re
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+
+# Cached images are named after the SHA-256 of their URL, so nothing else can be requested
+_IMAGE_PATH_PATTERN = re.compile(r"/images/([0-9a-f]{64}\.(?:jpg|jpeg|png|gif|webp|bmp|img))")
+
+_RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header.
+
+    Args:
+        header: The value of the Range header, e.g. "bytes=0-1023" or "bytes=-500".
+        size: The size of the file.
+
+    Returns:
+        The first and last byte positions of the range, or None if the
+        range cannot be satisfied.
+
+    Raises:
+        ValueError: If the header is not a single byte range.
+    """
+    match = _RANGE_PATTERN.fullmatch(header.strip())
+    if match is None or match.group(1) == match.group(2) == "":
+        raise ValueError(f"Unsupported range: {header}")
+
+    first, last = match.group(1), match.group(2)
+    if first == "":
+        # A suffix range covers the last bytes of the file
+        length = int(last)
+        if length == 0 or size == 0:
+            return None
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return None
+    return start, end
+
+
+class ImageRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles GET and HEAD requests for cached images.
+
+    File bodies are sent with socket.sendfile, which uses os.sendfile to copy
+    from the page cache to the socket without passing through Python.
+    Responses carry an ETag and Last-Modified, so clients can revalidate with
+    If-None-Match or If-Modified-Since, and single byte ranges are supported.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "CatImageServer/1.0"
+
+    # Set on subclasses by ImageServer
+    image_dir = ""
+
+    def do_GET(self) -> None:
+        """Serve an image."""
+        self._serve(send_body=True)
+
+    def do_HEAD(self) -> None:
+        """Serve the headers of an image."""
+        self._serve(send_body=False)
+
+    def log_message(self, format: str, *args) -> None:
+        """Do not log every request."""
+
+    def _send_empty(self, status: int, headers: Optional[dict] = None) -> None:
+        """Send a response without a body."""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _serve(self, send_body: bool) -> None:
+        """Serve an image, honouring conditional and range headers."""
+        match = _IMAGE_PATH_PATTERN.fullmatch(self.path.split("?", 1)[0])
+        if match is None:
+            self._send_empty(HTTPStatus.NOT_FOUND)
+            return
+
+        path = os.path.join(self.image_dir, match.group(1))
+        try:
+            f = open(path, "rb")
+        except OSError:
+            self._send_empty(HTTPStatus.NOT_FOUND)
+            return
+
+        with f:
+            stat = os.fstat(f.fileno())
+            size = stat.st_size
+            etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+            validators = {
+                "ETag": etag,
+                "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+                "Cache-Control": "public, max-age=86400"
+            }
+
+            if self._not_modified(etag, stat.st_mtime):
+                self._send_empty(HTTPStatus.NOT_MODIFIED, validators)
+                return
+
+            # Serve a range unless If-Range names an older version of the file
+            start, end = 0, size - 1
+            status = HTTPStatus.OK
+            range_header = self.headers.get("Range")
+            if range_header and self.headers.get("If-Range", etag) == etag:
+                try:
+                    byte_range = parse_range(range_header, size)
+                except ValueError:
+                    byte_range = (0, size - 1)
+                if byte_range is None:
+                    self._send_empty(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, {"Content-Range": f"bytes */{size}"})
+                    return
+                if byte_range != (0, size - 1):
+                    start, end = byte_range
+                    status = HTTPStatus.PARTIAL_CONTENT
+
+            self.send_response(status)
+            self.send_header("Content-Type", mimetypes.guess_type(path)[0] or "application/octet-stream")
+            self.send_header("Content-Length", str(end - start + 1))
+            self.send_header("Accept-Ranges", "bytes")
+            if status == HTTPStatus.PARTIAL_CONTENT:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            for name, value in validators.items():
+                self.send_header(name, value)
+            self.end_headers()
+
+            if send_body and end >= start:
+                self.wfile.flush()
+                self.connection.sendfile(f, start, end - start + 1)
+
+    def _not_modified(self, etag: str, mtime: float) -> bool:
+        """Check the conditional request headers against the current file."""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
+
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since is not None:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+
+class ImageServer:
+    """
+    An HTTP server for the image cache directory, running on a background thread.
+
+    Cached images are available at /images/<file name>, where the file name
+    is that of the cached copy (see ImageCache.path_for).
+    """
+
+    def __init__(self, image_dir: str, host: str = "127.0.0.1", port: int = 8001):
+        """
+        Initialize the image server.
+
+        Args:
+            image_dir: The image cache directory.
+            host: The host to listen on. Defaults to "127.0.0.1".
+            port: The port to listen on, or 0 for any free port.
+                Defaults to 8001.
+        """
+        handler = type("BoundImageRequestHandler", (ImageRequestHandler,), {"image_dir": image_dir})
+        self._httpd = ThreadingHTTPServer((host, port), handler)
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """
+        Get the base URL of the server.
+
+        Returns:
+            The URL the server listens on, e.g. "http://127.0.0.1:8001".
+        """
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> None:
+        """Start serving on a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="cat-image-server", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
@@ -0,0 +1,222 @@
+"""
+Local Images - Scans directories of cat images with an incremental index.
+"""
+import hashlib
+import os
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+from image_cache import ImageCache
+from image_hash import MIN_PARALLEL_BATCH, _pillow, dhash
+from snapshot import read_snapshot, write_snapshot
+
+
+# Files are read in blocks of this many bytes when computing their SHA-256
+_READ_BLOCK_SIZE = 1 << 20
+
+
+def inspect_image(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Compute the content hash, size, dimensions and perceptual hash of an image file.
+
+    Args:
+        path: The path of the image file.
+
+    Returns:
+        The SHA-256 of the file ("sha256"), its size in bytes ("bytes"), its
+        width and height in pixels, and its perceptual hash ("phash"), or
+        None if the file cannot be read. The dimensions and perceptual hash
+        are None if Pillow is not installed or cannot decode the image.
+    """
+    try:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(_READ_BLOCK_SIZE), b""):
+                digest.update(block)
+        stat = os.stat(path)
+    except OSError as e:
+        print(f"Error reading image {path}: {e}", file=sys.stderr)
+        return None
+
+    # Opening an image only reads its header, so the dimensions are cheap
+    width = height = None
+    image_module = _pillow()
+    if image_module is not None:
+        try:
+            with image_module.open(path) as image:
+                width, height = image.size
+        except (OSError, ValueError) as e:
+            print(f"Error reading image {path}: {e}", file=sys.stderr)
+
+    return {
+        "sha256": digest.hexdigest(),
+        "bytes": stat.st_size,
+        "width": width,
+        "height": height,
+        "phash": dhash(path) if width is not None else None
+    }
+
+
+def inspect_images(paths: Sequence[str], max_workers: Optional[int] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Inspect several image files.
+
+    Large batches are inspected in a process pool, since decoding images is
+    CPU-bound.
+
+    Args:
+        paths: The paths of the image files.
+        max_workers: The maximum number of worker processes. Defaults to the
+            number of CPUs.
+
+    Returns:
+        The results of inspect_image in the same order as paths.
+    """
+    if len(paths) < MIN_PARALLEL_BATCH or max_workers == 1:
+        return [inspect_image(path) for path in paths]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(inspect_image, paths, chunksize=chunksize))
+
+
+class LocalImageIndex:
+    """
+    Remembers the image files found in local directories.
+
+    Each file is recorded with the modification time and size it had when it
+    was inspected. A rescan only inspects files whose modification time or
+    size changed, so rescanning a large, mostly unchanged directory costs one
+    stat per file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the index, loading it from its file if it exists.
+
+        Args:
+            path: The path of the index file.
+        """
+        self._path = path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        """Load the index file, starting empty if it is missing or invalid."""
+        if not os.path.exists(self._path):
+            return
+
+        try:
+            data, _ = read_snapshot(self._path)
+        except (IOError, ValueError) as e:
+            print(f"Error loading local image index: {e}", file=sys.stderr)
+            return
+
+        if not isinstance(data, list) or not all(isinstance(entry, dict) and "path" in entry for entry in data):
+            print(f"Invalid data format in local image index: {self._path}", file=sys.stderr)
+            return
+        self._entries = {entry["path"]: entry for entry in data}
+
+    def save(self) -> None:
+        """Save the index file."""
+        try:
+            write_snapshot(self._path, [self._entries[path] for path in sorted(self._entries)])
+        except IOError as e:
+            print(f"Error saving local image index: {e}", file=sys.stderr)
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the recorded details of an image file.
+
+        Args:
+            path: The absolute path of the image file.
+
+        Returns:
+            The path, modification time ("mtime_ns"), size, SHA-256,
+            dimensions and perceptual hash recorded for the file, or None if
+            it is not in the index.
+        """
+        return self._entries.get(path)
+
+    @property
+    def count(self) -> int:
+        """
+        Get the number of image files in the index.
+
+        Returns:
+            The number of image files.
+        """
+        return len(self._entries)
+
+    def scan(self, directories: Sequence[str], max_workers: Optional[int] = None) -> Dict[str, List[str]]:
+        """
+        Scan directories for new, changed and removed image files.
+
+        Directories are scanned recursively. Files with one of the image
+        extensions of ImageCache are inspected if they are new or their
+        modification time or size changed. The index is saved if anything
+        changed.
+
+        Args:
+            directories: The directories to scan.
+            max_workers: The maximum number of worker processes used to
+                inspect images. Defaults to the number of CPUs.
+
+        Returns:
+            The absolute paths of the "added", "changed" and "removed" image
+            files, and of the "unchanged" ones.
+        """
+        found: Dict[str, os.stat_result] = {}
+        for directory in directories:
+            self._walk(os.path.abspath(directory), found)
+
+        result: Dict[str, List[str]] = {"added": [], "changed": [], "removed": [], "unchanged": []}
+        to_inspect = []
+        for path in sorted(found):
+            stat = found[path]
+            entry = self._entries.get(path)
+            if entry is None:
+                to_inspect.append(path)
+            elif entry["mtime_ns"] != stat.st_mtime_ns or entry["bytes"] != stat.st_size:
+                to_inspect.append(path)
+            else:
+                result["unchanged"].append(path)
+
+        for path, details in zip(to_inspect, inspect_images(to_inspect, max_workers)):
+            if details is None:
+                # Unreadable files are retried on the next scan
+                continue
+            result["changed" if path in self._entries else "added"].append(path)
+            self._entries[path] = {"path": path, "mtime_ns": found[path].st_mtime_ns, **details}
+
+        # Forget files that were deleted from the scanned directories
+        roots = [os.path.join(os.path.abspath(directory), "") for directory in directories]
+        for path in list(self._entries):
+            if path not in found and any(path.startswith(root) for root in roots):
+                del self._entries[path]
+                result["removed"].append(path)
+
+        if result["added"] or result["changed"] or result["removed"]:
+            self.save()
+        return result
+
+    @staticmethod
+    def _walk(directory: str, found: Dict[str, os.stat_result]) -> None:
+        """Collect the image files under a directory with their stat results."""
+        try:
+            entries = list(os.scandir(directory))
+        except OSError as e:
+            print(f"Error scanning directory {directory}: {e}", file=sys.stderr)
+            return
+
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    LocalImageIndex._walk(entry.path, found)
+                elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in ImageCache.IMAGE_EXTENSIONS:
+                    found[entry.path] = entry.stat()
+            except OSError as e:
+                print(f"Error scanning {entry.path}: {e}", file=sys.stderr)
@@ -0,0 +1,396 @@
+"""
+Profiler - On-demand CPU and memory profiling of a running server.
+"""
+import cProfile
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# Capture modes
+MODE_SAMPLING = "sampling"
+MODE_CPROFILE = "cprofile"
+
+# Hot spots are reported for functions defined in this directory
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Number of frames kept per allocation when tracing memory
+TRACEMALLOC_FRAMES = 25
+
+
+class Profiler:
+    """
+    Captures a bounded CPU profile and memory snapshot of the running process.
+
+    Two CPU capture modes are supported. Sampling mode records the stacks of
+    all threads at a fixed interval from a background thread, costs little
+    and writes folded stacks (one "frame;frame;frame count" line per stack,
+    the input format of flame graph tools). cProfile mode records every call
+    made by the thread that starts the capture and writes a pstats file.
+    Either mode can also trace memory allocations and dump a tracemalloc
+    snapshot.
+
+    Only one capture runs at a time, and every capture is limited to
+    max_seconds.
+    """
+
+    def __init__(self, output_dir: str, max_seconds: float = 60.0, sample_interval: float = 0.005):
+        """
+        Initialize the profiler.
+
+        Args:
+            output_dir: The directory the capture files are written to.
+            max_seconds: The maximum length of a capture. Defaults to 60.
+            sample_interval: Seconds between stack samples in sampling mode.
+                Defaults to 0.005.
+        """
+        self._output_dir = output_dir
+        self._max_seconds = max_seconds
+        self._sample_interval = sample_interval
+        self._lock = threading.Lock()
+        self._capture: Optional[Dict[str, Any]] = None
+        self._finishing = False
+        self._last_report: Optional[Dict[str, Any]] = None
+
+    @property
+    def active(self) -> bool:
+        """
+        Check whether a capture is running.
+
+        Returns:
+            True if a capture is running, False otherwise.
+        """
+        return self._capture is not None
+
+    @property
+    def last_report(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the report of the last completed capture.
+
+        Returns:
+            The report, or None if no capture has completed.
+        """
+        return self._last_report
+
+    def start(
+        self,
+        mode: str = MODE_SAMPLING,
+        seconds: float = 10.0,
+        trace_memory: bool = True,
+        callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Start a capture.
+
+        A sampling capture stops by itself after the given number of seconds.
+        A cProfile capture only records the calling thread, so it must be
+        stopped from that thread; the deadline is returned for the caller to
+        schedule the stop.
+
+        Args:
+            mode: MODE_SAMPLING or MODE_CPROFILE. Defaults to MODE_SAMPLING.
+            seconds: The length of the capture, capped at max_seconds.
+                Defaults to 10.
+            trace_memory: Whether to trace memory allocations. Defaults to True.
+            callback: A function called with the report when the capture stops.
+
+        Returns:
+            The mode, length and deadline of the capture.
+
+        Raises:
+            ValueError: If the mode is unknown.
+            RuntimeError: If a capture is already running.
+        """
+        if mode not in (MODE_SAMPLING, MODE_CPROFILE):
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        seconds = max(0.0, min(float(seconds), self._max_seconds))
+
+        with self._lock:
+            if self._capture is not None or self._finishing:
+                raise RuntimeError("A profile capture is already running")
+
+            started_at = time.time()
+            capture = {
+                "mode": mode,
+                "seconds": seconds,
+                "started_at": started_at,
+                "deadline": started_at + seconds,
+                "callback": callback,
+                "trace_memory": trace_memory and not tracemalloc.is_tracing(),
+                "stop": threading.Event()
+            }
+            if capture["trace_memory"]:
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+
+            if mode == MODE_CPROFILE:
+                capture["profile"] = cProfile.Profile()
+                capture["profile"].enable()
+            else:
+                capture["samples"] = Counter()
+                capture["thread"] = threading.Thread(
+                    target=self._sample, args=(capture,), name="cat-profiler", daemon=True
+                )
+                capture["thread"].start()
+            self._capture = capture
+
+        return {"mode": mode, "seconds": seconds, "deadline": capture["deadline"]}
+
+    def stop(self) -> Dict[str, Any]:
+        """
+        Stop the running capture and write its files.
+
+        Returns:
+            The report of the capture: its mode, length, output files, CPU
+            hot spots and top memory allocation sites in the server modules.
+
+        Raises:
+            RuntimeError: If no capture is running.
+        """
+        with self._lock:
+            capture = self._capture
+            if capture is None:
+                raise RuntimeError("No profile capture is running")
+            self._capture = None
+            self._finishing = True
+            capture["stop"].set()
+
+        # The sampler thread may be stopping itself, so wait for it without the lock
+        try:
+            if capture["mode"] == MODE_CPROFILE:
+                capture["profile"].disable()
+            elif capture["thread"] is not threading.current_thread():
+                capture["thread"].join()
+
+            snapshot = None
+            if capture["trace_memory"]:
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+
+            report = self._write_report(capture, snapshot)
+            self._last_report = report
+        finally:
+            with self._lock:
+                self._finishing = False
+
+        if capture["callback"] is not None:
+            capture["callback"](report)
+        return report
+
+    def stop_if_expired(self) -> Optional[Dict[str, Any]]:
+        """
+        Stop the running capture if its deadline has passed.
+
+        Returns:
+            The report of the capture, or None if no capture was stopped.
+        """
+        capture = self._capture
+        if capture is None or time.time() < capture["deadline"]:
+            return None
+        try:
+            return self.stop()
+        except RuntimeError:
+            return None
+
+    def _sample(self, capture: Dict[str, Any]) -> None:
+        """Record the stacks of all other threads until the capture ends."""
+        samples = capture["samples"]
+        own_id = threading.get_ident()
+        while not capture["stop"].wait(self._sample_interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    samples[_stack(frame)] += 1
+            if time.time() >= capture["deadline"]:
+                break
+
+        # Stop the capture once the deadline has passed, unless it was stopped already
+        with self._lock:
+            expired = self._capture is capture
+        if expired:
+            try:
+                self.stop()
+            except RuntimeError:
+                pass
+
+    def _write_report(self, capture: Dict[str, Any], snapshot: Optional[tracemalloc.Snapshot]) -> Dict[str, Any]:
+        """Write the capture files and summarize the capture."""
+        base = os.path.join(
+            self._output_dir,
+            f"profile-{time.strftime('%Y%m%d-%H%M%S', time.localtime(capture['started_at']))}-{os.getpid()}"
+        )
+        files = []
+        hot_spots: List[Dict[str, Any]] = []
+        memory: List[Dict[str, Any]] = []
+
+        try:
+            os.makedirs(self._output_dir, exist_ok=True)
+            if capture["mode"] == MODE_CPROFILE:
+                capture["profile"].dump_stats(base + ".pstats")
+                files.append(base + ".pstats")
+                hot_spots = _cprofile_hot_spots(pstats.Stats(capture["profile"]))
+            else:
+                with open(base + ".folded", "w") as f:
+                    for stack, count in capture["samples"].items():
+                        f.write(";".join(name for name, _ in stack) + f" {count}\n")
+                files.append(base + ".folded")
+                hot_spots = _sampling_hot_spots(capture["samples"])
+
+            if snapshot is not None:
+                snapshot.dump(base + ".tracemalloc")
+                files.append(base + ".tracemalloc")
+                memory = _memory_hot_spots(snapshot)
+        except IOError as e:
+            print(f"Error writing profile: {e}", file=sys.stderr)
+
+        return {
+            "mode": capture["mode"],
+            "seconds": round(time.time() - capture["started_at"], 3),
+            "files": files,
+            "hot_spots": hot_spots,
+            "memory": memory
+        }
+
+
+_source_files: Dict[str, bool] = {}
+
+
+def _is_source_file(filename: str) -> bool:
+    """Check whether a file belongs to the server modules."""
+    result = _source_files.get(filename)
+    if result is None:
+        result = os.path.dirname(os.path.abspath(filename)) == SOURCE_DIR
+        _source_files[filename] = result
+    return result
+
+
+def _stack(frame) -> Tuple[Tuple[str, Tuple[str, int, str]], ...]:
+    """Convert a frame into a root-first tuple of (name, location) pairs."""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        location = (code.co_filename, code.co_firstlineno, code.co_name)
+        stack.append((f"{os.path.basename(code.co_filename)}:{code.co_name}", location))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+def _sampling_hot_spots(samples: Counter, top: int = 20) -> List[Dict[str, Any]]:
+    """Rank server functions by the share of samples they appear in."""
+    total = sum(samples.values())
+    inclusive: Counter = Counter()
+    exclusive: Counter = Counter()
+    for stack, count in samples.items():
+        for location in {location for _, location in stack}:
+            if _is_source_file(location[0]):
+                inclusive[location] += count
+        if stack and _is_source_file(stack[-1][1][0]):
+            exclusive[stack[-1][1]] += count
+
+    return [
+        {
+            "function": function,
+            "file": os.path.basename(filename),
+            "line": line,
+            "samples": count,
+            "self_samples": exclusive[(filename, line, function)],
+            "share": round(count / total, 4)
+        }
+        for (filename, line, function), count in inclusive.most_common(top)
+    ]
+
+
+def _cprofile_hot_spots(stats: pstats.Stats, top: int = 20) -> List[Dict[str, Any]]:
+    """Rank server functions by cumulative time."""
+    entries = [
+        (filename, line, function, calls, total_time, cumulative_time)
+        for (filename, line, function), (_, calls, total_time, cumulative_time, _) in stats.stats.items()
+        if _is_source_file(filename)
+    ]
+    entries.sort(key=lambda entry: entry[5], reverse=True)
+    return [
+        {
+            "function": function,
+            "file": os.path.basename(filename),
+            "line": line,
+            "calls": calls,
+            "total_time": round(total_time, 6),
+            "cumulative_time": round(cumulative_time, 6)
+        }
+        for filename, line, function, calls, total_time, cumulative_time in entries[:top]
+    ]
+
+
+def _memory_hot_spots(snapshot: tracemalloc.Snapshot, top: int = 20) -> List[Dict[str, Any]]:
+    """Rank server source lines by the memory allocated under them."""
+    sizes: Counter = Counter()
+    counts: Counter = Counter()
+    for trace in snapshot.traces:
+        # Attribute each allocation to the most recent server frame
+        for frame in reversed(trace.traceback):
+            if _is_source_file(frame.filename):
+                sizes[(frame.filename, frame.lineno)] += trace.size
+                counts[(frame.filename, frame.lineno)] += 1
+                break
+
+    return [
+        {
+            "file": os.path.basename(filename),
+            "line": line,
+            "size_kb": round(size / 1024, 1),
+            "count": counts[(filename, line)]
+        }
+        for (filename, line), size in sizes.most_common(top)
+    ]
+
+
+def install_signal_handler(profiler: Profiler, seconds: float = 10.0, signum: Optional[int] = None) -> bool:
+    """
+    Toggle a sampling capture when the process receives a signal.
+
+    The first signal starts a capture of the given length; a second signal
+    stops it early. A summary of the report is printed to stderr, since
+    stdout carries the stdio transport.
+
+    Args:
+        profiler: The profiler to control.
+        seconds: The length of a capture. Defaults to 10.
+        signum: The signal to handle. Defaults to SIGUSR1.
+
+    Returns:
+        True if the handler was installed, False if the platform has no such
+        signal or the caller is not the main thread.
+    """
+    if signum is None:
+        signum = getattr(signal, "SIGUSR1", None)
+        if signum is None:
+            return False
+
+    def print_report(report: Dict[str, Any]) -> None:
+        print(f"Profile written to {', '.join(report['files'])}", file=sys.stderr)
+        for spot in report["hot_spots"][:10]:
+            print(f"  {spot['share']:7.2%}  {spot['file']}:{spot['line']} {spot['function']}", file=sys.stderr)
+
+    def toggle() -> None:
+        try:
+            if profiler.active:
+                profiler.stop()
+            else:
+                profiler.start(MODE_SAMPLING, seconds, callback=print_report)
+        except RuntimeError as e:
+            print(f"Error toggling profile: {e}", file=sys.stderr)
+
+    def handle_signal(signum, frame) -> None:
+        # Signal handlers interrupt the main thread, so do the work elsewhere
+        threading.Thread(target=toggle, name="cat-profiler-signal", daemon=True).start()
+
+    try:
+        signal.signal(signum, handle_signal)
+    except ValueError:
+        return False
+    return True
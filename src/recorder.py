@@ -0,0 +1,251 @@
+"""
+Traffic Recorder - Records tool calls and resource reads so they can be replayed.
+"""
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# Kinds of recorded calls
+KIND_TOOL = "tool"
+KIND_RESOURCE = "resource"
+
+# Version of the recording format, stored in the header line
+RECORDING_VERSION = 1
+
+# Recordings are JSON lines with single-letter keys, since a busy server
+# writes one line per call
+_KIND_CODES = {KIND_TOOL: "t", KIND_RESOURCE: "r"}
+_KINDS = {code: kind for kind, code in _KIND_CODES.items()}
+
+
+class TrafficRecorder:
+    """
+    Records every tool call and resource read of a server to a file.
+
+    The first line of a recording is a header with the format version, the
+    wall-clock start time and the process id. Each following line is one call:
+
+        {"t": 1.234567, "k": "t", "n": "show_cat", "a": {"index": 3}, "s": "default", "l": 0.412}
+
+    where "t" is the start of the call in seconds since the recording started,
+    "k" the kind ("t" for tools, "r" for resources), "n" the tool name or
+    resource URI template, "a" the arguments, "s" the session id and "l" the
+    latency in milliseconds. Failed calls also have "e", the exception type.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the traffic recorder.
+
+        The file is created when the first call is recorded.
+
+        Args:
+            path: The path of the recording.
+        """
+        self._path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self._started_at = time.time()
+        self._started_perf = time.perf_counter()
+
+    @property
+    def path(self) -> str:
+        """
+        Get the path of the recording.
+
+        Returns:
+            The path of the recording.
+        """
+        return self._path
+
+    def record(
+        self,
+        kind: str,
+        name: str,
+        args: Dict[str, Any],
+        session_id: str,
+        started: float,
+        latency: float,
+        error: Optional[str] = None
+    ) -> None:
+        """
+        Record a call.
+
+        Args:
+            kind: KIND_TOOL or KIND_RESOURCE.
+            name: The tool name or resource URI template.
+            args: The JSON-serializable arguments of the call.
+            session_id: The id of the session making the call.
+            started: The time.perf_counter() value at the start of the call.
+            latency: The length of the call in seconds.
+            error: The exception type if the call failed. Defaults to None.
+        """
+        line = {
+            "t": round(started - self._started_perf, 6),
+            "k": _KIND_CODES[kind],
+            "n": name,
+            "a": args,
+            "s": session_id,
+            "l": round(latency * 1000, 3)
+        }
+        if error is not None:
+            line["e"] = error
+        encoded = json.dumps(line, separators=(",", ":"), default=str) + "\n"
+
+        with self._lock:
+            try:
+                if self._file is None:
+                    self._open()
+                self._file.write(encoded)
+            except IOError as e:
+                print(f"Error recording traffic: {e}", file=sys.stderr)
+
+    def _open(self) -> None:
+        """Create the recording and write its header."""
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Line buffered, so a killed server loses at most the call in flight
+        self._file = open(self._path, "w", buffering=1)
+        self._file.write(json.dumps({
+            "v": RECORDING_VERSION,
+            "start": self._started_at,
+            "pid": os.getpid()
+        }, separators=(",", ":")) + "\n")
+
+    def wrap(
+        self,
+        kind: str,
+        name: str,
+        fn: Callable,
+        session_of: Callable[[Dict[str, Any]], str]
+    ) -> Callable:
+        """
+        Wrap a tool or resource function so its calls are recorded.
+
+        The wrapper keeps the name, docstring and signature of the function,
+        so FastMCP registers it exactly like the function itself.
+
+        Args:
+            kind: KIND_TOOL or KIND_RESOURCE.
+            name: The tool name or resource URI template.
+            fn: The function to wrap.
+            session_of: Maps the bound arguments of a call, including the
+                context argument if there is one, to the session id.
+
+        Returns:
+            The wrapped function.
+        """
+        signature = inspect.signature(fn)
+
+        def before(args: tuple, kwargs: dict) -> Tuple[Dict[str, Any], str]:
+            bound = signature.bind_partial(*args, **kwargs).arguments
+            session_id = session_of(bound)
+            return {key: value for key, value in bound.items() if key != "ctx"}, session_id
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                call_args, session_id = before(args, kwargs)
+                started = time.perf_counter()
+                try:
+                    result = await fn(*args, **kwargs)
+                except Exception as e:
+                    self.record(kind, name, call_args, session_id, started, time.perf_counter() - started, type(e).__name__)
+                    raise
+                self.record(kind, name, call_args, session_id, started, time.perf_counter() - started)
+                return result
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                call_args, session_id = before(args, kwargs)
+                started = time.perf_counter()
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception as e:
+                    self.record(kind, name, call_args, session_id, started, time.perf_counter() - started, type(e).__name__)
+                    raise
+                self.record(kind, name, call_args, session_id, started, time.perf_counter() - started)
+                return result
+
+        return wrapper
+
+    def close(self) -> None:
+        """Close the recording."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_recording(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Read a recording.
+
+    Args:
+        path: The path of the recording.
+
+    Returns:
+        The header, with the format version ("version"), start time ("start")
+        and process id ("pid"), and the calls. Each call has "offset" (seconds
+        since the start), "kind", "name", "args", "session", "latency_ms" and
+        "error" (None unless the call failed).
+
+    Raises:
+        IOError: If the recording cannot be read.
+        ValueError: If the file is not a recording of a supported version.
+    """
+    with open(path, "r") as f:
+        header = json.loads(f.readline() or "null")
+        if not isinstance(header, dict) or header.get("v") != RECORDING_VERSION:
+            raise ValueError(f"Not a traffic recording: {path}")
+
+        calls = []
+        for line in f:
+            if not line.strip():
+                continue
+            call = json.loads(line)
+            calls.append({
+                "offset": call["t"],
+                "kind": _KINDS[call["k"]],
+                "name": call["n"],
+                "args": call["a"],
+                "session": call["s"],
+                "latency_ms": call["l"],
+                "error": call.get("e")
+            })
+
+    return {"version": header["v"], "start": header["start"], "pid": header.get("pid")}, calls
+
+
+def read_recordings(paths: List[str]) -> List[Dict[str, Any]]:
+    """
+    Read and merge recordings, such as those of several worker processes.
+
+    Args:
+        paths: The paths of the recordings.
+
+    Returns:
+        The calls of all recordings in order of their start time, with
+        offsets relative to the start of the earliest recording.
+    """
+    recordings = [read_recording(path) for path in paths]
+    if not recordings:
+        return []
+
+    first_start = min(header["start"] for header, _ in recordings)
+    calls = []
+    for header, recording_calls in recordings:
+        shift = header["start"] - first_start
+        for call in recording_calls:
+            call["offset"] = round(call["offset"] + shift, 6)
+            calls.append(call)
+    calls.sort(key=lambda call: call["offset"])
+    return calls
@@ -0,0 +1,274 @@
+"""
+Replay - Re-drives recorded traffic against a cat server and reports latencies.
+
+Calls from one or more recordings (see recorder.py) are sent at their
+recorded offsets, divided by the speed, to an in-process server or to a
+server started over stdio. The report gives the p50 and p95 latency of each
+tool and resource, and can be saved and compared with the report of another
+build.
+
+Replay runs add_cat calls too, so point the server at a scratch catalog with
+--settings.
+
+Usage:
+    python src/replay.py recordings/traffic-*.jsonl --speed 10 --save before.json
+    python src/replay.py recordings/traffic-*.jsonl --speed 10 --compare before.json
+    python src/replay.py recording.jsonl --speed 0 --target stdio --command "python src/server.py"
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import shlex
+import sys
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncContextManager, Callable, Dict, List, Optional
+
+from recorder import KIND_TOOL, read_recordings
+
+
+TARGET_IN_PROCESS = "in-process"
+TARGET_STDIO = "stdio"
+
+
+def resource_uri(name: str, args: Dict[str, Any]) -> str:
+    """
+    Get the URI of a recorded resource read.
+
+    Args:
+        name: The resource URI template, e.g. "cat://{index}".
+        args: The arguments of the read.
+
+    Returns:
+        The resource URI, e.g. "cat://3".
+    """
+    return name.format(**args)
+
+
+async def _send(session, call: Dict[str, Any]) -> Dict[str, Any]:
+    """Send a recorded call and measure its latency."""
+    started = time.perf_counter()
+    error = None
+    try:
+        if call["kind"] == KIND_TOOL:
+            result = await session.call_tool(call["name"], call["args"])
+            if result.isError:
+                error = "ToolError"
+        else:
+            await session.read_resource(resource_uri(call["name"], call["args"]))
+    except Exception as e:
+        error = type(e).__name__
+    return {
+        "name": call["name"],
+        "latency_ms": (time.perf_counter() - started) * 1000,
+        "recorded_latency_ms": call["latency_ms"],
+        "error": error
+    }
+
+
+async def replay(
+    calls: List[Dict[str, Any]],
+    connect: Callable[[], AsyncContextManager],
+    speed: float = 1.0,
+    split_sessions: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Replay recorded calls.
+
+    Args:
+        calls: The calls, as returned by read_recordings.
+        connect: Opens a client session to the server.
+        speed: How much faster than recorded to send the calls, e.g. 10 for
+            ten times as fast. With 0, each call is sent when the previous
+            one has completed. Defaults to 1.0.
+        split_sessions: Whether to open a client session per recorded
+            session, so the server tracks breaks per session as it did
+            when recording. Defaults to True.
+
+    Returns:
+        The name, replayed latency, recorded latency and error of each call,
+        in the order of the calls.
+    """
+    async with AsyncExitStack() as stack:
+        sessions = {}
+
+        async def get_session(session_id: str):
+            key = session_id if split_sessions else "default"
+            if key not in sessions:
+                sessions[key] = await stack.enter_async_context(connect())
+            return sessions[key]
+
+        # Open every session up front, so connecting does not count as latency
+        for call in calls:
+            await get_session(call["session"])
+
+        if speed <= 0:
+            return [await _send(await get_session(call["session"]), call) for call in calls]
+
+        start = time.perf_counter()
+        tasks = []
+        for call in calls:
+            delay = start + call["offset"] / speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(_send(await get_session(call["session"]), call)))
+        return list(await asyncio.gather(*tasks))
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Get the nearest-rank percentile of a non-empty list of values."""
+    values = sorted(values)
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Summarize replayed latencies by tool or resource.
+
+    Args:
+        results: The results of replay.
+
+    Returns:
+        The call count, error count, replayed p50 and p95 latency and
+        recorded p50 latency in milliseconds, by tool name or resource URI
+        template.
+    """
+    by_name: Dict[str, List[Dict[str, Any]]] = {}
+    for result in results:
+        by_name.setdefault(result["name"], []).append(result)
+
+    summary = {}
+    for name, name_results in sorted(by_name.items()):
+        latencies = [result["latency_ms"] for result in name_results]
+        summary[name] = {
+            "count": len(name_results),
+            "errors": sum(1 for result in name_results if result["error"]),
+            "p50_ms": round(_percentile(latencies, 50), 3),
+            "p95_ms": round(_percentile(latencies, 95), 3),
+            "recorded_p50_ms": round(_percentile([result["recorded_latency_ms"] for result in name_results], 50), 3)
+        }
+    return summary
+
+
+def format_report(summary: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+    """
+    Format a latency summary as a table.
+
+    Args:
+        summary: The summary of this replay.
+        baseline: The summary of a replay of another build to compare with.
+            Defaults to None.
+
+    Returns:
+        The table. With a baseline, it shows the baseline p50 and p95 and the
+        change of each.
+    """
+    header = f"{'name':<24} {'count':>6} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'rec p50':>9}"
+    if baseline is not None:
+        header += f" {'base p50':>9} {'base p95':>9} {'d p50':>8} {'d p95':>8}"
+    lines = [header]
+
+    for name, stats in summary.items():
+        line = (
+            f"{name:<24} {stats['count']:>6} {stats['errors']:>6} "
+            f"{stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f} {stats['recorded_p50_ms']:>9.3f}"
+        )
+        base = (baseline or {}).get(name)
+        if base is not None:
+            line += (
+                f" {base['p50_ms']:>9.3f} {base['p95_ms']:>9.3f}"
+                f" {_change(stats['p50_ms'], base['p50_ms']):>8} {_change(stats['p95_ms'], base['p95_ms']):>8}"
+            )
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _change(value: float, base: float) -> str:
+    """Format the relative change from a baseline value."""
+    if base == 0:
+        return "n/a"
+    return f"{(value - base) / base * 100:+.1f}%"
+
+
+def in_process_target() -> Callable[[], AsyncContextManager]:
+    """
+    Create a server in this process and connect to it in memory.
+
+    Returns:
+        The connect function for replay.
+    """
+    from mcp.shared.memory import create_connected_server_and_client_session
+    from server import CatServer
+
+    server = CatServer()
+    return lambda: create_connected_server_and_client_session(server.mcp)
+
+
+def stdio_target(command: str) -> Callable[[], AsyncContextManager]:
+    """
+    Start a server with a command and connect to it over stdio.
+
+    A stdio server serves a single client, so every connection starts its
+    own server process.
+
+    Args:
+        command: The command starting the server, e.g. "python src/server.py".
+
+    Returns:
+        The connect function for replay.
+    """
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    argv = shlex.split(command)
+
+    @asynccontextmanager
+    async def connect():
+        params = StdioServerParameters(command=argv[0], args=argv[1:], env=dict(os.environ))
+        async with stdio_client(params) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                yield session
+
+    return connect
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Replay recordings and report latencies."""
+    parser = argparse.ArgumentParser(prog="replay", description="Replay recorded traffic against a cat server.")
+    parser.add_argument("recordings", nargs="+", help="The recordings to replay.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Speed-up over the recorded timing, or 0 to send calls back to back.")
+    parser.add_argument("--target", choices=[TARGET_IN_PROCESS, TARGET_STDIO], default=TARGET_IN_PROCESS)
+    parser.add_argument("--command", default=f"{shlex.quote(sys.executable)} src/server.py", help="The command starting a stdio server.")
+    parser.add_argument("--settings", help="The settings file of the server, e.g. one pointing at a scratch catalog.")
+    parser.add_argument("--save", help="Write the latency summary to this file.")
+    parser.add_argument("--compare", help="Compare with a latency summary saved from another build.")
+    args = parser.parse_args(argv)
+
+    if args.settings:
+        os.environ["CAT_MCP_SETTINGS"] = os.path.abspath(args.settings)
+
+    calls = read_recordings(args.recordings)
+    if args.target == TARGET_STDIO:
+        # One stdio server per session would not share a catalog or event log, so use one connection
+        results = asyncio.run(replay(calls, stdio_target(args.command), args.speed, split_sessions=False))
+    else:
+        results = asyncio.run(replay(calls, in_process_target(), args.speed))
+
+    summary = summarize(results)
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+    print(format_report(summary, baseline))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
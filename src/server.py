@@ -1,15 +1,41 @@
 """
 MCP Cat Server - A server to remind programmers to take breaks by showing cat images.
 """
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import sys
 import time
-from typing import Dict, Any, Optional, List
+import uuid
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional, List, Tuple
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
+from pydantic import AnyUrl
 
 
 # Fallback to local imports when running directly
+from admission import AdmissionController
 from cat_manager import CatManager
 from break_reminder import BreakReminderSystem
+from config import (
+    get_admission_settings, get_event_log_dir, get_image_cache_dir, get_image_fetch_settings, get_image_server_settings,
+    get_local_image_dirs, get_profile_dir, get_profiling_settings, get_recording_dir, get_recording_settings, get_state_db_path
+)
+from event_log import EventLog
+from image_server import ImageServer
+from profiler import MODE_CPROFILE, MODE_SAMPLING, Profiler, install_signal_handler
+from recorder import KIND_RESOURCE, KIND_TOOL, TrafficRecorder
+from shared_state import SharedStateStore
+
+
+# Session of HTTP requests without a session id issued by the server
+ANONYMOUS_SESSION = "anonymous"
 
 
 class CatServer:
@@ -20,11 +46,27 @@ class CatServer:
     checking if it's time for a break.
     """
     
+    # Maximum number of cat entries kept in the response cache
+    ENTRY_CACHE_SIZE = 1024
+    
+    # Maximum number of changes returned by one read of the change feed
+    CHANGES_PAGE_SIZE = 1000
+    
+    # Maximum number of session break reminders kept; the least recently used are dropped
+    MAX_BREAK_REMINDERS = 10000
+    
+    # Seconds a session can be idle before its shared state is deleted
+    SESSION_IDLE_SECONDS = 24 * 60 * 60
+    
+    # Seconds between deletions of idle sessions
+    SESSION_EXPIRY_INTERVAL = 60 * 60
+    
     def __init__(
         self,
         name: str = "MCP Cat Server",
         command_interval: int = 5,
-        time_interval_minutes: int = 20
+        time_interval_minutes: int = 20,
+        state_store: Optional[SharedStateStore] = None
     ):
         """
         Initialize the cat server.
@@ -33,24 +75,280 @@ class CatServer:
             name: The name of the server.
             command_interval: Number of commands before suggesting a break.
             time_interval_minutes: Minutes before suggesting a break.
+            state_store: The store holding session state and the catalog
+                generation shared between worker processes. Defaults to None
+                for a single-process server.
         """
         self.mcp = FastMCP(name)
         self.cat_manager = CatManager()
-        self.break_reminder = BreakReminderSystem(
-            command_interval=command_interval,
-            time_interval_minutes=time_interval_minutes
+        self.state_store = state_store
+        self._catalog_generation = state_store.catalog_generation if state_store else 0
+        self._command_interval = command_interval
+        self._time_interval_minutes = time_interval_minutes
+        
+        # Break reminders by session, all recording into one event log
+        self.event_log = EventLog(spill_dir=get_event_log_dir())
+        self.break_reminder = self._new_break_reminder("default")
+        self._break_reminders: "OrderedDict[str, BreakReminderSystem]" = OrderedDict()
+        self._sessions_expired_at = 0.0
+        
+        # Rate limits and the bounded write queue
+        self.admission = AdmissionController(get_admission_settings())
+        
+        # Pre-serialized cat entries by index, valid for one catalog generation
+        self._entry_cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._entry_cache_generation = self.cat_manager.generation
+        
+        # On-demand profiling, exposed as tools only when admin tools are enabled,
+        # and only callable by the configured admin clients
+        profiling = get_profiling_settings()
+        self.profiler = Profiler(
+            get_profile_dir(),
+            max_seconds=profiling["max_seconds"],
+            sample_interval=profiling["sample_interval"]
         )
+        self._admin_token = profiling["admin_token"]
+        
+        # Downloads of added images, so they are hashed for near-duplicate detection.
+        # They run in their own threads, so a slow URL never holds up the write queue.
+        self._image_fetch = get_image_fetch_settings()
+        self._fetch_executor = None
+        if self._image_fetch["on_add"]:
+            self._fetch_executor = ThreadPoolExecutor(
+                max_workers=self._image_fetch["workers"],
+                thread_name_prefix="cat-image-fetch"
+            )
+        
+        # Base URL of the image server, when cached images are served locally
+        image_server = get_image_server_settings()
+        self._image_base_url = None
+        if image_server["enabled"]:
+            base_url = image_server["base_url"] or f"http://{image_server['host']}:{image_server['port']}"
+            self._image_base_url = base_url.rstrip("/")
+        
+        # Sessions subscribed to catalog resources, by resource URI
+        self._subscriptions: Dict[str, "weakref.WeakSet"] = {}
+        
+        # Opt-in recording of every call, one file per process, for replay.py
+        self.recorder = None
+        if get_recording_settings()["enabled"]:
+            self.recorder = TrafficRecorder(os.path.join(
+                get_recording_dir(),
+                f"traffic-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.jsonl"
+            ))
         
         # Register tools
-        self.mcp.tool()(self.show_cat)
-        self.mcp.tool()(self.show_cat_only)
-        self.mcp.tool()(self.add_cat)
-        self.mcp.tool()(self.should_take_break)
+        self._register_tool(self.show_cat)
+        self._register_tool(self.show_cat_only)
+        self._register_tool(self.add_cat)
+        self._register_tool(self.should_take_break)
+        self._register_tool(self.search_cats)
+        self._register_tool(self.break_stats)
+        self._register_tool(self.admission_stats)
+        if profiling["admin_tools"]:
+            self._register_tool(self.start_profile)
+            self._register_tool(self.stop_profile)
         
         # Register resources
-        self.mcp.resource("cat://{index}")(self.get_cat_resource)
+        self._register_resource("cat://{index}", self.get_cat_resource)
+        self._register_resource("cat://{index}/entry", self.get_cat_entry_resource, mime_type="application/json")
+        self._register_resource("cat://version", self.get_version_resource, mime_type="application/json")
+        self._register_resource("cat://changes/{since}", self.get_changes_resource, mime_type="application/json")
+        
+        # Register resource subscriptions; FastMCP does not advertise them, so the capability is set here
+        server = self.mcp._mcp_server
+        server.subscribe_resource()(self._subscribe)
+        server.unsubscribe_resource()(self._unsubscribe)
+        get_capabilities = server.get_capabilities
+        
+        def get_capabilities_with_subscribe(*args, **kwargs):
+            capabilities = get_capabilities(*args, **kwargs)
+            if capabilities.resources is not None:
+                capabilities.resources.subscribe = True
+            return capabilities
+        
+        server.get_capabilities = get_capabilities_with_subscribe
+    
+    def _register_tool(self, fn: Callable) -> None:
+        """Register a tool, recording its calls if traffic recording is enabled."""
+        if self.recorder is not None:
+            fn = self.recorder.wrap(KIND_TOOL, fn.__name__, fn, self._get_call_session_id)
+            setattr(self, fn.__name__, fn)
+        self.mcp.tool()(fn)
+    
+    def _register_resource(self, uri: str, fn: Callable, **kwargs) -> None:
+        """Register a resource, recording its reads if traffic recording is enabled."""
+        if self.recorder is not None:
+            fn = self.recorder.wrap(KIND_RESOURCE, uri, fn, self._get_call_session_id)
+            setattr(self, fn.__name__, fn)
+        self.mcp.resource(uri, **kwargs)(fn)
+    
+    def _get_call_session_id(self, args: Dict[str, Any]) -> str:
+        """Get the id of the session making a call, from its context argument or the current request."""
+        ctx = args.get("ctx")
+        if ctx is None:
+            # Resource functions take no context, so use the request being handled
+            ctx = self.mcp.get_context()
+        return self._get_session_id(ctx)
+    
+    def _new_break_reminder(self, session_id: str) -> BreakReminderSystem:
+        """Create the break reminder system of a session."""
+        return BreakReminderSystem(
+            command_interval=self._command_interval,
+            time_interval_minutes=self._time_interval_minutes,
+            session_id=session_id,
+            event_log=self.event_log,
+            state_store=self.state_store
+        )
+    
+    def _sync_catalog(self) -> None:
+        """Reload the catalog if another worker process has changed it."""
+        if self.state_store is None:
+            return
+        
+        if self.state_store.catalog_generation == self._catalog_generation:
+            return
+        
+        with self.state_store.catalog_read(blocking=False) as generation:
+            # While another write is in progress, keep serving the catalog as it is
+            if generation is not None:
+                self.cat_manager.reload()
+                self._catalog_generation = generation
+    
+    def _get_session_id(self, ctx: Optional[Context]) -> str:
+        """
+        Get the id of the session making a request.
+        
+        Only identities issued by the server are used, so a client cannot
+        spread its calls over many sessions. HTTP requests are identified by
+        their mcp-session-id header, which SessionIdMiddleware only lets
+        through when it issued the id, and share ANONYMOUS_SESSION without
+        one. Other transports are identified by their session object. Calls
+        made outside of an MCP request belong to the "default" session.
+        """
+        if ctx is None:
+            return "default"
+        
+        try:
+            request_context = ctx.request_context
+        except ValueError:
+            return "default"
+        
+        # Stateless HTTP creates a session object per request, so it cannot identify a session
+        request = getattr(request_context, "request", None)
+        headers = getattr(request, "headers", None)
+        if headers is not None:
+            return headers.get("mcp-session-id") or ANONYMOUS_SESSION
+        return f"session-{id(request_context.session)}"
+    
+    def _get_break_reminder(self, ctx: Optional[Context]) -> BreakReminderSystem:
+        """Get the break reminder system of the session making a request."""
+        session_id = self._get_session_id(ctx)
+        if session_id == "default":
+            return self.break_reminder
+        
+        break_reminder = self._break_reminders.get(session_id)
+        if break_reminder is not None:
+            self._break_reminders.move_to_end(session_id)
+            return break_reminder
+        
+        break_reminder = self._new_break_reminder(session_id)
+        self._break_reminders[session_id] = break_reminder
+        if len(self._break_reminders) > self.MAX_BREAK_REMINDERS:
+            self._break_reminders.popitem(last=False)
+        self._expire_sessions()
+        return break_reminder
+    
+    def _expire_sessions(self) -> None:
+        """Delete idle sessions from the shared state store, at most once per expiry interval."""
+        now = time.time()
+        if self.state_store is None or now - self._sessions_expired_at < self.SESSION_EXPIRY_INTERVAL:
+            return
+        self._sessions_expired_at = now
+        self.state_store.expire_sessions(now - self.SESSION_IDLE_SECONDS)
+    
+    def _require_admin(self, ctx: Optional[Context]) -> None:
+        """
+        Check that a call comes from an admin.
+        
+        HTTP requests must carry the admin_token of the profiling settings
+        as a bearer token in their Authorization header. Requests over stdio
+        and other in-process transports can only come from the process that
+        started the server, and calls made outside of an MCP request come
+        from the server's own process, so both are allowed.
+        
+        Raises:
+            PermissionError: If an HTTP request does not carry the admin
+                token, or no admin token is configured.
+        """
+        if ctx is None:
+            return
+        
+        try:
+            request_context = ctx.request_context
+        except ValueError:
+            return
+        
+        headers = getattr(getattr(request_context, "request", None), "headers", None)
+        if headers is None:
+            return
+        
+        authorization = headers.get("authorization") or ""
+        expected = f"Bearer {self._admin_token}"
+        if not self._admin_token or not hmac.compare_digest(authorization.encode("utf-8"), expected.encode("utf-8")):
+            raise PermissionError("This tool is only available to admins")
+    
+    def _admit(self, ctx: Optional[Context], tool: str) -> None:
+        """Admit a tool call, raising RetryLater if the session is over its limits."""
+        self.admission.admit(self._get_session_id(ctx), tool)
+    
+    def _get_cat_entry(self, index: int) -> Dict[str, Any]:
+        """
+        Get the cached entry of a cat image, building it on a cache miss.
+        
+        Entries hold the cat image URL, its metadata, an ETag derived from
+        the entry contents and the entry pre-serialized to JSON. The cache is
+        a bounded LRU that is cleared whenever the catalog generation changes.
+        
+        Args:
+            index: The index of the cat image. Wrapped around using modulo.
+            
+        Returns:
+            The cached entry. Callers must not modify it.
+        """
+        # Drop every entry built from an older catalog
+        self._sync_catalog()
+        generation = self.cat_manager.generation
+        if generation != self._entry_cache_generation:
+            self._entry_cache.clear()
+            self._entry_cache_generation = generation
+        
+        count = self.cat_manager.count
+        key = index % count if count else 0
+        entry = self._entry_cache.get(key)
+        if entry is not None:
+            self._entry_cache.move_to_end(key)
+            return entry
+        
+        # Build and serialize the entry once
+        payload = {"index": key, "cat_url": self.cat_manager.get_cat(key)}
+        metadata = self.cat_manager.get_metadata(key)
+        if metadata is not None:
+            payload.update(metadata)
+        serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        etag = hashlib.sha1(serialized.encode("utf-8")).hexdigest()[:16]
+        entry = {
+            "cat_url": payload["cat_url"],
+            "etag": etag,
+            "json": serialized[:-1] + f',"etag":"{etag}"}}'
+        }
+        
+        self._entry_cache[key] = entry
+        if len(self._entry_cache) > self.ENTRY_CACHE_SIZE:
+            self._entry_cache.popitem(last=False)
+        return entry
     
-    def show_cat(self, index: int) -> Dict[str, Any]:
+    def show_cat(self, index: int, ctx: Context = None) -> Dict[str, Any]:
         """
         Show a cat image at the specified index.
         
@@ -58,103 +356,307 @@ class CatServer:
             index: The index of the cat image to show.
             include_metadata: Whether to include break reminder metadata in the response.
                 Defaults to True.
+            ctx: The MCP request context, used to track breaks per session.
             
         Returns:
             A dictionary containing the cat image URL and optionally break reminder metadata.
         """
         # Record interaction
-        self.break_reminder.record_interaction()
+        self._admit(ctx, "show_cat")
+        break_reminder = self._get_break_reminder(ctx)
+        break_reminder.record_interaction()
         
         # Get cat image URL
-        cat_url = self.cat_manager.get_cat(index)
+        entry = self._get_cat_entry(index)
         
         # Check if it's time for a break
-        should_break = self.break_reminder.should_take_break()
+        should_break = break_reminder.should_take_break()
         
         # If showing a cat, reset the break counters
-        self.break_reminder.reset_counters()
+        break_reminder.reset_counters()
         
         # Return the cat image URL and break reminder metadata
-        return {
-            "cat_url": cat_url,
+        result = {
+            "cat_url": entry["cat_url"],
+            "etag": entry["etag"],
             "break_reminder": {
                 "should_take_break": should_break,
-                "status": self.break_reminder.get_status()
+                "status": break_reminder.get_status()
             }
         }
+        local_url = self._get_local_url(index)
+        if local_url is not None:
+            result["local_url"] = local_url
+        return result
     
-    def show_cat_only(self, index: int) -> str:
+    def _get_local_url(self, index: int) -> Optional[str]:
+        """Get the image server URL of a cat image, if it is cached and served locally."""
+        if self._image_base_url is None:
+            return None
+        path = self.cat_manager.get_cached_image(index)
+        if path is None:
+            return None
+        return f"{self._image_base_url}/images/{os.path.basename(path)}"
+    
+    def show_cat_only(self, index: int, ctx: Context = None) -> str:
         """
         Show only a cat image at the specified index without metadata.
         
         Args:
             index: The index of the cat image to show.
+            ctx: The MCP request context, used to track breaks per session.
             
         Returns:
             A string containing only the cat image URL.
         """
         # Record interaction
-        self.break_reminder.record_interaction()
+        self._admit(ctx, "show_cat_only")
+        break_reminder = self._get_break_reminder(ctx)
+        break_reminder.record_interaction()
         
         # Get cat image URL
-        cat_url = self.cat_manager.get_cat(index)
+        cat_url = self._get_cat_entry(index)["cat_url"]
         
         # Check if it's time for a break (but don't include in response)
-        should_break = self.break_reminder.should_take_break()
+        should_break = break_reminder.should_take_break()
         
         # If showing a cat, reset the break counters
-        self.break_reminder.reset_counters()
+        break_reminder.reset_counters()
         
         # Return only the cat image URL
         return cat_url
     
-    def add_cat(self, url: str) -> Dict[str, Any]:
+    async def add_cat(
+        self,
+        url: str,
+        tags: Optional[List[str]] = None,
+        ctx: Context = None
+    ) -> Dict[str, Any]:
         """
         Add a cat image URL to the collection.
         
+        The write runs on the background write queue, so other tools keep
+        being served while it is saved. When the session calls add_cat too
+        often or the queue is full, the call fails with a retry-later error.
+        With image_fetch.on_add, the image is downloaded in a separate thread
+        pool before the write is queued.
+        
         Args:
             url: The URL of the cat image to add.
+            tags: Optional tags describing the cat image (e.g. "orange", "tabby").
+            ctx: The MCP request context, used to track breaks per session.
             
         Returns:
-            A dictionary containing the index of the added cat image and break reminder metadata.
+            A dictionary containing the index of the added cat image, the indexes of
+            near-duplicate cat images, and break reminder metadata.
         """
         # Record interaction
-        self.break_reminder.record_interaction()
+        self._admit(ctx, "add_cat")
+        break_reminder = self._get_break_reminder(ctx)
+        break_reminder.record_interaction()
         
-        # Add cat image URL
-        index = self.cat_manager.add_cat(url)
+        # Download the image first, so it is hashed when added
+        if self._fetch_executor is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                self._fetch_executor,
+                self.cat_manager.fetch_image,
+                url,
+                self._image_fetch["timeout"],
+                self._image_fetch["max_bytes"]
+            )
+        
+        # Add cat image URL on the write queue
+        future = self.admission.submit_write("add_cat", self._write_cat, url, tags)
+        index, near_duplicates = await asyncio.wrap_future(future)
+        await self._notify_catalog_changed()
         
         # Check if it's time for a break
-        should_break = self.break_reminder.should_take_break()
+        should_break = break_reminder.should_take_break()
         
         # Return the index and break reminder metadata
         return {
             "index": index,
+            "near_duplicates": near_duplicates,
             "break_reminder": {
                 "should_take_break": should_break,
-                "status": self.break_reminder.get_status()
+                "status": break_reminder.get_status()
             }
         }
     
-    def should_take_break(self) -> Dict[str, Any]:
+    def _write_cat(self, url: str, tags: Optional[List[str]]) -> Tuple[int, List[int]]:
+        """
+        Add a cat image URL to the catalog. Runs on the write queue.
+        
+        Returns:
+            The index of the added cat image and the indexes of its near-duplicates.
+        """
+        if self.state_store is not None:
+            # Add on top of the latest catalog while holding the cross-process write lock
+            with self.state_store.catalog_write() as generation:
+                if generation != self._catalog_generation:
+                    self.cat_manager.reload()
+                index = self.cat_manager.add_cat(url, tags=tags)
+            self._catalog_generation = generation + 1
+        else:
+            index = self.cat_manager.add_cat(url, tags=tags)
+        
+        # Look for copies of the same photo under other URLs
+        return index, self.cat_manager.find_near_duplicates(index)
+    
+    def should_take_break(self, ctx: Context = None) -> Dict[str, Any]:
         """
         Check if it's time for a break.
         
+        Args:
+            ctx: The MCP request context, used to track breaks per session.
+            
         Returns:
             A dictionary containing the break reminder status.
         """
         # Record interaction
-        self.break_reminder.record_interaction()
+        self._admit(ctx, "should_take_break")
+        break_reminder = self._get_break_reminder(ctx)
+        break_reminder.record_interaction()
         
         # Check if it's time for a break
-        should_break = self.break_reminder.should_take_break()
+        should_break = break_reminder.should_take_break()
         
         # Return the break reminder status
         return {
             "should_take_break": should_break,
-            "status": self.break_reminder.get_status()
+            "status": break_reminder.get_status()
+        }
+    
+    def search_cats(self, query: str, limit: int = 10, ctx: Context = None) -> Dict[str, Any]:
+        """
+        Search cat images by tags and URL file name.
+        
+        Args:
+            query: Free text query, e.g. "orange tabby". Every word must match.
+            limit: The maximum number of results. Defaults to 10.
+            ctx: The MCP request context, used to track breaks per session.
+            
+        Returns:
+            A dictionary containing the matching cat images and break reminder metadata.
+        """
+        # Record interaction
+        self._admit(ctx, "search_cats")
+        break_reminder = self._get_break_reminder(ctx)
+        break_reminder.record_interaction()
+        
+        # Search the catalog
+        self._sync_catalog()
+        results = [
+            {
+                "index": index,
+                "cat_url": self.cat_manager.get_cat(index),
+                "tags": self.cat_manager.get_metadata(index)["tags"]
+            }
+            for index in self.cat_manager.search(query, limit)
+        ]
+        
+        # Check if it's time for a break
+        should_break = break_reminder.should_take_break()
+        
+        # Return the results and break reminder metadata
+        return {
+            "query": query,
+            "results": results,
+            "break_reminder": {
+                "should_take_break": should_break,
+                "status": break_reminder.get_status()
+            }
         }
     
+    def break_stats(self, window_minutes: float = 60, ctx: Context = None) -> Dict[str, Any]:
+        """
+        Get break-compliance statistics across all sessions.
+        
+        Checking statistics is not counted as an interaction.
+        
+        Args:
+            window_minutes: How many minutes back to look. Defaults to 60.
+            ctx: The MCP request context, used for rate limiting.
+            
+        Returns:
+            A dictionary of interaction and break counts, active sessions and
+            compliance ratios over the window.
+        """
+        self._admit(ctx, "break_stats")
+        return self.event_log.stats(window_minutes * 60)
+    
+    def admission_stats(self) -> Dict[str, Any]:
+        """
+        Get rate limiting and write queue metrics.
+        
+        Returns:
+            Admitted, rate-limited, queued and queue-full call counts per tool,
+            and the number of pending writes.
+        """
+        return self.admission.get_metrics()
+    
+    async def start_profile(
+        self,
+        mode: str = MODE_SAMPLING,
+        seconds: float = 10.0,
+        trace_memory: bool = True,
+        ctx: Context = None
+    ) -> Dict[str, Any]:
+        """
+        Start profiling the server (admin only).
+        
+        The capture stops after the given number of seconds, or earlier with
+        stop_profile. Its files are written to the profile directory.
+        Over HTTP, the request must carry the admin_token profiling setting
+        as a bearer token.
+        
+        Args:
+            mode: "sampling" to sample the stacks of all threads, or "cprofile"
+                to record every call on the server's event loop.
+                Defaults to "sampling".
+            seconds: The length of the capture, capped by the settings.
+                Defaults to 10.
+            trace_memory: Whether to trace memory allocations. Defaults to True.
+            ctx: The MCP request context, used to authorize the call.
+            
+        Returns:
+            The mode, length and deadline of the capture.
+            
+        Raises:
+            PermissionError: If the call is not authorized.
+        """
+        self._require_admin(ctx)
+        capture = self.profiler.start(mode, seconds, trace_memory)
+        
+        # cProfile only records the event loop thread, so stop it from there
+        if mode == MODE_CPROFILE:
+            asyncio.get_running_loop().call_later(capture["seconds"], self.profiler.stop_if_expired)
+        return capture
+    
+    def stop_profile(self, ctx: Context = None) -> Dict[str, Any]:
+        """
+        Stop profiling the server and report the results (admin only).
+        
+        If no capture is running, the report of the last capture is returned.
+        
+        Args:
+            ctx: The MCP request context, used to authorize the call.
+            
+        Returns:
+            The output files, CPU hot spots and top memory allocation sites
+            in the server modules.
+            
+        Raises:
+            PermissionError: If the call is not authorized.
+            ValueError: If no profile has been captured.
+        """
+        self._require_admin(ctx)
+        if self.profiler.active:
+            return self.profiler.stop()
+        if self.profiler.last_report is None:
+            raise ValueError("No profile has been captured")
+        return self.profiler.last_report
+    
     def get_cat_resource(self, index: int) -> str:
         """
         Get a cat image URL by index.
@@ -165,7 +667,112 @@ class CatServer:
         Returns:
             The URL of the cat image.
         """
-        return self.cat_manager.get_cat(index) or "No cat image available"
+        return self._get_cat_entry(index)["cat_url"] or "No cat image available"
+    
+    def get_cat_entry_resource(self, index: int) -> str:
+        """
+        Get a cat image URL and its metadata by index.
+        
+        The entry includes an ETag that only changes when the entry changes,
+        so clients can skip re-reading entries they already have.
+        
+        Args:
+            index: The index of the cat image to retrieve.
+            
+        Returns:
+            The entry as a JSON string.
+        """
+        return self._get_cat_entry(index)["json"]
+    
+    def get_version_resource(self) -> str:
+        """
+        Get the version of the catalog.
+        
+        Clients can poll this resource and skip reading cat entries while the
+        generation is unchanged. Mirrors compare the epoch with the one they
+        synced in and read the change feed from 0 when it differs.
+        
+        Returns:
+            The catalog generation, size and epoch as a JSON string.
+        """
+        self._sync_catalog()
+        
+        # Worker processes reload the catalog at different times, so report the shared generation
+        generation = self._catalog_generation if self.state_store else self.cat_manager.generation
+        return json.dumps({
+            "generation": generation,
+            "count": self.cat_manager.count,
+            "epoch": self.cat_manager.epoch
+        })
+    
+    def get_changes_resource(self, since: str) -> str:
+        """
+        Get the catalog changes after a sequence number.
+        
+        Mirrors read cat://changes/0 once, then cat://changes/{next} with the
+        "next" value of the previous read, so each sync only transfers new
+        entries. Reads return at most CHANGES_PAGE_SIZE changes; "has_more"
+        is true when another read is needed. Only additions are reported, so
+        metadata refreshed by a local image scan shows up as a new generation
+        and entry ETag rather than as a change.
+        
+        Sequence numbers are only valid within the "epoch" of the response.
+        When it differs from the epoch of the previous read, the mirror is
+        discarded and read again from cat://changes/0. A since beyond the
+        latest sequence number sets "reset", and the changes returned
+        already start at 0.
+        
+        Args:
+            since: The sequence number of the last change already seen.
+            
+        Returns:
+            The changes as a JSON string.
+            
+        Raises:
+            ValueError: If since is not a non-negative integer.
+        """
+        try:
+            since_seq = int(since)
+        except ValueError:
+            raise ValueError(f"Invalid sequence number: {since}")
+        if since_seq < 0:
+            raise ValueError(f"Invalid sequence number: {since}")
+        
+        self._sync_catalog()
+        return json.dumps(self.cat_manager.changes_since(since_seq, self.CHANGES_PAGE_SIZE))
+    
+    async def _subscribe(self, uri: AnyUrl) -> None:
+        """Subscribe the session making the request to updates of a resource."""
+        session = self.mcp._mcp_server.request_context.session
+        self._subscriptions.setdefault(str(uri), weakref.WeakSet()).add(session)
+    
+    async def _unsubscribe(self, uri: AnyUrl) -> None:
+        """Unsubscribe the session making the request from updates of a resource."""
+        session = self.mcp._mcp_server.request_context.session
+        sessions = self._subscriptions.get(str(uri))
+        if sessions is not None:
+            sessions.discard(session)
+            if not sessions:
+                del self._subscriptions[str(uri)]
+    
+    async def _notify_catalog_changed(self) -> None:
+        """
+        Notify subscribers that the catalog has changed.
+        
+        Subscribers of cat://version and of any cat://changes/{since} resource
+        are sent a resource-updated notification, after which they read the
+        change feed from their last sequence number.
+        """
+        for uri, sessions in list(self._subscriptions.items()):
+            if uri != "cat://version" and not uri.startswith("cat://changes/"):
+                continue
+            for session in list(sessions):
+                try:
+                    await session.send_resource_updated(AnyUrl(uri))
+                except Exception as e:
+                    # The session has gone away; drop its subscription
+                    print(f"Error notifying subscriber of {uri}: {e}", file=sys.stderr)
+                    sessions.discard(session)
     
     def run(self, transport: str = "stdio") -> None:
         """
@@ -178,10 +785,223 @@ class CatServer:
         self.mcp.run(transport=transport)
 
 
+class SessionIdMiddleware:
+    """
+    Issues MCP session ids in front of a stateless streamable HTTP application.
+    
+    A stateless transport never issues session ids, so every client would
+    share one session. This middleware gives a new id to each initialize
+    request without one, both on the request, so the server sees it, and on
+    the response, so the client sends it with its later requests.
+    
+    Ids are signed with a secret shared by the workers, and an
+    mcp-session-id header that the middleware did not issue is removed, so
+    the request joins the anonymous session. Clients therefore cannot pick
+    their own ids to escape per-session rate limits, and requests that skip
+    initialize cannot create sessions. Any worker accepts an id issued by
+    another, since they share the secret.
+    """
+    
+    def __init__(self, app: Callable, secret: bytes):
+        """
+        Initialize the middleware.
+        
+        Args:
+            app: The ASGI application to wrap.
+            secret: The key signing the session ids.
+        """
+        self.app = app
+        self._secret = secret
+    
+    def _sign(self, nonce: str) -> str:
+        """Get the signature of a session id nonce."""
+        return hmac.new(self._secret, nonce.encode("ascii"), hashlib.sha256).hexdigest()[:32]
+    
+    def issue(self) -> str:
+        """
+        Issue a new session id.
+        
+        Returns:
+            A random nonce and its signature, separated by a dot.
+        """
+        nonce = uuid.uuid4().hex
+        return f"{nonce}.{self._sign(nonce)}"
+    
+    def is_issued(self, session_id: str) -> bool:
+        """
+        Check whether a session id was issued with the secret of this middleware.
+        
+        Args:
+            session_id: The session id.
+            
+        Returns:
+            True if the signature of the id is valid.
+        """
+        nonce, _, signature = session_id.partition(".")
+        try:
+            return hmac.compare_digest(signature, self._sign(nonce))
+        except (TypeError, UnicodeEncodeError):
+            return False
+    
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        """Handle an ASGI connection, issuing a session id to initialize requests without one."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        headers = [(name, value) for name, value in scope["headers"] if name != b"mcp-session-id"]
+        session_ids = [value for name, value in scope["headers"] if name == b"mcp-session-id"]
+        if len(session_ids) == 1 and self.is_issued(session_ids[0].decode("latin-1")):
+            await self.app(scope, receive, send)
+            return
+        
+        scope = {**scope, "headers": headers}
+        if scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        
+        # Only initialize requests are issued a session; read the body to find out
+        body, receive = await self._buffer_body(receive)
+        if not self._is_initialize(body):
+            await self.app(scope, receive, send)
+            return
+        
+        header = (b"mcp-session-id", self.issue().encode("ascii"))
+        scope = {**scope, "headers": [*headers, header]}
+        
+        async def send_with_session_id(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), header]}
+            await send(message)
+        
+        await self.app(scope, receive, send_with_session_id)
+    
+    @staticmethod
+    async def _buffer_body(receive: Callable) -> Tuple[bytes, Callable]:
+        """Read the body of a request, returning it and a receive function that replays it."""
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                # The client disconnected; replay the disconnect to the application
+                async def replay_disconnect() -> Dict[str, Any]:
+                    return message
+                return b"", replay_disconnect
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        
+        body = b"".join(chunks)
+        replayed = False
+        
+        async def replay() -> Dict[str, Any]:
+            nonlocal replayed
+            if replayed:
+                return await receive()
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        
+        return body, replay
+    
+    @staticmethod
+    def _is_initialize(body: bytes) -> bool:
+        """Check whether a JSON-RPC request body holds an initialize request."""
+        try:
+            message = json.loads(body)
+        except ValueError:
+            return False
+        messages = message if isinstance(message, list) else [message]
+        return any(isinstance(item, dict) and item.get("method") == "initialize" for item in messages)
+
+
+def create_http_app():
+    """
+    Create the streamable HTTP application of one worker process.
+    
+    Every worker opens the shared state store, so any worker can serve any
+    session. Sessions are stateless at the MCP transport level, since a
+    client's requests may reach different workers, and SessionIdMiddleware
+    issues the session ids, signed with a secret kept in the shared store.
+    
+    Returns:
+        The ASGI application of the worker.
+    """
+    state_store = SharedStateStore(get_state_db_path())
+    server = CatServer(state_store=state_store)
+    server.mcp.settings.stateless_http = True
+    install_signal_handler(server.profiler)
+    return SessionIdMiddleware(server.mcp.streamable_http_app(), state_store.get_secret("session_id"))
+
+
+def run_http_workers(workers: int, host: str = "127.0.0.1", port: int = 8000) -> None:
+    """
+    Serve the streamable HTTP transport from several worker processes.
+    
+    Args:
+        workers: The number of worker processes.
+        host: The host to listen on. Defaults to "127.0.0.1".
+        port: The port to listen on. Defaults to 8000.
+    """
+    import uvicorn
+    
+    uvicorn.run("server:create_http_app", factory=True, workers=workers, host=host, port=port)
+
+
+def start_image_server() -> Optional[ImageServer]:
+    """
+    Start serving cached images over HTTP if the image server is enabled.
+    
+    Returns:
+        The running image server, or None if it is disabled.
+    """
+    settings = get_image_server_settings()
+    if not settings["enabled"]:
+        return None
+    
+    image_server = ImageServer(get_image_cache_dir(), settings["host"], settings["port"])
+    image_server.start()
+    return image_server
+
+
+def scan_local_images() -> None:
+    """Add new cat images from the local image directories before serving."""
+    if not get_local_image_dirs():
+        return
+    
+    result = CatManager().scan_local_images()
+    
+    # stdout carries the stdio transport, so report on stderr
+    print(
+        f"Scanned local images: {result['added']} added, {result['updated']} updated, "
+        f"{result['removed']} removed, {result['unchanged']} unchanged",
+        file=sys.stderr
+    )
+
+
 def main():
     """Run the MCP cat server."""
+    parser = argparse.ArgumentParser(description="Run the MCP cat server.")
+    parser.add_argument("--transport", default="stdio", help="The transport to use (e.g. stdio, streamable-http).")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for the streamable-http transport.")
+    parser.add_argument("--host", default="127.0.0.1", help="The host to listen on for HTTP transports.")
+    parser.add_argument("--port", type=int, default=8000, help="The port to listen on for HTTP transports.")
+    args = parser.parse_args()
+    
+    # Scan once here rather than in every HTTP worker process
+    scan_local_images()
+    
+    # The image server runs in this process, alongside any HTTP worker processes
+    start_image_server()
+    
+    if args.transport == "streamable-http":
+        run_http_workers(args.workers, args.host, args.port)
+        return
+    
     server = CatServer()
-    server.run()
+    install_signal_handler(server.profiler)
+    server.mcp.settings.host = args.host
+    server.mcp.settings.port = args.port
+    server.run(transport=args.transport)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,313 @@
+"""
+Shared State Store - Session and catalog state shared between worker processes.
+"""
+import secrets
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class SharedStateStore:
+    """
+    Keeps break-reminder session state and the catalog generation in SQLite.
+
+    Several worker processes can open the same database file, so any worker
+    can serve any session. The database runs in WAL mode so that readers do
+    not block the writer, and every update is a single atomic statement.
+
+    Catalog writes are serialized with a lock file next to the database
+    rather than a database transaction, so a long write never blocks
+    session updates.
+    """
+
+    # Name of the counter holding the catalog generation
+    CATALOG_GENERATION = "catalog_generation"
+
+    def __init__(self, path: str, timeout: float = 10.0):
+        """
+        Open the shared state store, creating it if needed.
+
+        Args:
+            path: The path of the SQLite database file.
+            timeout: Seconds to wait for a lock held by another process.
+                Defaults to 10.
+        """
+        self._path = path
+        self._lock_path = path + ".catalog.lock"
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, "
+            "command_count INTEGER NOT NULL, "
+            "last_break_time REAL NOT NULL, "
+            "break_suggested INTEGER NOT NULL, "
+            "last_seen REAL NOT NULL DEFAULT 0)"
+        )
+        # Stores created before sessions expired have no last_seen column
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")]
+        if "last_seen" not in columns:
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN last_seen REAL NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS counters ("
+            "name TEXT PRIMARY KEY, "
+            "value INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS secrets ("
+            "name TEXT PRIMARY KEY, "
+            "value TEXT NOT NULL)"
+        )
+
+    @property
+    def path(self) -> str:
+        """
+        Get the path of the database file.
+
+        Returns:
+            The path of the SQLite database file.
+        """
+        return self._path
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def get_session(self, session_id: str, now: float) -> Tuple[int, float, bool]:
+        """
+        Get the break-reminder state of a session, creating it if needed.
+
+        Args:
+            session_id: The id of the session.
+            now: The last break time to use for a new session.
+
+        Returns:
+            The command count, last break time and whether a break has been
+            suggested since the last break.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO sessions VALUES (?, 0, ?, 0, ?)",
+                (session_id, now, now)
+            )
+            row = self._conn.execute(
+                "SELECT command_count, last_break_time, break_suggested "
+                "FROM sessions WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+        return row[0], row[1], bool(row[2])
+
+    def increment_commands(self, session_id: str, now: float) -> int:
+        """
+        Atomically count one more command for a session.
+
+        Args:
+            session_id: The id of the session.
+            now: The time of the command, and the last break time to use
+                for a new session.
+
+        Returns:
+            The new command count.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions VALUES (?, 1, ?, 0, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET "
+                "command_count = command_count + 1, last_seen = excluded.last_seen",
+                (session_id, now, now)
+            )
+            row = self._conn.execute(
+                "SELECT command_count FROM sessions WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+        return row[0]
+
+    def mark_break_suggested(self, session_id: str) -> bool:
+        """
+        Mark that a break has been suggested to a session.
+
+        Args:
+            session_id: The id of the session.
+
+        Returns:
+            True if this call marked the suggestion, False if it was already
+            marked (possibly by another worker).
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE sessions SET break_suggested = 1 "
+                "WHERE session_id = ? AND break_suggested = 0",
+                (session_id,)
+            )
+        return cursor.rowcount > 0
+
+    def reset_session(self, session_id: str, now: float) -> bool:
+        """
+        Reset the break-reminder state of a session after a break.
+
+        Args:
+            session_id: The id of the session.
+            now: The time of the break.
+
+        Returns:
+            True if a break had been suggested to the session since its last
+            break, False otherwise. Only one of several workers resetting the
+            same suggested break gets True.
+        """
+        with self._lock:
+            # Clearing the suggestion first claims it, so only one worker counts the break
+            cursor = self._conn.execute(
+                "UPDATE sessions SET break_suggested = 0 "
+                "WHERE session_id = ? AND break_suggested = 1",
+                (session_id,)
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, 0, ?, 0, ?)",
+                (session_id, now, now)
+            )
+        return cursor.rowcount > 0
+
+    def expire_sessions(self, before: float) -> int:
+        """
+        Delete the state of sessions that have been idle since a time.
+
+        Args:
+            before: Sessions with no command or break since this time are
+                deleted.
+
+        Returns:
+            The number of sessions deleted.
+        """
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM sessions WHERE last_seen < ?", (before,))
+        return cursor.rowcount
+
+    def get_secret(self, name: str) -> bytes:
+        """
+        Get a random secret shared by every worker, creating it if needed.
+
+        Args:
+            name: The name of the secret.
+
+        Returns:
+            The 32-byte secret.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO secrets VALUES (?, ?)",
+                (name, secrets.token_hex(32))
+            )
+            row = self._conn.execute("SELECT value FROM secrets WHERE name = ?", (name,)).fetchone()
+        return bytes.fromhex(row[0])
+
+    def get_counter(self, name: str) -> int:
+        """
+        Get the value of a counter.
+
+        Args:
+            name: The name of the counter.
+
+        Returns:
+            The value of the counter, or 0 if it was never incremented.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM counters WHERE name = ?",
+                (name,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    @contextmanager
+    def _catalog_lock(self, exclusive: bool, blocking: bool = True) -> Iterator[bool]:
+        """
+        Hold the catalog lock file.
+
+        Each call opens the file, so threads of one process exclude each
+        other like separate processes do. Windows only has exclusive locks.
+
+        Yields:
+            Whether the lock was taken, which is only False if blocking is
+            False and the lock is held elsewhere.
+        """
+        with open(self._lock_path, "a+b") as f:
+            try:
+                if fcntl is not None:
+                    flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+                    fcntl.flock(f.fileno(), flags if blocking else flags | fcntl.LOCK_NB)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+            except OSError:
+                if blocking:
+                    raise
+                yield False
+                return
+
+            try:
+                yield True
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    @contextmanager
+    def catalog_write(self) -> Iterator[int]:
+        """
+        Hold the catalog write lock across all worker processes.
+
+        The catalog generation is read when the lock is taken and incremented
+        when the block completes without an exception, so other workers notice
+        the change and reload the catalog. Session updates and generation
+        reads do not wait for the lock.
+
+        Yields:
+            The catalog generation before the write.
+        """
+        with self._catalog_lock(exclusive=True):
+            generation = self.catalog_generation
+            yield generation
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO counters VALUES (?, 1) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+                    (self.CATALOG_GENERATION,)
+                )
+
+    @contextmanager
+    def catalog_read(self, blocking: bool = True) -> Iterator[Optional[int]]:
+        """
+        Hold the catalog lock shared, so no worker writes the catalog meanwhile.
+
+        Args:
+            blocking: Whether to wait for a write in progress. Defaults to
+                True.
+
+        Yields:
+            The catalog generation, or None if blocking is False and a write
+            is in progress.
+        """
+        with self._catalog_lock(exclusive=False, blocking=blocking) as locked:
+            yield self.catalog_generation if locked else None
+
+    @property
+    def catalog_generation(self) -> int:
+        """
+        Get the shared catalog generation.
+
+        Returns:
+            The number of catalog writes made through this store.
+        """
+        return self.get_counter(self.CATALOG_GENERATION)
@@ -0,0 +1,271 @@
+"""
+Snapshot - Checksummed, atomically replaced JSON files.
+"""
+import json
+import os
+import re
+import shutil
+import zlib
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+
+# Snapshots start with a fixed-width header line holding the entry count and
+# the CRC32 of the JSON body that follows it. CRC32 catches truncated and
+# torn writes at a fraction of the cost of parsing, unlike a cryptographic hash.
+SNAPSHOT_MAGIC = b"CATSNAP1"
+HEADER_FORMAT = "CATSNAP1 count={count:020d} crc32={checksum:08x}\n"
+HEADER_SIZE = len(HEADER_FORMAT.format(count=0, checksum=0))
+
+_HEADER_PATTERN = re.compile(rb"CATSNAP1 count=(\d{20}) crc32=([0-9a-f]{8})\n")
+
+# Encoded JSON is checksummed and written in blocks of about this many characters
+_WRITE_BLOCK_SIZE = 1 << 14
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot is truncated or corrupted."""
+
+
+class SnapshotPosition(NamedTuple):
+    """
+    The end of the items of a list snapshot.
+
+    JSON lists are encoded item by item, so the snapshot of a list with
+    items appended starts with the body of the shorter list up to its closing
+    bracket. A position records that prefix, so read_snapshot_tail can
+    read only the appended items.
+    """
+    count: int
+    offset: int
+    checksum: int
+
+
+def _list_end(body: bytes) -> int:
+    """Get the offset of the closing bracket of an encoded list, before any whitespace."""
+    return len(body[:-1].rstrip())
+
+
+def write_snapshot(path: str, data: Any, indent: Optional[int] = None) -> Optional[SnapshotPosition]:
+    """
+    Write a snapshot, replacing the previous one atomically.
+
+    The JSON body is streamed to a temporary file while its checksum is
+    computed, the header is filled in, and the file is synced to disk. The
+    previous snapshot is then hard-linked to path + ".prev" and the new one
+    renamed over it, so path exists at every moment and a crash at any
+    point leaves either file intact.
+
+    Args:
+        path: The path of the snapshot file.
+        data: The JSON-serializable data. The count in the header is its
+            length if it is a list, and 0 otherwise.
+        indent: The JSON indent. Defaults to None for compact JSON.
+
+    Returns:
+        The position of the end of the items if data is a list, or None.
+
+    Raises:
+        IOError: If the snapshot cannot be written.
+    """
+    encoder = json.JSONEncoder(indent=indent, separators=None if indent is not None else (",", ":"))
+    checksum = 0
+    checksummed = 0
+    temp_path = path + ".tmp"
+
+    with open(temp_path, "wb") as f:
+        f.write(b" " * HEADER_SIZE)
+
+        # The last block written is checksummed at the end, since the
+        # position of a list ends just before its closing bracket
+        held = b""
+        block = []
+        block_size = 0
+        for chunk in encoder.iterencode(data):
+            block.append(chunk)
+            block_size += len(chunk)
+            if block_size >= _WRITE_BLOCK_SIZE:
+                encoded = "".join(block).encode("utf-8")
+                checksum = zlib.crc32(held, checksum)
+                checksummed += len(held)
+                f.write(encoded)
+                held = encoded
+                block = []
+                block_size = 0
+        encoded = "".join(block).encode("utf-8")
+        f.write(encoded)
+
+        tail = held + encoded
+        position = None
+        count = len(data) if isinstance(data, list) else 0
+        if isinstance(data, list):
+            end = _list_end(tail)
+            checksum = zlib.crc32(tail[:end], checksum)
+            position = SnapshotPosition(count, checksummed + end, checksum)
+            checksum = zlib.crc32(tail[end:], checksum)
+        else:
+            checksum = zlib.crc32(tail, checksum)
+
+        f.seek(0)
+        f.write(HEADER_FORMAT.format(count=count, checksum=checksum).encode("ascii"))
+        f.flush()
+        os.fsync(f.fileno())
+
+    # Link the previous snapshot to .prev rather than moving it, so path never goes missing
+    if os.path.exists(path):
+        prev_temp_path = path + ".prev.tmp"
+        if os.path.lexists(prev_temp_path):
+            os.remove(prev_temp_path)
+        try:
+            os.link(path, prev_temp_path)
+        except OSError:
+            # Some file systems have no hard links
+            shutil.copy2(path, prev_temp_path)
+        os.replace(prev_temp_path, path + ".prev")
+    os.replace(temp_path, path)
+    return position
+
+
+def _read(path: str) -> Tuple[bytes, Optional[re.Match]]:
+    """Read the header match and body of a snapshot, or the whole of a plain JSON file."""
+    with open(path, "rb") as f:
+        header = f.readline()
+        body = f.read()
+
+    if not header.startswith(SNAPSHOT_MAGIC):
+        return header + body, None
+
+    match = _HEADER_PATTERN.fullmatch(header)
+    if match is None:
+        raise SnapshotError(f"Invalid snapshot header in {path}")
+    return body, match
+
+
+def read_snapshot(path: str) -> Tuple[Any, bool]:
+    """
+    Read a snapshot, or a plain JSON file written before snapshots existed.
+
+    A snapshot is verified with one checksum pass over its body. When the
+    checksum and entry count match, the contents are exactly what was written, so
+    callers can skip validating individual entries.
+
+    Args:
+        path: The path of the file.
+
+    Returns:
+        The data and whether it was verified against a checksum. Plain JSON
+        files are returned unverified.
+
+    Raises:
+        IOError: If the file cannot be read.
+        SnapshotError: If the snapshot is truncated or corrupted.
+        ValueError: If a plain JSON file is invalid.
+    """
+    data, position = read_list_snapshot(path)
+    return data, position is not None
+
+
+def read_snapshot_count(path: str) -> Optional[int]:
+    """
+    Read the entry count from the header of a snapshot, without reading its body.
+
+    The body is not checked against the checksum, so a snapshot with a
+    corrupted body still reports the count it was written with.
+
+    Args:
+        path: The path of the file.
+
+    Returns:
+        The entry count, or None if the file is a plain JSON file.
+
+    Raises:
+        IOError: If the file cannot be read.
+        SnapshotError: If the header is invalid.
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+
+    if not header.startswith(SNAPSHOT_MAGIC):
+        return None
+
+    match = _HEADER_PATTERN.fullmatch(header)
+    if match is None:
+        raise SnapshotError(f"Invalid snapshot header in {path}")
+    return int(match.group(1))
+
+
+def read_list_snapshot(path: str) -> Tuple[Any, Optional[SnapshotPosition]]:
+    """
+    Read a snapshot like read_snapshot, along with the position of its end.
+
+    Args:
+        path: The path of the file.
+
+    Returns:
+        The data and, if it is a verified list, the position of the end of
+        its items to pass to read_snapshot_tail. Plain JSON files have no
+        position.
+
+    Raises:
+        IOError: If the file cannot be read.
+        SnapshotError: If the snapshot is truncated or corrupted.
+        ValueError: If a plain JSON file is invalid.
+    """
+    body, match = _read(path)
+    if match is None:
+        return json.loads(body), None
+
+    view = memoryview(body)
+    end = _list_end(body)
+    prefix_checksum = zlib.crc32(view[:end])
+    if zlib.crc32(view[end:], prefix_checksum) != int(match.group(2), 16):
+        raise SnapshotError(f"Checksum mismatch in {path}")
+
+    data = json.loads(body)
+    count = int(match.group(1))
+    if (len(data) if isinstance(data, list) else 0) != count:
+        raise SnapshotError(f"Entry count mismatch in {path}")
+    return data, SnapshotPosition(count, end, prefix_checksum) if isinstance(data, list) else None
+
+
+def read_snapshot_tail(path: str, position: SnapshotPosition) -> Tuple[List[Any], SnapshotPosition]:
+    """
+    Read the items appended to a list snapshot since it was at a position.
+
+    Only the appended items are parsed, so following a growing list costs
+    one checksum pass over the file plus the parsing of the new items.
+
+    Args:
+        path: The path of the snapshot.
+        position: The position returned when the snapshot was last read or
+            written.
+
+    Returns:
+        The appended items, and the position of the new end of the items.
+
+    Raises:
+        IOError: If the file cannot be read.
+        SnapshotError: If the file is not a snapshot, is corrupted, or does
+            not start with the items read up to the position (e.g. because
+            an item changed).
+    """
+    body, match = _read(path)
+    if match is None:
+        raise SnapshotError(f"{path} is not a snapshot")
+
+    view = memoryview(body)
+    if len(body) <= position.offset or zlib.crc32(view[:position.offset]) != position.checksum:
+        raise SnapshotError(f"{path} does not extend the items read before")
+
+    end = _list_end(body)
+    if end < position.offset:
+        raise SnapshotError(f"{path} does not extend the items read before")
+    prefix_checksum = zlib.crc32(view[position.offset:end], position.checksum)
+    if zlib.crc32(view[end:], prefix_checksum) != int(match.group(2), 16):
+        raise SnapshotError(f"Checksum mismatch in {path}")
+
+    # The tail starts with the separator after the last item read, if any
+    items = json.loads(b"[" + bytes(view[position.offset:]).lstrip(b", \t\r\n"))
+    count = int(match.group(1))
+    if not isinstance(items, list) or position.count + len(items) != count:
+        raise SnapshotError(f"Entry count mismatch in {path}")
+    return items, SnapshotPosition(count, end, prefix_checksum)
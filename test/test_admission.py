@@ -0,0 +1,124 @@
+"""
+Tests for the admission control classes.
+"""
+import unittest
+import threading
+from src.admission import AdmissionController, RetryLater, TokenBucket, WriteQueue
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Tests for the TokenBucket class."""
+    
+    def test_try_acquire(self):
+        """Test bursting, running out of tokens and refilling."""
+        bucket = TokenBucket(rate=2.0, burst=3)
+        now = bucket._updated
+        
+        for _ in range(3):
+            self.assertEqual(bucket.try_acquire(now), 0)
+        self.assertAlmostEqual(bucket.try_acquire(now), 0.5)
+        
+        # Half a second later one token is back
+        self.assertEqual(bucket.try_acquire(now + 0.5), 0)
+        self.assertGreater(bucket.try_acquire(now + 0.5), 0)
+
+
+class TestWriteQueue(unittest.TestCase):
+    """Tests for the WriteQueue class."""
+    
+    def test_submit(self):
+        """Test executing writes and propagating errors."""
+        write_queue = WriteQueue(max_size=4)
+        self.assertEqual(write_queue.submit(lambda a, b: a + b, 1, b=2).result(timeout=5), 3)
+        
+        future = write_queue.submit(lambda: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            future.result(timeout=5)
+    
+    def test_writes_are_serialized(self):
+        """Test that writes run one at a time in submission order."""
+        write_queue = WriteQueue(max_size=16)
+        order = []
+        futures = [write_queue.submit(order.append, i) for i in range(10)]
+        for future in futures:
+            future.result(timeout=5)
+        self.assertEqual(order, list(range(10)))
+
+
+class TestAdmissionController(unittest.TestCase):
+    """Tests for the AdmissionController class."""
+    
+    def setUp(self):
+        """Set up an AdmissionController instance for testing."""
+        self.controller = AdmissionController({
+            "session_rate": 0.001,
+            "session_burst": 5,
+            "tool_limits": {"add_cat": {"rate": 0.001, "burst": 2}},
+            "global_tool_limits": {"add_cat": {"rate": 0.001, "burst": 3}},
+            "write_queue_size": 1
+        })
+    
+    def test_tool_limit(self):
+        """Test that tool limits apply per session."""
+        self.controller.admit("alice", "add_cat")
+        self.controller.admit("alice", "add_cat")
+        with self.assertRaises(RetryLater) as raised:
+            self.controller.admit("alice", "add_cat")
+        self.assertGreater(raised.exception.retry_after, 0)
+        
+        # Other tools and other sessions are not affected
+        self.controller.admit("alice", "show_cat")
+        self.controller.admit("bob", "add_cat")
+    
+    def test_global_tool_limit(self):
+        """Test that a global tool limit applies across sessions."""
+        self.controller.admit("alice", "add_cat")
+        self.controller.admit("bob", "add_cat")
+        self.controller.admit("carol", "add_cat")
+        
+        # A new session id does not lift the cap
+        with self.assertRaises(RetryLater):
+            self.controller.admit("dave", "add_cat")
+        self.controller.admit("dave", "show_cat")
+    
+    def test_session_limit(self):
+        """Test that the session limit covers all tools."""
+        for _ in range(5):
+            self.controller.admit("alice", "show_cat")
+        with self.assertRaises(RetryLater):
+            self.controller.admit("alice", "search_cats")
+    
+    def test_write_queue_full(self):
+        """Test that writes are rejected while the queue is full."""
+        started, release = threading.Event(), threading.Event()
+        
+        def blocking_write():
+            started.set()
+            release.wait(5)
+        
+        # The first write runs, the second fills the queue, the third is rejected
+        first = self.controller.submit_write("add_cat", blocking_write)
+        started.wait(5)
+        second = self.controller.submit_write("add_cat", lambda: None)
+        with self.assertRaises(RetryLater):
+            self.controller.submit_write("add_cat", lambda: None)
+        
+        release.set()
+        first.result(timeout=5)
+        second.result(timeout=5)
+    
+    def test_metrics(self):
+        """Test counting admission outcomes."""
+        self.controller.admit("alice", "add_cat")
+        self.controller.admit("alice", "add_cat")
+        with self.assertRaises(RetryLater):
+            self.controller.admit("alice", "add_cat")
+        self.controller.submit_write("add_cat", lambda: None).result(timeout=5)
+        
+        metrics = self.controller.get_metrics()
+        self.assertEqual(metrics["tools"]["add_cat"], {"admitted": 2, "rate_limited": 1, "queued": 1, "queue_full": 0})
+        self.assertEqual(metrics["write_queue_pending"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
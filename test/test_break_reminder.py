@@ -2,8 +2,11 @@
 Tests for the BreakReminderSystem class.
 """
 import unittest
+import os
+import tempfile
 import time
 from src.break_reminder import BreakReminderSystem
+from src.shared_state import SharedStateStore
 
 
 class TestBreakReminderSystem(unittest.TestCase):
@@ -70,6 +73,68 @@ class TestBreakReminderSystem(unittest.TestCase):
         self.assertFalse(self.break_reminder.should_take_break())
         self.assertEqual(self.break_reminder._command_count, 0)
     
+    def test_event_log(self):
+        """Test that interactions, break suggestions and breaks are logged."""
+        for _ in range(self.command_interval):
+            self.break_reminder.record_interaction()
+        
+        # A break is suggested once per break interval
+        self.break_reminder.should_take_break()
+        self.break_reminder.get_status()
+        self.break_reminder.reset_counters()
+        
+        stats = self.break_reminder.break_stats(window_seconds=60)
+        self.assertEqual(stats["interactions"], self.command_interval)
+        self.assertEqual(stats["breaks_suggested"], 1)
+        self.assertEqual(stats["breaks_taken"], 1)
+        self.assertEqual(stats["compliance_rate"], 1.0)
+    
+    def test_break_without_suggestion(self):
+        """Test that a break is only logged as taken when one was suggested."""
+        self.break_reminder.record_interaction()
+        self.assertFalse(self.break_reminder.should_take_break())
+        self.break_reminder.reset_counters()
+        
+        stats = self.break_reminder.break_stats(window_seconds=60)
+        self.assertEqual(stats["breaks_suggested"], 0)
+        self.assertEqual(stats["breaks_taken"], 0)
+        self.assertIsNone(stats["compliance_rate"])
+    
+    def test_shared_event_log(self):
+        """Test that several sessions can share one event log."""
+        other = BreakReminderSystem(session_id="other", event_log=self.break_reminder.event_log)
+        self.break_reminder.record_interaction()
+        other.record_interaction()
+        
+        stats = other.break_stats(window_seconds=60)
+        self.assertEqual(stats["interactions"], 2)
+        self.assertEqual(stats["active_sessions"], 2)
+    
+    def test_shared_state_store(self):
+        """Test that session state is shared through a state store."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "state.db")
+            store, other_store = SharedStateStore(path), SharedStateStore(path)
+            
+            # Two reminders for the same session, as in two worker processes
+            first = BreakReminderSystem(command_interval=self.command_interval, session_id="alice", state_store=store)
+            second = BreakReminderSystem(command_interval=self.command_interval, session_id="alice", state_store=other_store)
+            for _ in range(self.command_interval - 1):
+                first.record_interaction()
+            self.assertFalse(second.should_take_break())
+            
+            second.record_interaction()
+            self.assertTrue(first.should_take_break())
+            self.assertTrue(second.should_take_break())
+            self.assertEqual(first.break_stats(60)["breaks_suggested"] + second.break_stats(60)["breaks_suggested"], 1)
+            
+            # A break taken through one reminder resets the other
+            first.reset_counters()
+            self.assertEqual(second.get_status()["command_count"], 0)
+            
+            store.close()
+            other_store.close()
+    
     def test_get_status(self):
         """Test getting the current status."""
         # Record some interactions
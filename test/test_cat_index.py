@@ -0,0 +1,76 @@
+"""
+Tests for the CatIndex class.
+"""
+import unittest
+import os
+import tempfile
+from src.cat_index import CatIndex, tokenize, url_tokens
+
+
+class TestCatIndex(unittest.TestCase):
+    """Tests for the CatIndex class."""
+    
+    def setUp(self):
+        """Set up a CatIndex instance for testing."""
+        self.index = CatIndex()
+        self.index.add(0, ["orange", "tabby"])
+        self.index.add(1, ["gray", "tabby"])
+        self.index.add(2, ["orange", "siamese"])
+        self.index.add(3, ["orange", "tabby", "kitten"])
+    
+    def test_tokenize(self):
+        """Test splitting text into search tokens."""
+        self.assertEqual(tokenize("Orange  Tabby, orange!"), ["orange", "tabby"])
+        self.assertEqual(tokenize("a b"), [])
+    
+    def test_url_tokens(self):
+        """Test extracting search tokens from an image URL."""
+        url = "https://example.com/images/Orange_tabby_cat%20sitting.jpg"
+        self.assertEqual(url_tokens(url), ["orange", "tabby", "cat", "sitting"])
+    
+    def test_search(self):
+        """Test searching for entries matching every query token."""
+        self.assertEqual(self.index.search("orange tabby"), [0, 3])
+        self.assertEqual(self.index.search("TABBY"), [0, 1, 3])
+        self.assertEqual(self.index.search("orange", limit=2), [0, 2])
+        self.assertEqual(self.index.search("orange calico"), [])
+        self.assertEqual(self.index.search(""), [])
+    
+    def test_search_large(self):
+        """Test that intersecting long posting lists in chunks finds every match in order."""
+        index = CatIndex()
+        for i in range(50000):
+            index.add(i, [token for token, divisor in (("black", 2), ("white", 3), ("paws", 7)) if i % divisor == 0])
+        
+        expected = [i for i in range(50000) if i % 42 == 0]
+        self.assertEqual(index.search("black white paws", limit=len(expected) + 1), expected)
+        self.assertEqual(index.search("paws white", limit=5), [0, 21, 42, 63, 84])
+    
+    def test_count(self):
+        """Test the number of indexed entries."""
+        self.assertEqual(self.index.count, 4)
+    
+    def test_persistence(self):
+        """Test saving and loading the compact persisted form."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "index.json")
+            self.index.save(path)
+            loaded = CatIndex.load(path)
+        
+        self.assertEqual(loaded.count, self.index.count)
+        self.assertEqual(loaded.search("orange tabby"), [0, 3])
+        self.assertEqual(loaded.to_dict(), self.index.to_dict())
+    
+    def test_load_invalid_file(self):
+        """Test loading a missing or corrupted index file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "index.json")
+            self.assertIsNone(CatIndex.load(path))
+            
+            with open(path, "w") as f:
+                f.write("invalid json")
+            self.assertIsNone(CatIndex.load(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
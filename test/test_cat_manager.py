@@ -5,8 +5,11 @@ import unittest
 import os
 import json
 import tempfile
+import threading
 from unittest.mock import patch
+from src import image_hash
 from src.cat_manager import CatManager
+from src.snapshot import read_snapshot
 
 
 class TestCatManager(unittest.TestCase):
@@ -22,12 +25,18 @@ class TestCatManager(unittest.TestCase):
         self.patcher = patch('src.cat_manager.get_cache_file_path', return_value=self.cache_file_path)
         self.mock_get_cache_file_path = self.patcher.start()
         
+        # Patch the get_image_cache_dir function to return a test image cache directory
+        self.image_cache_dir = os.path.join(self.temp_dir.name, "images")
+        self.image_cache_patcher = patch('src.cat_manager.get_image_cache_dir', return_value=self.image_cache_dir)
+        self.image_cache_patcher.start()
+        
         # Create a CatManager instance
         self.cat_manager = CatManager()
     
     def tearDown(self):
         """Clean up after tests."""
         self.patcher.stop()
+        self.image_cache_patcher.stop()
         self.temp_dir.cleanup()
     
     def test_add_cat(self):
@@ -45,6 +54,19 @@ class TestCatManager(unittest.TestCase):
         self.assertEqual(index2, initial_count + 1)
         self.assertEqual(self.cat_manager.count, initial_count + 2)
     
+    def test_add_cats(self):
+        """Test adding several cat image URLs at once."""
+        initial_count = self.cat_manager.count
+        urls = ["https://example.com/cat1.jpg", "https://example.com/cat2.jpg"]
+        indexes = self.cat_manager.add_cats(urls, [["calico"], []], source="import")
+        self.assertEqual(indexes, [initial_count, initial_count + 1])
+        self.assertEqual(self.cat_manager.get_metadata(indexes[0])["tags"], ["calico"])
+        self.assertEqual(self.cat_manager.get_metadata(indexes[1])["source"], "import")
+        
+        # The added cat images are saved
+        self.assertEqual(CatManager().list_cats()[-2:], urls)
+        self.assertEqual(CatManager.verify(), [])
+    
     def test_get_cat(self):
         """Test getting a cat image URL by index."""
         # Get the default images
@@ -69,6 +91,50 @@ class TestCatManager(unittest.TestCase):
         self.assertEqual(self.cat_manager.get_cat(index2 + total_count), url2)
         self.assertEqual(self.cat_manager.get_cat(index1 + total_count), url1)
     
+    def test_generation(self):
+        """Test that the generation changes when the catalog changes."""
+        generation = self.cat_manager.generation
+        self.assertEqual(self.cat_manager.generation, generation)
+        
+        self.cat_manager.add_cat("https://example.com/cat1.jpg")
+        self.assertGreater(self.cat_manager.generation, generation)
+    
+    def test_changes_since(self):
+        """Test reading the catalog changes after a sequence number."""
+        count = self.cat_manager.count
+        changes = self.cat_manager.changes_since(0)
+        self.assertEqual(len(changes["changes"]), count)
+        self.assertEqual(changes["next"], count)
+        
+        # Add some cat image URLs
+        url1 = "https://example.com/cat1.jpg"
+        url2 = "https://example.com/cat2.jpg"
+        self.cat_manager.add_cat(url1, tags=["calico"])
+        self.cat_manager.add_cat(url2)
+        
+        # Test paging through the new entries
+        changes = self.cat_manager.changes_since(count, limit=1)
+        self.assertEqual(changes["changes"][0]["seq"], count + 1)
+        self.assertEqual(changes["changes"][0]["cat_url"], url1)
+        self.assertEqual(changes["changes"][0]["tags"], ["calico"])
+        self.assertTrue(changes["has_more"])
+        
+        changes = self.cat_manager.changes_since(changes["next"])
+        self.assertEqual([change["cat_url"] for change in changes["changes"]], [url2])
+        self.assertFalse(changes["has_more"])
+        self.assertEqual(changes["latest"], count + 2)
+        self.assertFalse(changes["reset"])
+        
+        # A sequence number beyond the latest one starts over from 0
+        changes = self.cat_manager.changes_since(count + 5, limit=1)
+        self.assertTrue(changes["reset"])
+        self.assertEqual(changes["changes"][0]["seq"], 1)
+        self.assertEqual(changes["next"], 1)
+        
+        # Appends keep the epoch, also for other processes loading the catalog
+        self.assertEqual(changes["epoch"], self.cat_manager.epoch)
+        self.assertEqual(CatManager().epoch, self.cat_manager.epoch)
+    
     def test_list_cats(self):
         """Test listing all cat image URLs."""
         # Get the default images
@@ -89,11 +155,11 @@ class TestCatManager(unittest.TestCase):
         # Verify that the cache file exists
         self.assertTrue(os.path.exists(self.cache_file_path))
         
-        # Verify that the cache file contains valid JSON
-        with open(self.cache_file_path, "r") as f:
-            data = json.load(f)
-            self.assertIsInstance(data, list)
-            self.assertTrue(all(isinstance(url, str) for url in data))
+        # Verify that the cache file is a checksummed snapshot of the URLs
+        data, verified = read_snapshot(self.cache_file_path)
+        self.assertTrue(verified)
+        self.assertIsInstance(data, list)
+        self.assertTrue(all(isinstance(url, str) for url in data))
     
     def test_cache_file_persistence(self):
         """Test that cat images are persisted to the cache file."""
@@ -105,10 +171,9 @@ class TestCatManager(unittest.TestCase):
         index = self.cat_manager.add_cat(url)
         
         # Verify that the cache file contains the added image
-        with open(self.cache_file_path, "r") as f:
-            data = json.load(f)
-            self.assertEqual(len(data), initial_count + 1)
-            self.assertEqual(data[index], url)
+        data, _ = read_snapshot(self.cache_file_path)
+        self.assertEqual(len(data), initial_count + 1)
+        self.assertEqual(data[index], url)
         
         # Create a new CatManager instance (which should load from the cache file)
         new_cat_manager = CatManager()
@@ -126,14 +191,229 @@ class TestCatManager(unittest.TestCase):
         # Create a new CatManager instance (which should handle the error)
         new_cat_manager = CatManager()
         
-        # Verify that the instance has the default images
+        # Without a previous snapshot, verify that the instance has the default images
         self.assertEqual(new_cat_manager.count, len(CatManager.DEFAULT_CAT_IMAGES))
         self.assertEqual(new_cat_manager.list_cats(), CatManager.DEFAULT_CAT_IMAGES)
         
-        # Verify that the cache file has been fixed
-        with open(self.cache_file_path, "r") as f:
-            data = json.load(f)
-            self.assertEqual(data, CatManager.DEFAULT_CAT_IMAGES)
+        # Verify that the cache file has been fixed and the corrupted file kept
+        data, _ = read_snapshot(self.cache_file_path)
+        self.assertEqual(data, CatManager.DEFAULT_CAT_IMAGES)
+        with open(self.cache_file_path + ".corrupt", "r") as f:
+            self.assertEqual(f.read(), "invalid json")
+    
+    def test_cache_file_recovery(self):
+        """Test recovering a partially written cache file from the previous snapshot."""
+        url1 = "https://example.com/cat1.jpg"
+        url2 = "https://example.com/cat2.jpg"
+        self.cat_manager.add_cat(url1)
+        self.cat_manager.add_cat(url2)
+        
+        # Truncate the cache file as a crash in the middle of a write would
+        with open(self.cache_file_path, "r+b") as f:
+            f.truncate(os.path.getsize(self.cache_file_path) // 2)
+        
+        # The catalog is recovered from the snapshot before the last add
+        new_cat_manager = CatManager()
+        self.assertEqual(new_cat_manager.list_cats()[-1], url1)
+        self.assertNotIn(url2, new_cat_manager.list_cats())
+        self.assertTrue(os.path.exists(self.cache_file_path + ".corrupt"))
+        self.assertEqual(read_snapshot(self.cache_file_path)[0], new_cat_manager.list_cats())
+        
+        # The sidecar files are rewritten to match the recovered catalog
+        self.assertEqual(CatManager.verify(), [])
+        self.assertEqual(new_cat_manager.search("cat2"), [])
+        
+        # The recovered catalog reuses the sequence number of the lost entry, so it starts a new epoch
+        self.assertNotEqual(new_cat_manager.epoch, self.cat_manager.epoch)
+        self.assertEqual(CatManager().epoch, new_cat_manager.epoch)
+    
+    def test_missing_cache_file_is_not_recovered(self):
+        """Test that a missing cache file is not mistaken for a corrupted one."""
+        self.cat_manager.add_cat("https://example.com/cat1.jpg")
+        self.cat_manager.add_cat("https://example.com/cat2.jpg")
+        os.remove(self.cache_file_path)
+        
+        # Without a cache file, the previous snapshot is left alone
+        CatManager()
+        self.assertFalse(os.path.exists(self.cache_file_path + ".corrupt"))
+        self.assertNotIn("https://example.com/cat1.jpg", read_snapshot(self.cache_file_path)[0])
+    
+    def test_legacy_cache_file(self):
+        """Test loading a plain JSON cache file written before snapshots."""
+        urls = ["https://example.com/cat1.jpg", "https://example.com/cat2.jpg"]
+        with open(self.cache_file_path, "w") as f:
+            json.dump(urls, f)
+        self.assertEqual(CatManager().list_cats(), urls)
+        
+        # Entries are validated when there is no checksum
+        with open(self.cache_file_path, "w") as f:
+            json.dump(urls + [42], f)
+        self.assertEqual(CatManager().list_cats(), CatManager.DEFAULT_CAT_IMAGES)
+
+    
+    def test_add_cat_metadata(self):
+        """Test that metadata is stored alongside added cat images."""
+        index = self.cat_manager.add_cat("https://example.com/cat1.jpg", tags=["Orange", "fluffy"])
+        
+        metadata = self.cat_manager.get_metadata(index)
+        self.assertEqual(metadata["tags"], ["orange", "fluffy"])
+        self.assertEqual(metadata["source"], "url")
+        self.assertIsNotNone(metadata["added_at"])
+        
+        # Verify that the metadata is persisted
+        new_cat_manager = CatManager()
+        self.assertEqual(new_cat_manager.get_metadata(index), metadata)
+    
+    def test_search(self):
+        """Test searching cat images by tags and URL file name."""
+        # The default orange tabby is found through its tags and file name
+        self.assertIn(3, self.cat_manager.search("orange tabby"))
+        
+        # Added cat images are searchable immediately
+        index = self.cat_manager.add_cat("https://example.com/sleepy.jpg", tags=["orange", "tabby"])
+        self.assertEqual(self.cat_manager.search("orange tabby"), [3, index])
+        self.assertEqual(self.cat_manager.search("sleepy"), [index])
+        self.assertEqual(self.cat_manager.search("orange tabby", limit=1), [3])
+    
+    def test_search_index_persistence(self):
+        """Test that the search index catches up with entries added since it was saved."""
+        index = self.cat_manager.add_cat("https://example.com/cat1.jpg", tags=["calico"])
+        
+        new_cat_manager = CatManager()
+        self.assertEqual(new_cat_manager.search("calico"), [index])
+    
+    def test_reload(self):
+        """Test that reloading reads only the entries another process appended."""
+        other_cat_manager = CatManager()
+        index = other_cat_manager.add_cat("https://example.com/cat1.jpg", tags=["calico"])
+        
+        # The appended entry is read without reading the search index file
+        with patch('src.cat_manager.CatIndex.load') as mock_load:
+            self.cat_manager.reload()
+        mock_load.assert_not_called()
+        self.assertEqual(self.cat_manager.get_cat(index), "https://example.com/cat1.jpg")
+        self.assertEqual(self.cat_manager.get_metadata(index)["tags"], ["calico"])
+        self.assertEqual(self.cat_manager.search("calico"), [index])
+        
+        # Changes other than appends reload everything
+        other_cat_manager.compact()
+        other_cat_manager._state.metadata[0]["tags"] = ["lilac"]
+        other_cat_manager._save_metadata()
+        self.cat_manager.reload()
+        self.assertEqual(self.cat_manager.get_metadata(0)["tags"], ["lilac"])
+        self.assertEqual(self.cat_manager.count, index + 1)
+    
+    def test_reload_while_reading(self):
+        """Test that readers never see a half-reloaded catalog."""
+        other_cat_manager = CatManager()
+        other_cat_manager.add_cats([f"https://example.com/cat{i}.jpg" for i in range(100)])
+        errors = []
+        done = threading.Event()
+        
+        def read():
+            while not done.is_set():
+                try:
+                    for change in self.cat_manager.changes_since(0)["changes"]:
+                        self.cat_manager.get_metadata(change["index"])
+                except Exception as e:
+                    errors.append(e)
+                    return
+        
+        reader = threading.Thread(target=read)
+        reader.start()
+        try:
+            # Alternate between fully loading the long and the short catalog
+            for _ in range(50):
+                other_cat_manager._save_to_cache()
+                other_cat_manager._save_metadata()
+                self.cat_manager._cache_position = None
+                self.cat_manager.reload()
+                self.assertEqual(self.cat_manager.count, other_cat_manager.count)
+                self.cat_manager._initialize_with_defaults()
+        finally:
+            done.set()
+            reader.join()
+        self.assertEqual(errors, [])
+
+    
+    @unittest.skipIf(image_hash._pillow() is None, "Pillow is not installed")
+    def test_find_near_duplicates(self):
+        """Test detecting the same photo re-hosted at a different URL and size."""
+        from io import BytesIO
+        from PIL import Image
+        
+        def encode(image, image_format):
+            buffer = BytesIO()
+            image.save(buffer, format=image_format)
+            return buffer.getvalue()
+        
+        gradient = Image.linear_gradient("L").rotate(90).resize((64, 48))
+        images = {
+            "https://example.com/cat.png": encode(gradient, "PNG"),
+            "https://mirror.example.com/cat-large.jpg": encode(gradient.resize((160, 120)).convert("RGB"), "JPEG"),
+            "https://example.com/other.png": encode(gradient.transpose(Image.FLIP_LEFT_RIGHT), "PNG")
+        }
+        
+        # Hash images that were cataloged before being cached
+        original = self.cat_manager.add_cat("https://example.com/cat.png")
+        other = self.cat_manager.add_cat("https://example.com/other.png")
+        for url, data in images.items():
+            self.cat_manager._image_cache.store(url, data)
+        self.assertEqual(self.cat_manager.find_near_duplicates(original), [])
+        self.assertEqual(self.cat_manager.update_image_hashes(max_workers=1), 2)
+        
+        # Images cached before being cataloged are hashed on add
+        copy = self.cat_manager.add_cat("https://mirror.example.com/cat-large.jpg")
+        self.assertEqual(self.cat_manager.find_near_duplicates(copy), [original])
+        self.assertNotIn(other, self.cat_manager.find_near_duplicates(original))
+        
+        # Verify that the hashes are persisted
+        new_cat_manager = CatManager()
+        self.assertEqual(new_cat_manager.find_near_duplicates(original), [copy])
+
+    
+    @unittest.skipIf(image_hash._pillow() is None, "Pillow is not installed")
+    def test_scan_local_images(self):
+        """Test adding the images of a local directory and rescanning it."""
+        from PIL import Image
+        
+        root = os.path.join(self.temp_dir.name, "photos")
+        os.makedirs(os.path.join(root, "ginger"))
+        gradient = Image.linear_gradient("L").resize((64, 48))
+        gradient.save(os.path.join(root, "ginger", "whiskers.png"))
+        gradient.transpose(Image.FLIP_LEFT_RIGHT).save(os.path.join(root, "gray.png"))
+        with open(os.path.join(root, "notes.txt"), "w") as f:
+            f.write("Not a cat")
+        count = self.cat_manager.count
+        
+        result = self.cat_manager.scan_local_images([root], max_workers=1)
+        self.assertEqual(result, {"added": 2, "updated": 0, "removed": 0, "unchanged": 0})
+        self.assertEqual(self.cat_manager.count, count + 2)
+        self.assertEqual(self.cat_manager.get_cat(count), "file://" + os.path.join(root, "ginger", "whiskers.png"))
+        metadata = self.cat_manager.get_metadata(count)
+        self.assertEqual(metadata["source"], "local")
+        self.assertEqual(metadata["tags"], ["ginger"])
+        self.assertEqual((metadata["width"], metadata["height"]), (64, 48))
+        self.assertEqual(self.cat_manager.search("ginger whiskers"), [count])
+        
+        # A rescan adds nothing and only updates changed files
+        result = self.cat_manager.scan_local_images([root], max_workers=1)
+        self.assertEqual(result, {"added": 0, "updated": 0, "removed": 0, "unchanged": 2})
+        gradient.resize((32, 24)).save(os.path.join(root, "gray.png"))
+        os.remove(os.path.join(root, "ginger", "whiskers.png"))
+        result = self.cat_manager.scan_local_images([root], max_workers=1)
+        self.assertEqual(result, {"added": 0, "updated": 1, "removed": 1, "unchanged": 0})
+        self.assertEqual(self.cat_manager.get_metadata(count + 1)["width"], 32)
+        self.assertEqual(self.cat_manager.count, count + 2)
+        
+        # Verify that local entries are persisted
+        new_cat_manager = CatManager()
+        self.assertEqual(new_cat_manager.get_metadata(count + 1)["width"], 32)
+        self.assertEqual(new_cat_manager.scan_local_images([root], max_workers=1)["added"], 0)
+        
+        # Nothing is scanned when no directories are configured
+        with patch('src.cat_manager.get_local_image_dirs', return_value=[]):
+            self.assertEqual(self.cat_manager.scan_local_images()["unchanged"], 0)
 
 
 if __name__ == "__main__":
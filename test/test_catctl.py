@@ -0,0 +1,254 @@
+"""
+Tests for the catctl command line interface.
+"""
+import unittest
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from contextlib import redirect_stderr, redirect_stdout
+from unittest.mock import MagicMock, patch
+from src import catctl, image_hash
+from src.cat_manager import CatManager
+from src.config import get_sidecar_path
+from src.snapshot import read_snapshot, write_snapshot
+
+
+CATCTL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "catctl.py")
+
+# Budget for the modules catctl imports after interpreter startup, in microseconds
+IMPORT_BUDGET_US = 60_000
+
+
+class TestCatctl(unittest.TestCase):
+    """Tests for the catctl command line interface."""
+
+    def setUp(self):
+        """Point catctl at a catalog in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_file_path = os.path.join(self.temp_dir.name, "cat_cache.json")
+        self.settings_path = os.path.join(self.temp_dir.name, "settings.json")
+        with open(self.settings_path, "w") as f:
+            json.dump({
+                "cache_file_path": self.cache_file_path,
+                "image_cache_dir": os.path.join(self.temp_dir.name, "images"),
+                "event_log_dir": os.path.join(self.temp_dir.name, "event_log"),
+                "state_db_path": os.path.join(self.temp_dir.name, "state.db")
+            }, f)
+        self.env_patcher = patch.dict(os.environ, {"CAT_MCP_SETTINGS": self.settings_path})
+        self.env_patcher.start()
+
+    def tearDown(self):
+        """Clean up after tests."""
+        self.env_patcher.stop()
+        self.temp_dir.cleanup()
+
+    def run_catctl(self, *argv):
+        """Run a catctl command and return its exit code and output."""
+        out = io.StringIO()
+        with redirect_stdout(out):
+            code = catctl.main(list(argv))
+        return code, out.getvalue()
+
+    def test_add_bulk_count_and_get(self):
+        """Test adding cat images in bulk and reading them back."""
+        count = int(self.run_catctl("count")[1])
+
+        bulk_path = os.path.join(self.temp_dir.name, "urls.txt")
+        with open(bulk_path, "w") as f:
+            f.write("# New cats\n")
+            f.write("https://example.com/cat1.jpg calico\n")
+            f.write("https://example.com/cat2.jpg\n")
+            f.write("https://example.com/cat1.jpg calico\n")
+        code, output = self.run_catctl("add-bulk", bulk_path, "--tag", "imported", "--skip-existing")
+        self.assertEqual(code, 0)
+        self.assertIn("Added 2 cat images", output)
+
+        self.assertEqual(int(self.run_catctl("count")[1]), count + 2)
+        self.assertEqual(self.run_catctl("get", str(count))[1].strip(), "https://example.com/cat1.jpg")
+        entry = json.loads(self.run_catctl("get", str(count), "--json")[1])
+        self.assertEqual(entry["tags"], ["calico", "imported"])
+
+    def test_add_bulk_with_running_server(self):
+        """Test that bulk adds are kept by a server writing the same catalog."""
+        from src.server import CatServer
+        from src.shared_state import SharedStateStore
+
+        server = CatServer(state_store=SharedStateStore(os.path.join(self.temp_dir.name, "state.db")))
+        count = server.cat_manager.count
+        urls_path = os.path.join(self.temp_dir.name, "urls.txt")
+        with open(urls_path, "w") as f:
+            f.write("https://example.com/cat1.jpg\nhttps://example.com/cat2.jpg\n")
+        self.run_catctl("add-bulk", urls_path)
+
+        # The server adds on top of the catalog written by catctl
+        asyncio.run(server.add_cat("https://example.com/cat3.jpg"))
+        self.assertEqual(server.cat_manager.count, count + 3)
+        self.assertEqual(self.run_catctl("count")[1], f"{count + 3}\n")
+
+    def test_export(self):
+        """Test exporting the catalog as JSON lines and CSV."""
+        count = int(self.run_catctl("count")[1])
+        entries = [json.loads(line) for line in self.run_catctl("export")[1].splitlines()]
+        self.assertEqual(len(entries), count)
+        self.assertEqual(entries[0]["index"], 0)
+        self.assertIn("cat_url", entries[0])
+
+        csv_path = os.path.join(self.temp_dir.name, "cats.csv")
+        self.run_catctl("export", "--format", "csv", "--output", csv_path)
+        with open(csv_path) as f:
+            self.assertEqual(len(f.read().splitlines()), count + 1)
+
+    def test_verify_and_compact(self):
+        """Test that verify finds an index ahead of the catalog and compact repairs it."""
+        CatManager()
+        self.assertEqual(self.run_catctl("verify"), (0, "OK\n"))
+
+        # An index behind the catalog is caught up on load, so it is not a problem
+        metadata_path = get_sidecar_path(self.cache_file_path, "meta")
+        cat_images, _ = read_snapshot(self.cache_file_path)
+        metadata, _ = read_snapshot(metadata_path)
+        write_snapshot(self.cache_file_path, cat_images + ["https://example.com/cat.jpg"])
+        write_snapshot(metadata_path, metadata + [{"tags": []}])
+        self.assertEqual(self.run_catctl("verify"), (0, "OK\n"))
+
+        # Drop URLs from the cache file behind the catalog's back
+        write_snapshot(self.cache_file_path, cat_images[:1])
+        write_snapshot(metadata_path, metadata[:1])
+        code, output = self.run_catctl("verify")
+        self.assertEqual(code, 1)
+        self.assertIn("Index file", output)
+
+        self.run_catctl("compact")
+        self.assertEqual(self.run_catctl("verify"), (0, "OK\n"))
+
+    def test_get_empty_catalog(self):
+        """Test getting a cat image from an empty catalog."""
+        write_snapshot(self.cache_file_path, [])
+        err = io.StringIO()
+        with redirect_stderr(err):
+            self.assertEqual(self.run_catctl("get", "0", "--json"), (1, ""))
+        self.assertEqual(err.getvalue(), "The catalog is empty\n")
+
+    def test_read_only_commands(self):
+        """Test that the read-only commands read the catalog without writing any file."""
+        def files():
+            return sorted(os.listdir(self.temp_dir.name))
+
+        # A missing catalog reads as the default images without being created
+        before = files()
+        self.assertEqual(int(self.run_catctl("count")[1]), len(CatManager.DEFAULT_CAT_IMAGES))
+        entry = json.loads(self.run_catctl("get", "1", "--json")[1])
+        self.assertEqual(entry["cat_url"], CatManager.DEFAULT_CAT_IMAGES[1])
+        self.assertEqual(entry["source"], "default")
+        self.run_catctl("export")
+        self.run_catctl("verify")
+        self.assertEqual(files(), before)
+
+        # An index behind the catalog is not caught up, and count only reads the header
+        cat_manager = CatManager()
+        cat_images, _ = read_snapshot(self.cache_file_path)
+        write_snapshot(self.cache_file_path, cat_images + ["https://example.com/cat.jpg"])
+        before = files()
+        with patch("cat_manager.read_list_snapshot", side_effect=AssertionError("read the body")):
+            self.assertEqual(self.run_catctl("count")[1], f"{cat_manager.count + 1}\n")
+        entry = json.loads(self.run_catctl("get", str(cat_manager.count), "--json")[1])
+        self.assertEqual(entry["cat_url"], "https://example.com/cat.jpg")
+        self.assertEqual(entry["tags"], [])
+        self.run_catctl("export", "--format", "urls")
+        self.assertEqual(files(), before)
+
+        # A corrupted cache file is read from the previous snapshot but not moved aside
+        with open(self.cache_file_path, "r+b") as f:
+            f.seek(-3, os.SEEK_END)
+            f.write(b"xxx")
+        before = {name: os.stat(os.path.join(self.temp_dir.name, name)).st_mtime_ns for name in files()}
+        err = io.StringIO()
+        with redirect_stderr(err):
+            self.assertEqual(self.run_catctl("get", "0")[1].strip(), cat_images[0])
+        self.assertIn("Checksum mismatch", err.getvalue())
+        self.assertEqual(
+            {name: os.stat(os.path.join(self.temp_dir.name, name)).st_mtime_ns for name in files()},
+            before
+        )
+
+    def test_scan(self):
+        """Test adding cat images from a local directory."""
+        count = int(self.run_catctl("count")[1])
+        root = os.path.join(self.temp_dir.name, "photos")
+        os.makedirs(root)
+        with open(os.path.join(root, "cat.jpg"), "wb") as f:
+            f.write(b"not really a cat")
+
+        code, output = self.run_catctl("scan", root, "--workers", "1")
+        self.assertEqual(code, 0)
+        self.assertIn("Added 1, updated 0, removed 0, unchanged 0", output)
+        self.assertEqual(self.run_catctl("get", str(count))[1].strip(), "file://" + os.path.join(root, "cat.jpg"))
+        self.assertIn("Added 0, updated 0, removed 0, unchanged 1", self.run_catctl("scan", root)[1])
+
+    @unittest.skipIf(image_hash._pillow() is None, "Pillow is not installed")
+    def test_hash(self):
+        """Test downloading and hashing cat images to find near-duplicates."""
+        from PIL import Image
+
+        gradient = Image.linear_gradient("L").rotate(90).resize((64, 48))
+
+        def urlopen(url, timeout):
+            image = gradient if "example.com" in url else gradient.transpose(Image.FLIP_LEFT_RIGHT)
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG")
+            response = MagicMock()
+            buffer.seek(0)
+            response.__enter__.return_value.read.side_effect = buffer.read
+            response.__enter__.return_value.headers.get.return_value = None
+            response.__enter__.return_value.headers.get_content_type.return_value = "image/png"
+            return response
+
+        count = int(self.run_catctl("count")[1])
+        urls_path = os.path.join(self.temp_dir.name, "urls.txt")
+        with open(urls_path, "w") as f:
+            f.write("https://example.com/cat.png\nhttps://mirror.example.com/cat.png\n")
+        self.run_catctl("add-bulk", urls_path)
+
+        with patch("urllib.request.urlopen", side_effect=urlopen):
+            code, output = self.run_catctl("hash", "--fetch", "--workers", "1")
+        self.assertEqual((code, output), (0, f"Fetched {count + 2} and hashed {count + 2} cat images\n"))
+        self.assertEqual(CatManager().find_near_duplicates(count), [count + 1])
+
+        # Images already hashed are skipped
+        self.assertEqual(self.run_catctl("hash")[1], "Fetched 0 and hashed 0 cat images\n")
+
+    def test_import_time(self):
+        """Test that catctl stays clear of the MCP stack and within its import budget."""
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", CATCTL_PATH, "--settings", self.settings_path, "count"],
+            capture_output=True, text=True, check=True
+        )
+
+        # Lines are "import time: self | cumulative | name", nested names are indented
+        modules = []
+        total = 0
+        after_startup = False
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line.split("|")
+            modules.append(name.strip())
+            if after_startup and not name.startswith("  "):
+                total += int(cumulative)
+            after_startup = after_startup or name.strip() == "site"
+
+        for heavy in ("mcp", "pydantic", "numpy", "PIL", "urllib.request"):
+            self.assertFalse(
+                [module for module in modules if module == heavy or module.startswith(heavy + ".")],
+                f"catctl imported {heavy}"
+            )
+        self.assertIn("cat_manager", modules)
+        self.assertLess(total, IMPORT_BUDGET_US)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Tests for the EventLog class.
+"""
+import unittest
+import os
+import tempfile
+from src.event_log import (
+    EVENT_BREAK_SUGGESTED,
+    EVENT_BREAK_TAKEN,
+    EVENT_INTERACTION,
+    EventLog,
+    _flush_at_exit
+)
+
+
+class TestEventLog(unittest.TestCase):
+    """Tests for the EventLog class."""
+    
+    def setUp(self):
+        """Set up an EventLog instance for testing."""
+        self.event_log = EventLog(capacity=8)
+    
+    def record_session(self, event_log, session_id, start, interactions, take_break):
+        """Record a session's interactions, a break suggestion and optionally a break."""
+        for i in range(interactions):
+            event_log.record(session_id, EVENT_INTERACTION, timestamp=start + i)
+        event_log.record(session_id, EVENT_BREAK_SUGGESTED, timestamp=start + interactions)
+        if take_break:
+            event_log.record(session_id, EVENT_BREAK_TAKEN, timestamp=start + interactions + 1)
+    
+    def test_stats(self):
+        """Test aggregating events over a time window."""
+        event_log = EventLog()
+        self.record_session(event_log, "alice", 100, 3, take_break=True)
+        self.record_session(event_log, "bob", 200, 5, take_break=False)
+        
+        stats = event_log.stats(window_seconds=1000, now=1000)
+        self.assertEqual(stats["interactions"], 8)
+        self.assertEqual(stats["breaks_suggested"], 2)
+        self.assertEqual(stats["breaks_taken"], 1)
+        self.assertEqual(stats["active_sessions"], 2)
+        self.assertEqual(stats["sessions_with_breaks"], 1)
+        self.assertEqual(stats["compliance_rate"], 0.5)
+        self.assertEqual(stats["interactions_per_break"], 8)
+        
+        # Only bob is active in a window that starts after alice's break
+        stats = event_log.stats(window_seconds=810, now=1000)
+        self.assertEqual(stats["active_sessions"], 1)
+        self.assertEqual(stats["breaks_taken"], 0)
+        self.assertEqual(stats["compliance_rate"], 0.0)
+    
+    def test_bounded_buffer(self):
+        """Test that the in-memory buffer drops old events when full."""
+        for i in range(20):
+            self.event_log.record("alice", EVENT_INTERACTION, timestamp=i)
+        
+        self.assertLessEqual(self.event_log.count, 8)
+        self.assertEqual(self.event_log.stats(window_seconds=100, now=19)["interactions"], self.event_log.count)
+    
+    def test_spill_to_segments(self):
+        """Test that evicted events are spilled to disk and included in stats."""
+        with tempfile.TemporaryDirectory() as spill_dir:
+            event_log = EventLog(capacity=8, spill_dir=spill_dir)
+            for i in range(20):
+                event_log.record("alice", EVENT_INTERACTION, timestamp=i)
+            event_log.record("bob", EVENT_BREAK_TAKEN, timestamp=20)
+            
+            self.assertTrue(os.listdir(spill_dir))
+            stats = event_log.stats(window_seconds=100, now=20)
+            self.assertEqual(stats["interactions"], 20)
+            self.assertEqual(stats["breaks_taken"], 1)
+            self.assertEqual(stats["active_sessions"], 2)
+            
+            # Flushing writes the remaining events without duplicating any
+            event_log.flush()
+            self.assertEqual(event_log.stats(window_seconds=100, now=20)["interactions"], 20)
+    
+    def test_timed_flush(self):
+        """Test that events are written to disk after the flush interval and at exit."""
+        with tempfile.TemporaryDirectory() as spill_dir:
+            event_log = EventLog(spill_dir=spill_dir, flush_interval=3600)
+            event_log.record("alice", EVENT_INTERACTION, timestamp=1)
+            self.assertEqual(os.listdir(spill_dir), [])
+            
+            # The exit hook writes events that are only in memory
+            _flush_at_exit()
+            self.assertEqual(len(os.listdir(spill_dir)), 1)
+            
+            # Without an interval, every event is written as it is recorded
+            event_log = EventLog(spill_dir=spill_dir, flush_interval=0)
+            event_log.record("bob", EVENT_INTERACTION, timestamp=2)
+            self.assertEqual(len(os.listdir(spill_dir)), 2)
+            
+            # A new process reads back the events of the others
+            stats = EventLog(spill_dir=spill_dir).stats(window_seconds=100, now=3)
+            self.assertEqual(stats["interactions"], 2)
+            self.assertEqual(stats["active_sessions"], 2)
+    
+    def test_other_workers(self):
+        """Test that stats include the flushed events of other logs over the whole window."""
+        with tempfile.TemporaryDirectory() as spill_dir:
+            worker = EventLog(spill_dir=spill_dir)
+            other = EventLog(spill_dir=spill_dir)
+            worker.record("alice", EVENT_INTERACTION, timestamp=10)
+            other.record("bob", EVENT_INTERACTION, timestamp=20)
+            other.record("bob", EVENT_BREAK_SUGGESTED, timestamp=21)
+            other.record("bob", EVENT_BREAK_TAKEN, timestamp=22)
+            other.flush()
+            
+            # The other log's events are newer than this log's oldest buffered event
+            stats = worker.stats(window_seconds=100, now=30)
+            self.assertEqual(stats["interactions"], 2)
+            self.assertEqual(stats["breaks_taken"], 1)
+            self.assertEqual(stats["active_sessions"], 2)
+            
+            # This log's own segments are not counted twice
+            worker.flush()
+            self.assertEqual(worker.stats(window_seconds=100, now=30)["interactions"], 2)
+    
+    def test_timestamps_stay_sorted(self):
+        """Test that events recorded with an earlier timestamp keep the log sorted."""
+        self.event_log.record("alice", EVENT_INTERACTION, timestamp=10)
+        self.event_log.record("alice", EVENT_INTERACTION, timestamp=5)
+        self.assertEqual(self.event_log.stats(window_seconds=1, now=10)["interactions"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
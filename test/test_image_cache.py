@@ -0,0 +1,79 @@
+"""
+Tests for the image cache.
+"""
+import unittest
+import io
+import os
+import tempfile
+from contextlib import redirect_stderr
+from unittest.mock import MagicMock, patch
+from src.image_cache import ImageCache
+
+
+def mock_response(data, content_type="image/png", content_length=None):
+    """Create a urlopen response serving data, with an optional Content-Length header."""
+    response = MagicMock()
+    body = io.BytesIO(data)
+    response.__enter__.return_value.read.side_effect = body.read
+    response.__enter__.return_value.headers.get_content_type.return_value = content_type
+    response.__enter__.return_value.headers.get.side_effect = (
+        lambda name, default=None: content_length if name == "Content-Length" else default
+    )
+    response.body = body
+    return response
+
+
+class TestImageCache(unittest.TestCase):
+    """Tests for the image cache."""
+
+    def setUp(self):
+        """Create an image cache in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.image_cache = ImageCache(self.temp_dir.name)
+        self.url = "https://example.com/cat.png"
+
+    def tearDown(self):
+        """Clean up after tests."""
+        self.temp_dir.cleanup()
+
+    def fetch(self, response, **kwargs):
+        """Fetch the test URL from a mocked response, returning the path and the errors printed."""
+        err = io.StringIO()
+        with patch("urllib.request.urlopen", return_value=response), redirect_stderr(err):
+            path = self.image_cache.fetch(self.url, **kwargs)
+        return path, err.getvalue()
+
+    def test_fetch(self):
+        """Test downloading an image in chunks."""
+        data = os.urandom(ImageCache.READ_CHUNK_SIZE * 2 + 1)
+        path, _ = self.fetch(mock_response(data, content_length=str(len(data))), max_bytes=len(data))
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(self.image_cache.get(self.url), path)
+
+    def test_fetch_not_an_image(self):
+        """Test that responses that are not images are discarded."""
+        path, err = self.fetch(mock_response(b"<html>", content_type="text/html"))
+        self.assertIsNone(path)
+        self.assertIn("not an image", err)
+
+    def test_fetch_content_length_too_large(self):
+        """Test that a response announcing more than max_bytes is rejected without reading it."""
+        response = mock_response(b"cat", content_length="1025")
+        path, err = self.fetch(response, max_bytes=1024)
+        self.assertIsNone(path)
+        self.assertIn("larger than 1024 bytes", err)
+        self.assertEqual(response.body.tell(), 0)
+
+    def test_fetch_body_too_large(self):
+        """Test that reading stops once a response without Content-Length exceeds max_bytes."""
+        response = mock_response(b"x" * (ImageCache.READ_CHUNK_SIZE * 4))
+        path, err = self.fetch(response, max_bytes=ImageCache.READ_CHUNK_SIZE + 1)
+        self.assertIsNone(path)
+        self.assertIn("larger than", err)
+        self.assertEqual(response.body.tell(), ImageCache.READ_CHUNK_SIZE * 2)
+        self.assertIsNone(self.image_cache.get(self.url))
+
+
+if __name__ == "__main__":
+    unittest.main()
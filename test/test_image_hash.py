@@ -0,0 +1,105 @@
+"""
+Tests for the perceptual hash functions and PerceptualHashIndex class.
+"""
+import unittest
+import os
+import tempfile
+from unittest.mock import patch
+from src import image_hash
+from src.image_hash import PerceptualHashIndex, compute_hashes, dhash, hamming_distance
+
+
+class TestPerceptualHashIndex(unittest.TestCase):
+    """Tests for the PerceptualHashIndex class."""
+    
+    def setUp(self):
+        """Set up a PerceptualHashIndex instance for testing."""
+        self.index = PerceptualHashIndex()
+        self.index.set(0, 0b1111)
+        self.index.set(1, 0b1110)
+        self.index.set(3, 0b0000)
+        self.index.set(4, (1 << 63) | 0b1111)
+    
+    def test_hamming_distance(self):
+        """Test counting differing bits."""
+        self.assertEqual(hamming_distance(0b1010, 0b0101), 4)
+        self.assertEqual(hamming_distance(1 << 63, 0), 1)
+    
+    def test_get_and_set(self):
+        """Test storing hashes for catalog entries."""
+        self.assertEqual(self.index.count, 5)
+        self.assertEqual(self.index.get(0), 0b1111)
+        self.assertIsNone(self.index.get(2))
+        self.assertIsNone(self.index.get(10))
+        
+        # Zero is a valid hash
+        self.assertEqual(self.index.get(3), 0)
+    
+    def test_find(self):
+        """Test finding near-duplicate hashes."""
+        self.assertEqual(self.index.find(0b1111, max_distance=1), [(0, 0), (1, 1), (4, 1)])
+        self.assertEqual(self.index.find(0b1111, max_distance=1, exclude=0), [(1, 1), (4, 1)])
+        self.assertEqual(self.index.find(0b1111, max_distance=4)[-1], (3, 4))
+    
+    def test_find_without_numpy(self):
+        """Test that the Python scan matches the vectorized search."""
+        expected = self.index.find(0b1111, max_distance=4)
+        with patch.object(image_hash, "np", None):
+            self.assertEqual(self.index.find(0b1111, max_distance=4), expected)
+    
+    def test_persistence(self):
+        """Test saving and loading the binary hash file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "hashes.bin")
+            self.index.save(path)
+            self.assertEqual(os.path.getsize(path), 5 * 9)
+            loaded = PerceptualHashIndex.load(path)
+        
+        self.assertEqual(loaded.count, 5)
+        for i in range(5):
+            self.assertEqual(loaded.get(i), self.index.get(i))
+
+
+@unittest.skipIf(image_hash._pillow() is None, "Pillow is not installed")
+class TestDHash(unittest.TestCase):
+    """Tests for computing perceptual hashes of image files."""
+    
+    def setUp(self):
+        """Create test images."""
+        from PIL import Image
+        
+        self.temp_dir = tempfile.TemporaryDirectory()
+        gradient = Image.linear_gradient("L").rotate(90).resize((64, 48))
+        self.original = os.path.join(self.temp_dir.name, "original.png")
+        self.resized = os.path.join(self.temp_dir.name, "resized.jpg")
+        self.other = os.path.join(self.temp_dir.name, "other.png")
+        gradient.save(self.original)
+        gradient.resize((160, 120)).convert("RGB").save(self.resized, quality=70)
+        gradient.transpose(Image.FLIP_LEFT_RIGHT).save(self.other)
+    
+    def tearDown(self):
+        """Clean up after tests."""
+        self.temp_dir.cleanup()
+    
+    def test_dhash_near_duplicates(self):
+        """Test that a resized, re-encoded copy hashes close to the original."""
+        original = dhash(self.original)
+        self.assertLessEqual(hamming_distance(original, dhash(self.resized)), image_hash.DEFAULT_MAX_DISTANCE)
+        self.assertGreater(hamming_distance(original, dhash(self.other)), image_hash.DEFAULT_MAX_DISTANCE)
+    
+    def test_dhash_unreadable_file(self):
+        """Test hashing a file that is not an image."""
+        path = os.path.join(self.temp_dir.name, "broken.jpg")
+        with open(path, "w") as f:
+            f.write("not an image")
+        self.assertIsNone(dhash(path))
+    
+    def test_compute_hashes(self):
+        """Test hashing a batch of images in a worker pool."""
+        paths = [self.original, self.other] * (image_hash.MIN_PARALLEL_BATCH // 2)
+        hashes = compute_hashes(paths, max_workers=2)
+        self.assertEqual(hashes, [dhash(path) for path in paths])
+
+
+if __name__ == "__main__":
+    unittest.main()
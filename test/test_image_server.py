@@ -0,0 +1,105 @@
+"""
+Tests for the image server.
+"""
+import unittest
+import http.client
+import os
+import tempfile
+from email.utils import formatdate
+from src.image_server import ImageServer, parse_range
+
+
+class TestImageServer(unittest.TestCase):
+    """Tests for the image server."""
+
+    def setUp(self):
+        """Start an image server for a temporary image directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.name = "a" * 64 + ".jpg"
+        self.data = bytes(range(256)) * 40
+        with open(os.path.join(self.temp_dir.name, self.name), "wb") as f:
+            f.write(self.data)
+
+        self.server = ImageServer(self.temp_dir.name, port=0)
+        self.server.start()
+        host, port = self.server.url[len("http://"):].split(":")
+        self.connection = http.client.HTTPConnection(host, int(port), timeout=5)
+
+    def tearDown(self):
+        """Clean up after tests."""
+        self.connection.close()
+        self.server.stop()
+        self.temp_dir.cleanup()
+
+    def request(self, path=None, method="GET", headers=None):
+        """Make a request and return the response and its body."""
+        self.connection.request(method, path or f"/images/{self.name}", headers=headers or {})
+        response = self.connection.getresponse()
+        return response, response.read()
+
+    def test_get_and_head(self):
+        """Test serving an image and its headers."""
+        response, body = self.request()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, self.data)
+        self.assertEqual(response.getheader("Content-Type"), "image/jpeg")
+        self.assertEqual(response.getheader("Accept-Ranges"), "bytes")
+        self.assertIsNotNone(response.getheader("ETag"))
+
+        response, body = self.request(method="HEAD")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b"")
+        self.assertEqual(int(response.getheader("Content-Length")), len(self.data))
+
+    def test_range(self):
+        """Test serving byte ranges."""
+        response, body = self.request(headers={"Range": "bytes=100-199"})
+        self.assertEqual(response.status, 206)
+        self.assertEqual(body, self.data[100:200])
+        self.assertEqual(response.getheader("Content-Range"), f"bytes 100-199/{len(self.data)}")
+
+        response, body = self.request(headers={"Range": "bytes=-50"})
+        self.assertEqual(response.status, 206)
+        self.assertEqual(body, self.data[-50:])
+
+        response, body = self.request(headers={"Range": f"bytes={len(self.data)}-"})
+        self.assertEqual(response.status, 416)
+        self.assertEqual(response.getheader("Content-Range"), f"bytes */{len(self.data)}")
+
+        # A range for another version of the image is ignored
+        response, body = self.request(headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, self.data)
+
+    def test_conditional_get(self):
+        """Test revalidating an image with its ETag or modification time."""
+        etag = self.request()[0].getheader("ETag")
+        response, body = self.request(headers={"If-None-Match": etag})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, b"")
+        self.assertEqual(self.request(headers={"If-None-Match": '"stale"'})[0].status, 200)
+
+        response, _ = self.request(headers={"If-Modified-Since": formatdate(usegmt=True)})
+        self.assertEqual(response.status, 304)
+        response, _ = self.request(headers={"If-Modified-Since": formatdate(0, usegmt=True)})
+        self.assertEqual(response.status, 200)
+
+    def test_not_found(self):
+        """Test that only cached images can be requested."""
+        self.assertEqual(self.request("/images/" + "b" * 64 + ".jpg")[0].status, 404)
+        self.assertEqual(self.request("/images/../settings.json")[0].status, 404)
+        self.assertEqual(self.request("/")[0].status, 404)
+
+    def test_parse_range(self):
+        """Test parsing Range headers."""
+        self.assertEqual(parse_range("bytes=0-99", 1000), (0, 99))
+        self.assertEqual(parse_range("bytes=900-", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=0-5000", 1000), (0, 999))
+        self.assertEqual(parse_range("bytes=-2000", 1000), (0, 999))
+        self.assertIsNone(parse_range("bytes=1000-", 1000))
+        with self.assertRaises(ValueError):
+            parse_range("bytes=0-1,5-9", 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
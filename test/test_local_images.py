@@ -0,0 +1,87 @@
+"""
+Tests for local image directories.
+"""
+import unittest
+import hashlib
+import io
+import os
+import tempfile
+from contextlib import redirect_stderr, redirect_stdout
+from unittest.mock import patch
+from src import local_images
+from src.local_images import LocalImageIndex, inspect_image, inspect_images
+
+
+class TestLocalImageIndex(unittest.TestCase):
+    """Tests for the LocalImageIndex class."""
+
+    def setUp(self):
+        """Set up a directory of image files and an index in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, "photos")
+        os.makedirs(os.path.join(self.root, "nested"))
+        self.index_path = os.path.join(self.temp_dir.name, "local.json")
+        self.write("a.jpg", b"first cat")
+        self.write(os.path.join("nested", "b.png"), b"second cat")
+        self.write("c.txt", b"not a cat")
+
+    def tearDown(self):
+        """Clean up after tests."""
+        self.temp_dir.cleanup()
+
+    def write(self, name, data):
+        """Write a file under the scanned directory."""
+        path = os.path.join(self.root, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_incremental_scan(self):
+        """Test that rescans only inspect new and changed files."""
+        index = LocalImageIndex(self.index_path)
+        with patch.object(local_images, "inspect_images", wraps=inspect_images) as mock_inspect:
+            result = index.scan([self.root], max_workers=1)
+            self.assertEqual([os.path.basename(path) for path in result["added"]], ["a.jpg", "b.png"])
+            self.assertEqual(index.get(result["added"][0])["sha256"], hashlib.sha256(b"first cat").hexdigest())
+
+            # A new index loads what the last scan saved, so nothing is inspected again
+            index = LocalImageIndex(self.index_path)
+            result = index.scan([self.root], max_workers=1)
+            self.assertEqual(len(result["unchanged"]), 2)
+            self.assertEqual(mock_inspect.call_args.args[0], [])
+
+            # Changed, new and deleted files
+            changed = self.write("a.jpg", b"first cat, again")
+            added = self.write("d.webp", b"third cat")
+            os.remove(os.path.join(self.root, "nested", "b.png"))
+            result = index.scan([self.root], max_workers=1)
+            self.assertEqual(mock_inspect.call_args.args[0], [changed, added])
+            self.assertEqual(result["changed"], [changed])
+            self.assertEqual(result["added"], [added])
+            self.assertEqual([os.path.basename(path) for path in result["removed"]], ["b.png"])
+            self.assertEqual(index.get(changed)["bytes"], len(b"first cat, again"))
+            self.assertEqual(index.count, 2)
+
+    def test_inspect_images_in_parallel(self):
+        """Test that large batches give the same results in a worker pool."""
+        paths = [self.write(f"cat{i}.jpg", f"cat {i}".encode()) for i in range(local_images.MIN_PARALLEL_BATCH)]
+        self.assertEqual(inspect_images(paths, max_workers=2), [inspect_image(path) for path in paths])
+        self.assertIsNone(inspect_image(os.path.join(self.root, "missing.jpg")))
+
+    def test_errors_on_stderr(self):
+        """Test that errors are reported on stderr, since stdout carries the stdio transport."""
+        with open(self.index_path, "w") as f:
+            f.write("not an index")
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stdout(out), redirect_stderr(err):
+            index = LocalImageIndex(self.index_path)
+            index.scan([self.root, os.path.join(self.temp_dir.name, "missing")], max_workers=1)
+            inspect_image(os.path.join(self.root, "missing.jpg"))
+        self.assertEqual(out.getvalue(), "")
+        self.assertIn("Error loading local image index", err.getvalue())
+        self.assertIn("Error scanning directory", err.getvalue())
+        self.assertIn("Error reading image", err.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
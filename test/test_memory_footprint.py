@@ -0,0 +1,140 @@
+"""
+Memory footprint regression tests for catalog and session state.
+
+Budgets are in bytes per catalog entry or per session, measured with
+tracemalloc, and sit about 20% above the footprint measured when they were
+set. A change that grows the footprint past a budget fails here; raise the
+budget only when the growth is intended.
+
+The 10k and 100k scales always run. Set CAT_MEMORY_LARGE=1 to also run the
+1M scale, which takes a few minutes.
+"""
+import unittest
+import gc
+import json
+import os
+import tempfile
+import tracemalloc
+from unittest.mock import patch
+from src.break_reminder import BreakReminderSystem
+from src.cat_manager import CatManager
+from src.event_log import EventLog
+
+
+SCALES = [10_000, 100_000] + ([1_000_000] if os.environ.get("CAT_MEMORY_LARGE") == "1" else [])
+
+# Memory held by a loaded catalog (URLs, metadata and search index)
+CATALOG_BYTES_PER_ENTRY = 1100
+
+# Peak memory while loading the catalog from its files
+LOAD_PEAK_BYTES_PER_ENTRY = 1300
+
+# Peak memory while saving the cache and metadata files; they are streamed, not built in memory
+SAVE_PEAK_BYTES_PER_ENTRY = 64
+
+# A list_cats copy shares the URL strings, so it costs one pointer per entry
+LIST_BYTES_PER_ENTRY = 8.5
+
+# Break reminder state of one session
+SESSION_BYTES = 420
+
+
+class TestMemoryFootprint(unittest.TestCase):
+    """Memory footprint regression tests."""
+
+    _catalog_measurements = {}
+
+    def _measure_catalog(self, count):
+        """Measure the memory of a catalog of count entries, once per scale."""
+        if count in self._catalog_measurements:
+            return self._catalog_measurements[count]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_file_path = os.path.join(temp_dir, "cat_cache.json")
+            with open(cache_file_path, "w") as f:
+                json.dump([f"https://example.com/cats/{i}/tabby_cat_{i}.jpg" for i in range(count)], f)
+            with open(os.path.join(temp_dir, "cat_cache.meta.json"), "w") as f:
+                json.dump([{"tags": ["tabby", "orange"], "source": "url", "added_at": 1.7e9 + i} for i in range(count)], f)
+
+            with patch('src.cat_manager.get_cache_file_path', return_value=cache_file_path), \
+                    patch('src.cat_manager.get_image_cache_dir', return_value=os.path.join(temp_dir, "images")):
+                # Build the index sidecar and snapshots so that the measured load reads every file
+                cat_manager = CatManager()
+                cat_manager._save_to_cache()
+                cat_manager._save_metadata()
+                del cat_manager
+                gc.collect()
+
+                tracemalloc.start()
+                try:
+                    cat_manager = CatManager()
+                    loaded, load_peak = tracemalloc.get_traced_memory()
+
+                    tracemalloc.reset_peak()
+                    cat_manager._save_to_cache()
+                    cat_manager._save_metadata()
+                    save_peak = tracemalloc.get_traced_memory()[1] - loaded
+
+                    before = tracemalloc.get_traced_memory()[0]
+                    cat_images = cat_manager.list_cats()
+                    listed = tracemalloc.get_traced_memory()[0] - before
+                    del cat_images
+                finally:
+                    tracemalloc.stop()
+
+        measurements = {
+            "catalog": loaded / count,
+            "load_peak": load_peak / count,
+            "save_peak": save_peak / count,
+            "list": listed / count
+        }
+        self._catalog_measurements[count] = measurements
+        return measurements
+
+    def test_catalog_bytes_per_entry(self):
+        """Test the memory held by a loaded catalog."""
+        for count in SCALES:
+            with self.subTest(count=count):
+                self.assertLessEqual(self._measure_catalog(count)["catalog"], CATALOG_BYTES_PER_ENTRY)
+
+    def test_load_peak(self):
+        """Test the peak memory of loading the catalog."""
+        for count in SCALES:
+            with self.subTest(count=count):
+                self.assertLessEqual(self._measure_catalog(count)["load_peak"], LOAD_PEAK_BYTES_PER_ENTRY)
+
+    def test_save_peak(self):
+        """Test the peak memory of saving the catalog."""
+        for count in SCALES:
+            with self.subTest(count=count):
+                self.assertLessEqual(self._measure_catalog(count)["save_peak"], SAVE_PEAK_BYTES_PER_ENTRY)
+
+    def test_list_cats(self):
+        """Test the memory of a list_cats copy."""
+        for count in SCALES:
+            with self.subTest(count=count):
+                self.assertLessEqual(self._measure_catalog(count)["list"], LIST_BYTES_PER_ENTRY)
+
+    def test_session_bytes(self):
+        """Test the memory of per-session break reminder state."""
+        for count in SCALES:
+            with self.subTest(count=count):
+                event_log = EventLog()
+                gc.collect()
+
+                tracemalloc.start()
+                try:
+                    break_reminders = {
+                        f"session-{i}": BreakReminderSystem(session_id=f"session-{i}", event_log=event_log)
+                        for i in range(count)
+                    }
+                    used = tracemalloc.get_traced_memory()[0]
+                finally:
+                    tracemalloc.stop()
+
+                self.assertEqual(len(break_reminders), count)
+                self.assertLessEqual(used / count, SESSION_BYTES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Tests for the Profiler class.
+"""
+import unittest
+import pstats
+import tempfile
+import time
+import tracemalloc
+from src.cat_index import CatIndex, tokenize
+from src.profiler import MODE_CPROFILE, MODE_SAMPLING, Profiler
+
+
+def _busy(seconds):
+    """Tokenize text until the given number of seconds have passed."""
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        tokenize("Orange tabby cat sitting on a warm keyboard")
+
+
+class TestProfiler(unittest.TestCase):
+    """Tests for the Profiler class."""
+
+    def setUp(self):
+        """Set up a Profiler writing to a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.profiler = Profiler(self.temp_dir.name, max_seconds=5, sample_interval=0.001)
+
+    def tearDown(self):
+        """Clean up after tests."""
+        if self.profiler.active:
+            self.profiler.stop()
+        self.temp_dir.cleanup()
+
+    def test_sampling_capture(self):
+        """Test that a sampling capture finds hot functions and stops by itself."""
+        self.profiler.start(MODE_SAMPLING, seconds=0.3, trace_memory=False)
+        _busy(0.5)
+
+        # The capture stopped at its deadline
+        for _ in range(100):
+            if not self.profiler.active:
+                break
+            time.sleep(0.01)
+        report = self.profiler.last_report
+        self.assertIsNotNone(report)
+        self.assertIn("tokenize", [spot["function"] for spot in report["hot_spots"]])
+
+        # Folded stacks are written one per line with a sample count
+        with open(report["files"][0]) as f:
+            line = f.readline()
+        self.assertTrue(report["files"][0].endswith(".folded"))
+        self.assertTrue(line.rstrip().rsplit(" ", 1)[1].isdigit())
+
+    def test_cprofile_capture(self):
+        """Test a cProfile capture with a memory snapshot."""
+        self.profiler.start(MODE_CPROFILE, seconds=5)
+        index = CatIndex()
+        for i in range(2000):
+            index.add(i, tokenize(f"cat number {i} tabby"))
+        report = self.profiler.stop()
+
+        self.assertFalse(self.profiler.active)
+        self.assertIn("add", [spot["function"] for spot in report["hot_spots"]])
+        self.assertIn("cat_index.py", [spot["file"] for spot in report["memory"]])
+        self.assertFalse(tracemalloc.is_tracing())
+
+        # The files are in standard formats
+        stats_path = next(path for path in report["files"] if path.endswith(".pstats"))
+        pstats.Stats(stats_path)
+        snapshot_path = next(path for path in report["files"] if path.endswith(".tracemalloc"))
+        tracemalloc.Snapshot.load(snapshot_path)
+
+    def test_one_capture_at_a_time(self):
+        """Test that captures cannot overlap and are bounded."""
+        capture = self.profiler.start(MODE_SAMPLING, seconds=60, trace_memory=False)
+        self.assertEqual(capture["seconds"], 5)
+        with self.assertRaises(RuntimeError):
+            self.profiler.start(MODE_SAMPLING)
+
+        self.profiler.stop()
+        with self.assertRaises(RuntimeError):
+            self.profiler.stop()
+        with self.assertRaises(ValueError):
+            self.profiler.start("perf")
+
+    def test_stop_if_expired(self):
+        """Test that only expired captures are stopped."""
+        self.profiler.start(MODE_CPROFILE, seconds=5, trace_memory=False)
+        self.assertIsNone(self.profiler.stop_if_expired())
+        self.assertTrue(self.profiler.active)
+
+        self.profiler.stop()
+        self.profiler.start(MODE_CPROFILE, seconds=0, trace_memory=False)
+        self.assertIsNotNone(self.profiler.stop_if_expired())
+        self.assertFalse(self.profiler.active)
+
+
+if __name__ == "__main__":
+    unittest.main()
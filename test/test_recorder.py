@@ -0,0 +1,107 @@
+"""
+Tests for the TrafficRecorder class.
+"""
+import unittest
+import asyncio
+import inspect
+import json
+import os
+import tempfile
+from src.recorder import KIND_RESOURCE, KIND_TOOL, TrafficRecorder, read_recording, read_recordings
+
+
+class TestTrafficRecorder(unittest.TestCase):
+    """Tests for the TrafficRecorder class."""
+
+    def setUp(self):
+        """Set up a TrafficRecorder writing to a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "recordings", "traffic.jsonl")
+        self.recorder = TrafficRecorder(self.path)
+
+    def tearDown(self):
+        """Clean up after tests."""
+        self.recorder.close()
+        self.temp_dir.cleanup()
+
+    def test_wrap(self):
+        """Test that wrapped functions keep their signature and record their calls."""
+        def show_cat(index: int, ctx=None) -> str:
+            """Show a cat."""
+            if index < 0:
+                raise ValueError("Negative index")
+            return f"cat {index}"
+
+        async def add_cat(url: str, tags=None, ctx=None) -> int:
+            """Add a cat."""
+            return 7
+
+        session_of = lambda args: args.get("ctx") or "default"
+        wrapped_show_cat = self.recorder.wrap(KIND_TOOL, "show_cat", show_cat, session_of)
+        wrapped_add_cat = self.recorder.wrap(KIND_TOOL, "add_cat", add_cat, session_of)
+        self.assertEqual(wrapped_show_cat.__name__, "show_cat")
+        self.assertEqual(wrapped_show_cat.__doc__, "Show a cat.")
+        self.assertEqual(inspect.signature(wrapped_show_cat), inspect.signature(show_cat))
+        self.assertTrue(inspect.iscoroutinefunction(wrapped_add_cat))
+        self.assertFalse(os.path.exists(self.path))
+
+        self.assertEqual(wrapped_show_cat(2, ctx="alice"), "cat 2")
+        self.assertEqual(asyncio.run(wrapped_add_cat(url="https://example.com/cat.jpg")), 7)
+        with self.assertRaises(ValueError):
+            wrapped_show_cat(index=-1)
+
+        header, calls = read_recording(self.path)
+        self.assertEqual(header["version"], 1)
+        self.assertEqual(
+            [(call["name"], call["args"], call["session"], call["error"]) for call in calls],
+            [
+                ("show_cat", {"index": 2}, "alice", None),
+                ("add_cat", {"url": "https://example.com/cat.jpg"}, "default", None),
+                ("show_cat", {"index": -1}, "default", "ValueError")
+            ]
+        )
+        self.assertTrue(all(call["kind"] == KIND_TOOL and call["latency_ms"] >= 0 for call in calls))
+        self.assertEqual(calls, sorted(calls, key=lambda call: call["offset"]))
+
+    def test_compact_lines(self):
+        """Test that calls are written as compact JSON lines."""
+        self.recorder.record(KIND_RESOURCE, "cat://{index}", {"index": 3}, "default", 0.0, 0.0012)
+        with open(self.path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertNotIn(" ", lines[1])
+        self.assertEqual(json.loads(lines[1])["l"], 1.2)
+
+    def test_read_recordings(self):
+        """Test merging the recordings of several processes by start time."""
+        other_path = os.path.join(self.temp_dir.name, "other.jsonl")
+        other = TrafficRecorder(other_path)
+        self.recorder.record(KIND_TOOL, "show_cat", {"index": 0}, "a", self.recorder._started_perf + 2.0, 0.001)
+        other.record(KIND_TOOL, "show_cat", {"index": 1}, "b", other._started_perf + 0.5, 0.001)
+        other.close()
+
+        # Shift the other recording to start a second after this one
+        with open(other_path) as f:
+            lines = f.read().splitlines()
+        header = json.loads(lines[0])
+        header["start"] = self.recorder._started_at + 1.0
+        with open(other_path, "w") as f:
+            f.write("\n".join([json.dumps(header)] + lines[1:]) + "\n")
+
+        self.recorder.close()
+        calls = read_recordings([self.path, other_path])
+        self.assertEqual([call["session"] for call in calls], ["b", "a"])
+        self.assertAlmostEqual(calls[0]["offset"], 1.5, places=3)
+        self.assertAlmostEqual(calls[1]["offset"], 2.0, places=3)
+
+    def test_not_a_recording(self):
+        """Test that other files are rejected."""
+        path = os.path.join(self.temp_dir.name, "cats.json")
+        with open(path, "w") as f:
+            f.write("[]\n")
+        with self.assertRaises(ValueError):
+            read_recording(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
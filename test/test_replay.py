@@ -0,0 +1,84 @@
+"""
+Tests for the traffic replay harness.
+"""
+import unittest
+import asyncio
+import os
+import tempfile
+from unittest.mock import patch
+from src.recorder import KIND_RESOURCE, KIND_TOOL, TrafficRecorder, read_recordings
+from src.replay import format_report, in_process_target, replay, resource_uri, summarize
+
+
+class TestReplay(unittest.TestCase):
+    """Tests for the traffic replay harness."""
+
+    def setUp(self):
+        """Record some traffic and keep the replayed catalog in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_patcher = patch(
+            'cat_manager.get_cache_file_path',
+            return_value=os.path.join(self.temp_dir.name, "cat_cache.json")
+        )
+        self.cache_patcher.start()
+        self.image_cache_patcher = patch(
+            'cat_manager.get_image_cache_dir',
+            return_value=os.path.join(self.temp_dir.name, "images")
+        )
+        self.image_cache_patcher.start()
+        self.event_log_patcher = patch('server.get_event_log_dir', return_value=os.path.join(self.temp_dir.name, "event_log"))
+        self.event_log_patcher.start()
+
+        self.path = os.path.join(self.temp_dir.name, "traffic.jsonl")
+        recorder = TrafficRecorder(self.path)
+        start = recorder._started_perf
+        recorder.record(KIND_TOOL, "show_cat", {"index": 1}, "alice", start + 0.01, 0.001)
+        recorder.record(KIND_RESOURCE, "cat://{index}/entry", {"index": 2}, "bob", start + 0.02, 0.001)
+        recorder.record(KIND_TOOL, "search_cats", {"query": "cat", "limit": 5}, "bob", start + 0.03, 0.002)
+        recorder.record(KIND_RESOURCE, "cat://changes/{since}", {"since": "x"}, "alice", start + 0.04, 0.001, "ValueError")
+        recorder.close()
+        self.calls = read_recordings([self.path])
+
+    def tearDown(self):
+        """Clean up after tests."""
+        self.cache_patcher.stop()
+        self.image_cache_patcher.stop()
+        self.event_log_patcher.stop()
+        self.temp_dir.cleanup()
+
+    def test_replay_in_process(self):
+        """Test replaying a recording against an in-process server, back to back and on schedule."""
+        for speed in (0, 10):
+            results = asyncio.run(replay(self.calls, in_process_target(), speed))
+            self.assertEqual(
+                [result["name"] for result in results],
+                ["show_cat", "cat://{index}/entry", "search_cats", "cat://changes/{since}"]
+            )
+            self.assertEqual([result["error"] is None for result in results], [True, True, True, False])
+            self.assertTrue(all(result["latency_ms"] > 0 for result in results))
+
+    def test_summary_and_report(self):
+        """Test summarizing latencies and comparing them with a baseline."""
+        results = [
+            {"name": "show_cat", "latency_ms": latency, "recorded_latency_ms": 1.0, "error": None}
+            for latency in (1.0, 2.0, 3.0, 4.0)
+        ]
+        results.append({"name": "search_cats", "latency_ms": 5.0, "recorded_latency_ms": 2.0, "error": "ToolError"})
+        summary = summarize(results)
+        self.assertEqual(summary["show_cat"], {"count": 4, "errors": 0, "p50_ms": 2.0, "p95_ms": 4.0, "recorded_p50_ms": 1.0})
+        self.assertEqual(summary["search_cats"]["errors"], 1)
+
+        baseline = {"show_cat": {**summary["show_cat"], "p50_ms": 4.0, "p95_ms": 4.0}}
+        report = format_report(summary, baseline).splitlines()
+        self.assertEqual(len(report), 3)
+        self.assertIn("-50.0%", report[2])
+        self.assertIn("+0.0%", report[2])
+
+    def test_resource_uri(self):
+        """Test building resource URIs from recorded templates."""
+        self.assertEqual(resource_uri("cat://{index}/entry", {"index": 3}), "cat://3/entry")
+        self.assertEqual(resource_uri("cat://version", {}), "cat://version")
+
+
+if __name__ == "__main__":
+    unittest.main()
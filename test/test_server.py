@@ -2,8 +2,21 @@
 Tests for the CatServer class.
 """
 import unittest
-from unittest.mock import MagicMock, patch
-from src.server import CatServer
+import asyncio
+import http.client
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
+from pydantic import AnyUrl
+from src import image_hash
+from src.recorder import read_recording
+from src.server import CatServer, create_http_app
+from src.shared_state import SharedStateStore
 
 
 class TestCatServer(unittest.TestCase):
@@ -19,12 +32,34 @@ class TestCatServer(unittest.TestCase):
         self.mock_mcp_instance = MagicMock()
         self.mock_fastmcp.return_value = self.mock_mcp_instance
         
+        # Keep the catalog in a temporary directory
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_patcher = patch(
+            'cat_manager.get_cache_file_path',
+            return_value=os.path.join(self.temp_dir.name, "test_cat_cache.json")
+        )
+        self.cache_patcher.start()
+        self.image_cache_patcher = patch(
+            'cat_manager.get_image_cache_dir',
+            return_value=os.path.join(self.temp_dir.name, "images")
+        )
+        self.image_cache_patcher.start()
+        self.event_log_patcher = patch(
+            'src.server.get_event_log_dir',
+            return_value=os.path.join(self.temp_dir.name, "event_log")
+        )
+        self.event_log_patcher.start()
+        
         # Create a CatServer instance
         self.server = CatServer()
     
     def tearDown(self):
         """Clean up after tests."""
         self.mock_fastmcp_patcher.stop()
+        self.cache_patcher.stop()
+        self.image_cache_patcher.stop()
+        self.event_log_patcher.stop()
+        self.temp_dir.cleanup()
     
     def test_initialization(self):
         """Test server initialization."""
@@ -32,10 +67,46 @@ class TestCatServer(unittest.TestCase):
         self.mock_fastmcp.assert_called_once_with("MCP Cat Server")
         
         # Verify that tools were registered
-        self.assertEqual(self.mock_mcp_instance.tool.call_count, 4)
+        self.assertEqual(self.mock_mcp_instance.tool.call_count, 7)
         
         # Verify that resources were registered
-        self.assertEqual(self.mock_mcp_instance.resource.call_count, 1)
+        self.assertEqual(self.mock_mcp_instance.resource.call_count, 4)
+    
+    def test_profiling_tools(self):
+        """Test that profiling tools are only registered for admins."""
+        settings = {"admin_tools": True, "admin_token": "s3cret", "max_seconds": 5, "sample_interval": 0.005}
+        with patch('src.server.get_profiling_settings', return_value=settings):
+            server = CatServer()
+        self.assertEqual(self.mock_mcp_instance.tool.call_count, 7 + 9)
+        
+        with self.assertRaises(ValueError):
+            server.stop_profile()
+        
+        # The client id is chosen by the client, so it grants nothing
+        ctx = MagicMock()
+        ctx.client_id = "ops"
+        ctx.request_context.request.headers = {}
+        with self.assertRaises(PermissionError):
+            server.stop_profile(ctx=ctx)
+        ctx.request_context.request.headers = {"authorization": "Bearer wrong"}
+        with self.assertRaises(PermissionError):
+            asyncio.run(server.start_profile(seconds=1, ctx=ctx))
+        self.assertFalse(server.profiler.active)
+        
+        # HTTP requests with the admin token and stdio requests are admitted
+        ctx.request_context.request.headers = {"authorization": "Bearer s3cret"}
+        with self.assertRaises(ValueError):
+            server.stop_profile(ctx=ctx)
+        ctx.request_context.request = None
+        with self.assertRaises(ValueError):
+            server.stop_profile(ctx=ctx)
+        
+        # Without a configured token, HTTP requests are never admitted
+        server._admin_token = None
+        ctx.request_context.request = MagicMock()
+        ctx.request_context.request.headers = {"authorization": "Bearer None"}
+        with self.assertRaises(PermissionError):
+            server.stop_profile(ctx=ctx)
     
     def test_show_cat(self):
         """Test showing a cat image."""
@@ -58,6 +129,38 @@ class TestCatServer(unittest.TestCase):
         # Verify that the break counters were reset
         self.assertEqual(self.server.break_reminder._command_count, 0)
     
+    def test_show_cat_local_url(self):
+        """Test that show_cat links to the image server for cached images."""
+        settings = {"enabled": True, "host": "127.0.0.1", "port": 8001, "base_url": None}
+        with patch('src.server.get_image_server_settings', return_value=settings):
+            server = CatServer()
+        
+        url = "https://example.com/cat.jpg"
+        index = server.cat_manager.add_cat(url)
+        self.assertNotIn("local_url", server.show_cat(index))
+        
+        # Cache the image
+        path = server.cat_manager._image_cache.path_for(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"cat")
+        
+        result = server.show_cat(index)
+        self.assertEqual(result["local_url"], f"http://127.0.0.1:8001/images/{os.path.basename(path)}")
+        self.assertNotIn("local_url", self.server.show_cat(index))
+        
+        # Local image files are served through links in the image cache
+        root = os.path.join(self.temp_dir.name, "photos")
+        os.makedirs(root)
+        with open(os.path.join(root, "cat.png"), "wb") as f:
+            f.write(b"local cat")
+        server.cat_manager.scan_local_images([root], max_workers=1)
+        local_index = server.cat_manager.count - 1
+        local_url = server.show_cat(local_index)["local_url"]
+        self.assertRegex(local_url, r"^http://127\.0\.0\.1:8001/images/[0-9a-f]{64}\.png$")
+        with open(os.path.join(server.cat_manager._image_cache.cache_dir, os.path.basename(local_url)), "rb") as f:
+            self.assertEqual(f.read(), b"local cat")
+    
     def test_show_cat_only(self):
         """Test showing only a cat image without metadata."""
         # Get the initial count of default images
@@ -84,16 +187,88 @@ class TestCatServer(unittest.TestCase):
         
         # Call add_cat
         url = "https://example.com/cat.jpg"
-        result = self.server.add_cat(url)
+        result = asyncio.run(self.server.add_cat(url))
         
         # Verify the result
         self.assertEqual(result["index"], initial_count)
+        self.assertEqual(result["near_duplicates"], [])
         self.assertIn("break_reminder", result)
         
         # Verify that the cat image was added
         self.assertEqual(self.server.cat_manager.count, initial_count + 1)
         self.assertEqual(self.server.cat_manager.get_cat(initial_count), url)
     
+    def enable_image_fetch(self):
+        """Download images added by add_cat, as with image_fetch.on_add set."""
+        self.server._image_fetch = {"on_add": True, "timeout": 1.0, "max_bytes": 1024 * 1024, "workers": 1}
+        self.server._fetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cat-image-fetch")
+        self.addCleanup(self.server._fetch_executor.shutdown)
+    
+    def test_add_cat_fetches_off_write_queue(self):
+        """Test that a download for add_cat does not hold up the write queue."""
+        self.enable_image_fetch()
+        
+        def fetch_image(url, timeout, max_bytes):
+            # Other writes are served while the download is in progress
+            self.assertEqual(self.server.admission.submit_write("add_cat", lambda: "written").result(timeout=5), "written")
+            return None
+        
+        with patch.object(self.server.cat_manager, "fetch_image", side_effect=fetch_image) as fetch:
+            asyncio.run(self.server.add_cat("https://example.com/cat.png"))
+        fetch.assert_called_once_with("https://example.com/cat.png", 1.0, 1024 * 1024)
+    
+    @unittest.skipIf(image_hash._pillow() is None, "Pillow is not installed")
+    def test_add_cat_fetches_image(self):
+        """Test that added cat images are downloaded and hashed when enabled."""
+        from io import BytesIO
+        from PIL import Image
+        
+        buffer = BytesIO()
+        Image.linear_gradient("L").rotate(90).resize((64, 48)).save(buffer, format="PNG")
+        
+        def urlopen(url, timeout):
+            response = MagicMock()
+            response.__enter__.return_value.read.side_effect = BytesIO(buffer.getvalue()).read
+            response.__enter__.return_value.headers.get.return_value = None
+            response.__enter__.return_value.headers.get_content_type.return_value = "image/png"
+            return response
+        
+        self.enable_image_fetch()
+        with patch("urllib.request.urlopen", side_effect=urlopen):
+            index = asyncio.run(self.server.add_cat("https://example.com/cat.png"))["index"]
+            result = asyncio.run(self.server.add_cat("https://mirror.example.com/cat.png"))
+        self.assertEqual(result["near_duplicates"], [index])
+    
+    def test_search_cats(self):
+        """Test searching cat images."""
+        # Add a tagged cat image URL
+        url = "https://example.com/cat.jpg"
+        index = asyncio.run(self.server.add_cat(url, tags=["calico"]))["index"]
+        
+        # Call search_cats
+        result = self.server.search_cats("calico")
+        
+        # Verify the result
+        self.assertEqual(result["results"], [{"index": index, "cat_url": url, "tags": ["calico"]}])
+        self.assertIn("break_reminder", result)
+    
+    def test_add_cat_rate_limit(self):
+        """Test that a session looping on add_cat is asked to retry later."""
+        limit = self.server.admission._tool_limits["add_cat"]["burst"]
+        for i in range(limit):
+            asyncio.run(self.server.add_cat(f"https://example.com/cat{i}.jpg"))
+        
+        with self.assertRaisesRegex(Exception, "retry after"):
+            asyncio.run(self.server.add_cat("https://example.com/one-too-many.jpg"))
+        
+        # Reads are still served
+        self.assertIsNotNone(self.server.show_cat_only(0))
+        
+        # Verify the metrics
+        metrics = self.server.admission_stats()["tools"]["add_cat"]
+        self.assertEqual(metrics["queued"], limit)
+        self.assertEqual(metrics["rate_limited"], 1)
+    
     def test_should_take_break(self):
         """Test checking if it's time for a break."""
         # Call should_take_break
@@ -106,6 +281,73 @@ class TestCatServer(unittest.TestCase):
         # Verify that an interaction was recorded
         self.assertEqual(self.server.break_reminder._command_count, 1)
     
+    def test_sessions(self):
+        """Test that break reminders are tracked per session."""
+        ctx = MagicMock()
+        ctx.request_context.request = None
+        ctx.client_id = "agent-1"
+        
+        # Calls from the session do not count towards the default session
+        self.server.should_take_break(ctx=ctx)
+        self.server.should_take_break(ctx=ctx)
+        self.assertEqual(self.server.break_reminder._command_count, 0)
+        session_id = f"session-{id(ctx.request_context.session)}"
+        self.assertEqual(self.server._break_reminders[session_id]._command_count, 2)
+        
+        # The client id is chosen by the client, so it does not start a new session
+        ctx.client_id = "agent-2"
+        self.server.should_take_break(ctx=ctx)
+        self.assertEqual(list(self.server._break_reminders), [session_id])
+        
+        # Only the most recently used sessions are kept
+        self.server.MAX_BREAK_REMINDERS = 2
+        for _ in range(3):
+            other = MagicMock()
+            other.request_context.request = None
+            self.server.should_take_break(ctx=other)
+        self.assertEqual(len(self.server._break_reminders), 2)
+        self.assertNotIn(session_id, self.server._break_reminders)
+    
+    def test_http_sessions(self):
+        """Test that HTTP requests are only identified by a session id header."""
+        ctx = MagicMock()
+        ctx.request_context.request.headers = {"mcp-session-id": "issued"}
+        self.assertEqual(self.server._get_session_id(ctx), "issued")
+        
+        ctx.request_context.request.headers = {}
+        self.assertEqual(self.server._get_session_id(ctx), "anonymous")
+    
+    def test_break_stats(self):
+        """Test getting break statistics across sessions."""
+        ctx = MagicMock()
+        ctx.request_context.request = None
+        ctx.client_id = "agent-1"
+        self.server.should_take_break()
+        self.server.show_cat(0, ctx=ctx)
+        
+        # Showing a cat before a break was suggested does not count as a break
+        result = self.server.break_stats(window_minutes=5)
+        self.assertEqual(result["interactions"], 2)
+        self.assertEqual(result["breaks_suggested"], 0)
+        self.assertEqual(result["breaks_taken"], 0)
+        
+        # Reach the command interval so the next cat is a suggested break
+        for _ in range(self.server._command_interval):
+            self.server.should_take_break(ctx=ctx)
+        self.server.show_cat(0, ctx=ctx)
+        
+        # Call break_stats
+        result = self.server.break_stats(window_minutes=5)
+        
+        # Verify the result
+        self.assertEqual(result["breaks_suggested"], 1)
+        self.assertEqual(result["breaks_taken"], 1)
+        self.assertEqual(result["compliance_rate"], 1.0)
+        self.assertEqual(result["active_sessions"], 2)
+        
+        # Verify that no interaction was recorded
+        self.assertEqual(self.server.break_reminder._command_count, 1)
+    
     def test_get_cat_resource(self):
         """Test getting a cat image resource."""
         # Get a default cat image
@@ -123,6 +365,159 @@ class TestCatServer(unittest.TestCase):
         result = self.server.get_cat_resource(index)
         self.assertEqual(result, url)
     
+    def test_get_cat_entry_resource(self):
+        """Test getting a cat image entry with its ETag."""
+        # Add a cat image URL
+        url = "https://example.com/cat.jpg"
+        index = self.server.cat_manager.add_cat(url, tags=["calico"])
+        
+        # Test the entry contents
+        entry = json.loads(self.server.get_cat_entry_resource(index))
+        self.assertEqual(entry["index"], index)
+        self.assertEqual(entry["cat_url"], url)
+        self.assertEqual(entry["tags"], ["calico"])
+        self.assertEqual(entry["etag"], self.server.show_cat(index)["etag"])
+        
+        # Wrapped indexes share the entry
+        wrapped = index + self.server.cat_manager.count
+        self.assertEqual(self.server.get_cat_entry_resource(wrapped), self.server.get_cat_entry_resource(index))
+    
+    def test_entry_cache_invalidation(self):
+        """Test that cached entries are rebuilt when the catalog changes."""
+        count = self.server.cat_manager.count
+        
+        # Index count wraps around to the first cat image
+        first = self.server.get_cat_entry_resource(count)
+        self.assertIs(self.server.get_cat_entry_resource(count), first)
+        
+        # After adding a cat image, index count is the new cat image
+        url = "https://example.com/cat.jpg"
+        self.server.cat_manager.add_cat(url)
+        self.assertEqual(self.server.get_cat_resource(count), url)
+        self.assertNotEqual(self.server.get_cat_entry_resource(count), first)
+    
+    def test_entry_cache_size(self):
+        """Test that the entry cache is bounded."""
+        self.server.ENTRY_CACHE_SIZE = 2
+        for index in range(4):
+            self.server.get_cat_resource(index)
+        self.assertEqual(list(self.server._entry_cache), [2, 3])
+    
+    def test_get_version_resource(self):
+        """Test getting the catalog version."""
+        version = json.loads(self.server.get_version_resource())
+        self.server.cat_manager.add_cat("https://example.com/cat.jpg")
+        new_version = json.loads(self.server.get_version_resource())
+        
+        self.assertGreater(new_version["generation"], version["generation"])
+        self.assertEqual(new_version["count"], version["count"] + 1)
+    
+    def test_get_changes_resource(self):
+        """Test reading the catalog change feed."""
+        count = self.server.cat_manager.count
+        changes = json.loads(self.server.get_changes_resource(str(count)))
+        self.assertEqual(changes["changes"], [])
+        
+        # Only entries added after the sequence number are returned
+        url = "https://example.com/cat.jpg"
+        index = self.server.cat_manager.add_cat(url, tags=["calico"])
+        changes = json.loads(self.server.get_changes_resource(str(changes["next"])))
+        self.assertEqual([change["cat_url"] for change in changes["changes"]], [url])
+        self.assertEqual(changes["changes"][0]["index"], index)
+        self.assertEqual(changes["next"], count + 1)
+        self.assertEqual(changes["epoch"], json.loads(self.server.get_version_resource())["epoch"])
+        
+        # A sequence number from another epoch that is beyond the latest one starts over
+        changes = json.loads(self.server.get_changes_resource(str(count + 100)))
+        self.assertTrue(changes["reset"])
+        self.assertEqual(changes["changes"][0]["seq"], 1)
+        
+        with self.assertRaises(ValueError):
+            self.server.get_changes_resource("-1")
+    
+    def test_change_notifications(self):
+        """Test that subscribers are notified when a cat image is added."""
+        session = MagicMock()
+        session.send_resource_updated = AsyncMock()
+        self.mock_mcp_instance._mcp_server.request_context.session = session
+        asyncio.run(self.server._subscribe(AnyUrl("cat://changes/0")))
+        
+        asyncio.run(self.server.add_cat("https://example.com/cat.jpg"))
+        session.send_resource_updated.assert_awaited_once_with(AnyUrl("cat://changes/0"))
+        
+        # Unsubscribed sessions are not notified
+        asyncio.run(self.server._unsubscribe(AnyUrl("cat://changes/0")))
+        asyncio.run(self.server.add_cat("https://example.com/other.jpg"))
+        session.send_resource_updated.assert_awaited_once()
+    
+    def test_traffic_recording(self):
+        """Test that tool calls and resource reads are recorded when enabled."""
+        recording_dir = os.path.join(self.temp_dir.name, "recordings")
+        with patch('src.server.get_recording_settings', return_value={"enabled": True}), \
+                patch('src.server.get_recording_dir', return_value=recording_dir):
+            server = CatServer()
+        self.mock_mcp_instance.get_context.return_value = None
+        
+        server.show_cat(3)
+        asyncio.run(server.add_cat("https://example.com/cat.jpg", tags=["calico"]))
+        server.get_cat_entry_resource(1)
+        with self.assertRaises(ValueError):
+            server.get_changes_resource("latest")
+        
+        header, calls = read_recording(server.recorder.path)
+        self.assertEqual(header["pid"], os.getpid())
+        self.assertEqual(
+            [(call["kind"], call["name"], call["args"], call["session"]) for call in calls],
+            [
+                ("tool", "show_cat", {"index": 3}, "default"),
+                ("tool", "add_cat", {"url": "https://example.com/cat.jpg", "tags": ["calico"]}, "default"),
+                ("resource", "cat://{index}/entry", {"index": 1}, "default"),
+                ("resource", "cat://changes/{since}", {"since": "latest"}, "default")
+            ]
+        )
+        self.assertEqual([call["error"] for call in calls], [None, None, None, "ValueError"])
+        self.assertIsNone(self.server.recorder)
+    
+    def test_shared_state_store(self):
+        """Test that servers sharing a state store see each other's changes."""
+        path = os.path.join(self.temp_dir.name, "state.db")
+        server = CatServer(state_store=SharedStateStore(path))
+        other_server = CatServer(state_store=SharedStateStore(path))
+        count = server.cat_manager.count
+        
+        # A cat image added through one worker is visible from the other
+        url = "https://example.com/cat.jpg"
+        index = asyncio.run(server.add_cat(url))["index"]
+        self.assertEqual(other_server.show_cat_only(index), url)
+        self.assertEqual(json.loads(other_server.get_version_resource())["count"], count + 1)
+        
+        # Adds from both workers are kept
+        other_index = asyncio.run(other_server.add_cat("https://example.com/other.jpg"))["index"]
+        self.assertEqual(asyncio.run(server.add_cat("https://example.com/third.jpg"))["index"], other_index + 1)
+        self.assertEqual(other_server.search_cats("third")["results"][0]["index"], other_index + 1)
+        
+        # Break tracking for a session continues on either worker
+        server.show_cat(0)
+        server.should_take_break()
+        self.assertEqual(other_server.should_take_break()["status"]["command_count"], 2)
+    
+    def test_reads_during_catalog_write(self):
+        """Test that a catalog write in progress does not hold up reads on other workers."""
+        path = os.path.join(self.temp_dir.name, "state.db")
+        server = CatServer(state_store=SharedStateStore(path))
+        other_server = CatServer(state_store=SharedStateStore(path))
+        index = asyncio.run(server.add_cat("https://example.com/cat.jpg"))["index"]
+        
+        with server.state_store.catalog_write():
+            started = time.perf_counter()
+            result = other_server.show_cat(0)
+            other_server.should_take_break()
+            self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertIn("cat_url", result)
+        
+        # The other worker catches up once the write is done
+        self.assertEqual(other_server.show_cat_only(index), "https://example.com/cat.jpg")
+    
     def test_run(self):
         """Test running the server."""
         # Call run
@@ -136,5 +531,91 @@ class TestCatServer(unittest.TestCase):
         self.mock_mcp_instance.run.assert_called_with(transport="websocket")
 
 
+class TestHttpSessions(unittest.TestCase):
+    """Tests for sessions over the streamable HTTP application of a worker."""
+    
+    def setUp(self):
+        """Serve the HTTP application of a worker on a free local port."""
+        import uvicorn
+        
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.patchers = [
+            patch('cat_manager.get_cache_file_path', return_value=os.path.join(self.temp_dir.name, "test_cat_cache.json")),
+            patch('cat_manager.get_image_cache_dir', return_value=os.path.join(self.temp_dir.name, "images")),
+            patch('src.server.get_state_db_path', return_value=os.path.join(self.temp_dir.name, "state.db")),
+            patch('src.server.get_event_log_dir', return_value=os.path.join(self.temp_dir.name, "event_log"))
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+        
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        config = uvicorn.Config(create_http_app(), host="127.0.0.1", port=self.port, log_level="warning")
+        self.uvicorn_server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.uvicorn_server.run, daemon=True)
+        self.thread.start()
+        deadline = time.time() + 10
+        while not self.uvicorn_server.started and time.time() < deadline:
+            time.sleep(0.05)
+    
+    def tearDown(self):
+        """Stop the server and clean up."""
+        self.uvicorn_server.should_exit = True
+        self.thread.join(timeout=10)
+        for patcher in self.patchers:
+            patcher.stop()
+        self.temp_dir.cleanup()
+    
+    async def _command_counts(self, calls: int):
+        """Call should_take_break from a new client session and return the command counts it reports."""
+        from mcp import ClientSession
+        from mcp.client.streamable_http import streamable_http_client
+        
+        counts = []
+        async with streamable_http_client(f"http://127.0.0.1:{self.port}/mcp") as (read, write, _):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                for _ in range(calls):
+                    result = await session.call_tool("should_take_break", {})
+                    counts.append(json.loads(result.content[0].text)["status"]["command_count"])
+        return counts
+    
+    def test_sessions_are_separate(self):
+        """Test that each HTTP client gets its own session."""
+        self.assertEqual(asyncio.run(self._command_counts(2)), [1, 2])
+        self.assertEqual(asyncio.run(self._command_counts(1)), [1])
+    
+    def _call_tool(self, name, session_id=None):
+        """Call a tool with a raw JSON-RPC request and return the session id header of the response."""
+        headers = {"Content-Type": "application/json", "Accept": "application/json, text/event-stream"}
+        if session_id is not None:
+            headers["mcp-session-id"] = session_id
+        body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": name, "arguments": {}}})
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=10)
+        try:
+            conn.request("POST", "/mcp", body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            self.assertEqual(response.status, 200)
+            return response.getheader("mcp-session-id")
+        finally:
+            conn.close()
+    
+    def test_requests_without_session(self):
+        """Test that requests without an issued session id share the anonymous session."""
+        for i in range(20):
+            self.assertIsNone(self._call_tool("should_take_break"))
+            self.assertIsNone(self._call_tool("should_take_break", f"forged-{i}"))
+        
+        store = SharedStateStore(os.path.join(self.temp_dir.name, "state.db"))
+        try:
+            # Besides the anonymous session, only the server's own default session exists
+            rows = store._conn.execute("SELECT session_id FROM sessions ORDER BY session_id").fetchall()
+            self.assertEqual(rows, [("anonymous",), ("default",)])
+        finally:
+            store.close()
+
+
 if __name__ == "__main__":
     unittest.main()
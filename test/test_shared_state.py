@@ -0,0 +1,92 @@
+"""
+Tests for the SharedStateStore class.
+"""
+import unittest
+import os
+import tempfile
+from src.shared_state import SharedStateStore
+
+
+class TestSharedStateStore(unittest.TestCase):
+    """Tests for the SharedStateStore class."""
+    
+    def setUp(self):
+        """Set up two SharedStateStore instances on the same database."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "state.db")
+        self.store = SharedStateStore(self.path)
+        self.other_store = SharedStateStore(self.path)
+    
+    def tearDown(self):
+        """Clean up after tests."""
+        self.store.close()
+        self.other_store.close()
+        self.temp_dir.cleanup()
+    
+    def test_session_state(self):
+        """Test that session state is shared between connections."""
+        self.assertEqual(self.store.get_session("alice", 100.0), (0, 100.0, False))
+        self.assertEqual(self.store.increment_commands("alice", 200.0), 1)
+        self.assertEqual(self.other_store.increment_commands("alice", 200.0), 2)
+        self.assertEqual(self.store.get_session("alice", 200.0), (2, 100.0, False))
+        
+        # New sessions start counting from one
+        self.assertEqual(self.other_store.increment_commands("bob", 300.0), 1)
+    
+    def test_break_suggested(self):
+        """Test that a break suggestion is only marked once."""
+        self.store.get_session("alice", 100.0)
+        self.assertTrue(self.store.mark_break_suggested("alice"))
+        self.assertFalse(self.other_store.mark_break_suggested("alice"))
+        
+        # Resetting the session clears the suggestion, which only one worker claims
+        self.assertTrue(self.other_store.reset_session("alice", 300.0))
+        self.assertFalse(self.store.reset_session("alice", 300.0))
+        self.assertEqual(self.store.get_session("alice", 400.0), (0, 300.0, False))
+        self.assertTrue(self.store.mark_break_suggested("alice"))
+    
+    def test_expire_sessions(self):
+        """Test that sessions idle since a time are deleted."""
+        self.store.increment_commands("alice", 100.0)
+        self.store.increment_commands("bob", 100.0)
+        self.other_store.increment_commands("bob", 300.0)
+        self.assertEqual(self.store.expire_sessions(200.0), 1)
+        self.assertEqual(self.store.get_session("alice", 400.0), (0, 400.0, False))
+        self.assertEqual(self.store.get_session("bob", 400.0), (2, 100.0, False))
+    
+    def test_get_secret(self):
+        """Test that every store gets the same secret."""
+        secret = self.store.get_secret("session_id")
+        self.assertEqual(len(secret), 32)
+        self.assertEqual(self.other_store.get_secret("session_id"), secret)
+        self.assertNotEqual(self.store.get_secret("other"), secret)
+    
+    def test_catalog_write(self):
+        """Test that catalog writes increment the shared generation."""
+        self.assertEqual(self.store.catalog_generation, 0)
+        with self.store.catalog_write() as generation:
+            self.assertEqual(generation, 0)
+        self.assertEqual(self.other_store.catalog_generation, 1)
+        
+        # A failed write leaves the generation unchanged
+        with self.assertRaises(RuntimeError):
+            with self.other_store.catalog_write():
+                raise RuntimeError("write failed")
+        self.assertEqual(self.store.catalog_generation, 1)
+    
+    def test_catalog_lock(self):
+        """Test that a catalog write only excludes catalog reads."""
+        with self.store.catalog_write():
+            # Session updates and generation reads go ahead
+            self.assertEqual(self.other_store.increment_commands("alice", 100.0), 1)
+            self.assertEqual(self.other_store.catalog_generation, 0)
+            
+            with self.other_store.catalog_read(blocking=False) as generation:
+                self.assertIsNone(generation)
+        
+        with self.other_store.catalog_read(blocking=False) as generation:
+            self.assertEqual(generation, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
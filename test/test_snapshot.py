@@ -0,0 +1,90 @@
+"""
+Tests for checksummed snapshots.
+"""
+import unittest
+import json
+import os
+import tempfile
+from unittest.mock import patch
+from src.snapshot import HEADER_SIZE, SnapshotError, read_list_snapshot, read_snapshot, read_snapshot_tail, write_snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    """Tests for checksummed snapshots."""
+
+    def setUp(self):
+        """Set up a temporary snapshot path."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "cats.json")
+
+    def tearDown(self):
+        """Clean up after tests."""
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        """Test that a snapshot reads back verified."""
+        data = [f"https://example.com/cat{i}.jpg" for i in range(10000)]
+        write_snapshot(self.path, data, indent=2)
+        self.assertEqual(read_snapshot(self.path), (data, True))
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+    def test_previous_snapshot(self):
+        """Test that the previous snapshot is kept when a new one is written."""
+        write_snapshot(self.path, ["a"])
+        write_snapshot(self.path, ["a", "b"])
+        self.assertEqual(read_snapshot(self.path)[0], ["a", "b"])
+        self.assertEqual(read_snapshot(self.path + ".prev")[0], ["a"])
+
+    def test_path_always_exists(self):
+        """Test that the snapshot file exists at every step of a replacement."""
+        write_snapshot(self.path, ["a"])
+        replace = os.replace
+        existed = []
+
+        def checked_replace(src, dst):
+            existed.append(os.path.exists(self.path))
+            replace(src, dst)
+
+        with patch("src.snapshot.os.replace", side_effect=checked_replace):
+            write_snapshot(self.path, ["a", "b"])
+        self.assertEqual(existed, [True, True])
+        self.assertEqual(read_snapshot(self.path + ".prev")[0], ["a"])
+        self.assertFalse(os.path.exists(self.path + ".prev.tmp"))
+
+    def test_corruption(self):
+        """Test that truncated and altered snapshots are detected."""
+        write_snapshot(self.path, ["a", "b"])
+        with open(self.path, "rb") as f:
+            contents = f.read()
+
+        for corrupted in (contents[:-3], contents.replace(b'"b"', b'"c"'), contents[:HEADER_SIZE // 2]):
+            with open(self.path, "wb") as f:
+                f.write(corrupted)
+            with self.assertRaises(SnapshotError):
+                read_snapshot(self.path)
+
+    def test_tail(self):
+        """Test that only the items appended since a position are read."""
+        for indent in (None, 0):
+            data = [{"tags": [str(i)]} for i in range(5000)]
+            position = write_snapshot(self.path, data, indent=indent)
+            self.assertEqual(read_list_snapshot(self.path), (data, position))
+
+            new_position = write_snapshot(self.path, data + [{"tags": ["new"]}], indent=indent)
+            self.assertEqual(read_snapshot_tail(self.path, position), ([{"tags": ["new"]}], new_position))
+            self.assertEqual(read_snapshot_tail(self.path, new_position), ([], new_position))
+
+        # Changing an item read before cannot be followed
+        write_snapshot(self.path, [{"tags": ["changed"]}] + data[1:], indent=0)
+        with self.assertRaises(SnapshotError):
+            read_snapshot_tail(self.path, position)
+
+    def test_plain_json(self):
+        """Test that plain JSON files are read unverified."""
+        with open(self.path, "w") as f:
+            json.dump(["a", "b"], f)
+        self.assertEqual(read_snapshot(self.path), (["a", "b"], False))
+
+
+if __name__ == "__main__":
+    unittest.main()